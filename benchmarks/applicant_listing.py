@@ -0,0 +1,88 @@
+from myapp import create_app, db
+from myapp.config import TestingConfig
+from myapp.models import Applicant, JobRequirement, User
+from myapp.pagination import StreamedRows, applicant_rows, keyset_paginate
+from sqlalchemy.orm import joinedload
+from datetime import date, timedelta
+import argparse
+import time
+
+# Full Applicant entities vs the list-row projection (myapp.pagination.applicant_rows) for
+# one listing page and for a streamed full listing. Reports the bytes the database returns
+# and the wall time including ORM hydration. Run with:
+#   python -m benchmarks.applicant_listing --rows 5000
+
+def full_entities():
+    # What the listings loaded before: every Applicant column
+    return Applicant.query.options(joinedload(Applicant.uploader), joinedload(Applicant.job))
+
+def seed(rows):
+    hrs = [User(username=f'hr{i}', email=f'hr{i}@example.com', role='hr', name=f'HR {i}') for i in range(5)]
+    jobs = [JobRequirement(position=f'Position {i}', description='-' * 500, skillset='Python', budget='10')
+            for i in range(10)]
+    db.session.add_all(hrs + jobs)
+    db.session.flush()
+    start = date(2024, 1, 1)
+    db.session.add_all(Applicant(
+        name=f'Applicant {i}',
+        email=f'applicant{i}@example.com',
+        phone_number=9000000000 + i,
+        last_applied=start + timedelta(days=i % 365),
+        status='Applied',
+        current_stage='Need to Schedule Test or Interview',
+        uploaded_by=hrs[i % 5].id,
+        job_id=jobs[i % 10].id,
+        experience='3',
+        tenure_at_current_company='2 years 4 months at the current employer',
+        current_offers_description='Holding one offer, joining date flexible. ' * 5,
+        reason_for_change='Looking for larger ownership of backend services and growth. ' * 10,
+        comments='Strong fundamentals; follow up on system design depth in round two. ' * 10,
+        cv_file_path=f'uploads/cv/applicant_{i}.pdf',
+    ) for i in range(rows))
+    db.session.commit()
+
+def fetched_bytes(query):
+    # Size of the raw result rows the database hands back for this query
+    rows = db.session.connection().execute(query.statement).all()
+    return sum(len(str(value)) for row in rows for value in row if value is not None)
+
+def timed(run, repeat):
+    samples = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - started)
+    return min(samples) * 1000
+
+def measure(build, repeat):
+    page = lambda: keyset_paginate(build(), 'date', per_page=20).items
+    stream = lambda: [a.uploader.name for a in StreamedRows(build(), 'date')]
+    ordered = build().order_by(Applicant.last_applied.desc(), Applicant.id.desc())
+    return {
+        'page_ms': timed(page, repeat),
+        'page_bytes': fetched_bytes(ordered.limit(20)),
+        'stream_ms': timed(stream, max(1, repeat // 5)),
+        'stream_bytes': fetched_bytes(ordered),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Full entities vs list-row projection for the applicant listings.')
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        seed(args.rows)
+        before, after = measure(full_entities, args.repeat), measure(applicant_rows, args.repeat)
+
+    print(f'{args.rows} applicants')
+    print(f'{"":14}{"full entity":>14}{"projection":>14}{"change":>10}')
+    for key in ('page_ms', 'page_bytes', 'stream_ms', 'stream_bytes'):
+        change = (after[key] - before[key]) / before[key] * 100
+        print(f'{key:14}{before[key]:>14,.1f}{after[key]:>14,.1f}{change:>9.0f}%')
+
+if __name__ == '__main__':
+    main()
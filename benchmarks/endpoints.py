@@ -0,0 +1,178 @@
+from myapp import create_app, db
+from myapp.config import Config
+from myapp.models import Applicant, Interview, JobRequirement, User
+from myapp.seed import seed_data
+from datetime import date, datetime, timezone
+from pathlib import Path
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+
+# Latency and query counts for the HR, interviewer and referrer pages at production-like
+# volume. Each endpoint is requested --repeat times after one warm-up request, as a seeded
+# user of the right role, and its p50/p95 latency and per-request query count (from the
+# X-Query-Count header, see myapp.querystats) are recorded. Results are written to
+# benchmarks/results/<UTC timestamp>.json; --compare prints the change against an earlier
+# file. Endpoints that call iMocha or Graph are left out.
+#
+#   python -m benchmarks.endpoints --applicants 10000
+#       seeds a scratch SQLite database and benchmarks it
+#   python -m benchmarks.endpoints --database-url postgresql://... --compare benchmarks/results/<file>.json
+#       benchmarks an existing database, e.g. one filled with `flask seed-data --applicants 1000000`
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+# (role, path); {applicant}, {interviewer}, {hr}, {job} and {today} are filled from the data
+ENDPOINTS = [
+    ('hr', '/hr/applicants'),
+    ('hr', '/hr/all_applicants'),
+    ('hr', '/hr/sort_applicants?sort_by=name'),
+    ('hr', '/hr/sort_all_applicants?sort_by=hr'),
+    ('hr', '/hr/search_applicants?query=Sharma'),
+    ('hr', '/hr/search_all_applicants?query=Sharma'),
+    ('hr', '/hr/search_suggestions?q=Shar'),
+    ('hr', '/hr/filter_applicants?hr_id={hr}&status=experienced'),
+    ('hr', '/hr/filter_all_applicants?job_id={job}&all_stages=Applied'),
+    ('hr', '/hr/search_sort_filter_applicants?query=Iyer&sort_by=name&hr_id={hr}'),
+    ('hr', '/hr/search_sort_filter_all_applicants?query=Iyer&sort_by=date&job_id={job}'),
+    ('hr', '/hr/view_applicant/{applicant}'),
+    ('hr', '/hr/update_applicants/{applicant}'),
+    ('hr', '/hr/view_referrals'),
+    ('hr', '/hr/filter_referrals?job_id={job}'),
+    ('hr', '/hr/filter_interviews?hr_id={hr}'),
+    ('hr', '/hr/available_interviewers?date={today}&time=11:00'),
+    ('hr', '/interviewer/interviews'),
+    ('hr', '/view_joblisting'),
+    ('interviewer', '/interviewer/interviews'),
+    ('interviewer', '/interviewer/view_interviewee/{applicant}'),
+    ('internal_referrer', '/internal_referrer/referrals'),
+    ('external_referrer', '/external_referrer/referrals'),
+    ('hr', '/track/{applicant}'),
+]
+
+def config_for(database_url):
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SECRET_KEY = 'benchmark'
+        OUTBOX_WORKER = False
+        RESULTS_POLLER = False
+        SQL_STATS = True
+    return BenchmarkConfig
+
+def placeholders():
+    interviewer = User.query.filter_by(username='seed-interviewer-0').one()
+    booked = Interview.query.filter_by(interviewer_id=interviewer.id).order_by(Interview.id).first()
+    return {
+        'applicant': booked.applicant_id if booked else Applicant.query.order_by(Applicant.id).first().id,
+        'interviewer': interviewer.id,
+        'hr': User.query.filter_by(username='seed-hr-0').one().id,
+        'job': JobRequirement.query.order_by(JobRequirement.id).first().id,
+        'today': date.today().isoformat(),
+    }
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+def run(app, repeat):
+    clients, measured = {}, {}
+    with app.app_context():
+        values = placeholders()
+        users = {role: User.query.filter_by(username=f'seed-{role}-0').one().id
+                 for role in {role for role, _ in ENDPOINTS}}
+
+    for role, template in ENDPOINTS:
+        client = clients.get(role)
+        if client is None:
+            client = clients[role] = app.test_client()
+            with client.session_transaction() as sess:
+                sess['_user_id'] = str(users[role])
+                sess['_fresh'] = True
+
+        path = template.format(**values)
+        latencies, queries, status = [], [], None
+        for i in range(repeat + 1):
+            started = time.perf_counter()
+            response = client.get(path)
+            response.get_data()
+            elapsed = (time.perf_counter() - started) * 1000
+            status = response.status_code
+            if i:  # the first request only warms caches
+                latencies.append(elapsed)
+                queries.append(int(response.headers.get('X-Query-Count', 0)))
+
+        measured[f'{role} {template}'] = {
+            'status': status,
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'queries': max(queries),
+        }
+        print(f"{status} {measured[f'{role} {template}']['p50_ms']:>9.1f} {measured[f'{role} {template}']['p95_ms']:>9.1f} "
+              f"{max(queries):>4}  {role} {path}")
+    return measured
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(current, previous_file):
+    previous = json.loads(Path(previous_file).read_text())['endpoints']
+    print(f'\nChange against {previous_file}:')
+    for name, now in current.items():
+        before = previous.get(name)
+        if before is None:
+            continue
+        p50 = (now['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100 if before['p50_ms'] else 0
+        p95 = (now['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0
+        print(f"{p50:>+8.0f}% {p95:>+8.0f}% {now['queries'] - before['queries']:>+5}  {name}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HR, interviewer and referrer endpoints.')
+    parser.add_argument('--database-url', help='Benchmark an existing, seeded database instead of a scratch one.')
+    parser.add_argument('--applicants', type=int, default=10000, help='Applicants to seed into the scratch database.')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--compare', help='Earlier results file to compare against.')
+    args = parser.parse_args()
+
+    scratch = None
+    database_url = args.database_url
+    if database_url is None:
+        scratch = tempfile.mkdtemp(prefix='benchmark-')
+        database_url = f'sqlite:///{os.path.join(scratch, "benchmark.db")}'
+
+    app = create_app(config_for(database_url))
+    with app.app_context():
+        if scratch:
+            db.create_all()
+            seed_data(args.applicants)
+        applicants = db.session.query(Applicant).count()
+        dialect = db.engine.dialect.name
+
+    print(f'{applicants} applicants on {dialect}, {args.repeat} requests per endpoint')
+    print(f'{"":3} {"p50 ms":>9} {"p95 ms":>9} {"SQL":>4}  endpoint')
+    measured = run(app, args.repeat)
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    output = RESULTS_DIR / f'{stamp}.json'
+    output.write_text(json.dumps({
+        'meta': {
+            'timestamp': stamp, 'commit': git_commit(), 'applicants': applicants, 'database': dialect,
+            'repeat': args.repeat, 'python': platform.python_version(),
+        },
+        'endpoints': measured,
+    }, indent=2))
+    print(f'\nResults written to {output}')
+
+    if args.compare:
+        compare(measured, args.compare)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+from myapp import create_app, db, querystats, sessions
+from myapp.config import TestingConfig
+from myapp.models import User
+from types import SimpleNamespace
+import argparse
+import os
+import tempfile
+import time
+
+# Session store reads, writes and bytes written per request, for one signed-in user
+# browsing for an hour of simulated time with a tab that polls main.check_session every
+# minute. Compares the old behaviour (every request writes the session back, and the
+# session carries the MSAL token cache and the full token response) with the refresh
+# window and the trimmed session. Uses the SQL backend on a scratch SQLite database. Run:
+#   python -m benchmarks.session_io --minutes 60
+
+# Typical sizes of what Microsoft sign-in used to leave in the session
+LEGACY = {
+    'token_cache': 'x' * 7000,
+    'token': {'access_token': 'a' * 2200, 'id_token': 'i' * 1400, 'refresh_token': 'r' * 1600,
+              'id_token_claims': {'preferred_username': 'hr@example.com', 'name': 'HR', 'oid': 'o' * 36}},
+}
+TRIMMED = {'token': {'access_token': 'a' * 2200}}
+
+def scenario(database_url, refresh_interval, extra, minutes):
+    class Config(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SESSION_BACKEND = 'sql'
+        SESSION_REFRESH_INTERVAL = refresh_interval
+    app = create_app(Config)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(username='hr', email='hr@example.com', role='hr', name='HR')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    written = []
+    interface = app.session_interface
+    encode = interface.serializer.encode
+    interface.serializer.encode = lambda session: written.append(len(encoded := encode(session))) or encoded
+
+    # Simulated wall clock for the refresh window; one tick is one minute
+    now = [time.time()]
+    sessions.time = SimpleNamespace(time=lambda: now[0], monotonic=time.monotonic)
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess.update({'_user_id': str(user_id), '_fresh': True, **extra})
+    written.clear()
+
+    requests = 0
+    with querystats.capture() as stats:
+        for minute in range(minutes):
+            now[0] += 60
+            paths = ['/check_session'] + (['/profile', '/view_joblisting'] if minute % 2 == 0 else [])
+            for path in paths:
+                client.get(path)
+                requests += 1
+    sessions.time = time
+
+    session_sql = {sql: n for sql, n in stats.fingerprints.items() if 'sessions' in sql}
+    return {
+        'requests': requests,
+        'reads': sum(n for sql, n in session_sql.items() if sql.startswith('SELECT')),
+        'writes': len(written),
+        'bytes': sum(written),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Session store I/O per request.')
+    parser.add_argument('--minutes', type=int, default=60)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix='benchmark-')
+    database_url = f'sqlite:///{os.path.join(scratch, "sessions.db")}'
+    results = {
+        'write every request, token cache in session': scenario(database_url, 0, LEGACY, args.minutes),
+        'refresh window, trimmed session': scenario(database_url, 300, TRIMMED, args.minutes),
+    }
+
+    print(f'{"":45}{"requests":>9}{"reads/req":>10}{"writes/req":>11}{"bytes/req":>10}')
+    for name, r in results.items():
+        n = r['requests']
+        print(f"{name:45}{n:>9}{r['reads'] / n:>10.2f}{r['writes'] / n:>11.2f}{r['bytes'] / n:>10.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# Production server settings: gunicorn -c gunicorn.conf.py run:app
+#
+# Every setting can be overridden from the environment (GUNICORN_*, WEB_CONCURRENCY).
+# Sizing: threaded workers (gthread), one process per core plus one by default, each with
+# a few threads. Most request time is spent waiting on Postgres, iMocha or Graph, so threads
+# are cheap concurrency and processes give CPU parallelism. Keep workers * threads within
+# the database connection budget (pool_size + max_overflow per process, 15 by default).
+#
+# The app is preloaded in the master process and forked, so workers share its memory and
+# a bad deploy fails before any worker starts. create_app opens no database connections
+# or threads, so nothing inherited by the fork is shared between workers. Background
+# workers (outbox, results poller) start on a worker's first request; only the worker
+# holding the results poller's advisory lock polls iMocha.
+#
+# Reloads: with preloading, `kill -HUP <master>` restarts workers gracefully but keeps the
+# code the master loaded. To deploy new code without dropping connections, send USR2 (starts
+# a new master alongside the old one), then WINCH and finally QUIT to the old master.
+#
+# TLS: set GUNICORN_CERTFILE and GUNICORN_KEYFILE to terminate TLS here. Behind a load
+# balancer or nginx that terminates TLS, leave them unset, set PROXY_COUNT (see
+# myapp.config) so X-Forwarded-* are trusted, and list the proxy in FORWARDED_ALLOW_IPS.
+
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() + 1))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') == '1'
+
+# Keep-alive must outlast the load balancer's idle timeout (60s on most), or the balancer
+# may reuse a connection gunicorn has just closed and return a 502
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 75))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Recycle workers now and then so slow leaks cannot build up; jitter avoids all restarting at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+certfile = os.getenv('GUNICORN_CERTFILE') or None
+keyfile = os.getenv('GUNICORN_KEYFILE') or None
+forwarded_allow_ips = os.getenv('FORWARDED_ALLOW_IPS', '127.0.0.1')
+
+accesslog = os.getenv('GUNICORN_ACCESSLOG', '-')
+errorlog = '-'
+
+# Several processes cannot share one rotating log file (each would rotate it on its own),
+# so the app logs to stderr and gunicorn collects it; set LOG_FILE to override
+os.environ.setdefault('LOG_FILE', '-')
+
+def when_ready(server):
+    # Without a shared identity cache a role change reaches the other workers only after
+    # IDENTITY_TTL seconds (see myapp.identity)
+    if workers > 1 and not os.getenv('IDENTITY_REDIS_URL'):
+        server.log.warning('IDENTITY_REDIS_URL is not set: role changes and deletions reach other '
+                           'workers only when their cached identity expires (IDENTITY_TTL)')
@@ -0,0 +1,63 @@
+"""search indexes
+
+Revision ID: 3f9c2b7d41e6
+Revises: 68fe2ab8dc43
+Create Date: 2025-08-04 11:02:19.512734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2b7d41e6'
+down_revision = '68fe2ab8dc43'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Trigram and full-text indexes are Postgres-only; other backends use myapp.search's in-process index
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    op.execute(
+        "ALTER TABLE applicants ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(name, ''))) STORED"
+    )
+    op.execute(
+        "ALTER TABLE jobrequirement ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', coalesce(position, '') || ' ' || coalesce(description, ''))) STORED"
+    )
+
+    op.create_index('ix_applicants_search_vector', 'applicants', ['search_vector'], postgresql_using='gin')
+    op.create_index('ix_applicants_name_trgm', 'applicants', ['name'],
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_applicants_email_trgm', 'applicants', ['email'],
+                    postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'})
+
+    op.create_index('ix_jobrequirement_search_vector', 'jobrequirement', ['search_vector'], postgresql_using='gin')
+    op.create_index('ix_jobrequirement_position_trgm', 'jobrequirement', ['position'],
+                    postgresql_using='gin', postgresql_ops={'position': 'gin_trgm_ops'})
+    op.create_index('ix_jobrequirement_description_trgm', 'jobrequirement', ['description'],
+                    postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'})
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_jobrequirement_description_trgm', table_name='jobrequirement')
+    op.drop_index('ix_jobrequirement_position_trgm', table_name='jobrequirement')
+    op.drop_index('ix_jobrequirement_search_vector', table_name='jobrequirement')
+    op.drop_index('ix_applicants_email_trgm', table_name='applicants')
+    op.drop_index('ix_applicants_name_trgm', table_name='applicants')
+    op.drop_index('ix_applicants_search_vector', table_name='applicants')
+
+    with op.batch_alter_table('jobrequirement', schema=None) as batch_op:
+        batch_op.drop_column('search_vector')
+
+    with op.batch_alter_table('applicants', schema=None) as batch_op:
+        batch_op.drop_column('search_vector')
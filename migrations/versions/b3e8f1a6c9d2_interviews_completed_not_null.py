@@ -0,0 +1,58 @@
+"""interviews completed not null
+
+Revision ID: b3e8f1a6c9d2
+Revises: a7c2e9d4f1b3
+Create Date: 2025-08-20 09:41:17.630288
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e8f1a6c9d2'
+down_revision = 'a7c2e9d4f1b3'
+branch_labels = None
+depends_on = None
+
+
+def overlap(pending):
+    return f"""
+    WHEN {pending} AND NEW.starts_at IS NOT NULL
+    BEGIN
+        SELECT RAISE(ABORT, 'interviews_no_overlap: the interviewer already has an interview at that time')
+        WHERE EXISTS (
+            SELECT 1 FROM interviews
+            WHERE interviewer_id = NEW.interviewer_id AND completed = 0 AND id IS NOT NEW.id
+              AND starts_at < NEW.ends_at AND NEW.starts_at < ends_at
+        );
+    END
+"""
+
+
+def set_completed(nullable, pending):
+    # The overlap rule, the partial indexes and the board all read completed = false, which a
+    # NULL never matches (the old SQLite triggers took NULL as pending; Postgres did not)
+    sqlite = op.get_bind().dialect.name == 'sqlite'
+    if sqlite:
+        # The table is rebuilt below, which would drop the triggers anyway
+        op.execute('DROP TRIGGER interviews_no_overlap_update')
+        op.execute('DROP TRIGGER interviews_no_overlap_insert')
+
+    with op.batch_alter_table('interviews', schema=None) as batch_op:
+        batch_op.alter_column('completed', existing_type=sa.Boolean(), nullable=nullable,
+                              server_default=None if nullable else sa.false())
+
+    if sqlite:
+        op.execute('CREATE TRIGGER interviews_no_overlap_insert BEFORE INSERT ON interviews' + overlap(pending))
+        op.execute('CREATE TRIGGER interviews_no_overlap_update BEFORE UPDATE OF interviewer_id, starts_at, ends_at, completed '
+                   'ON interviews' + overlap(pending))
+
+
+def upgrade():
+    op.execute(sa.text('UPDATE interviews SET completed = :no WHERE completed IS NULL').bindparams(no=False))
+    set_completed(False, 'NEW.completed = 0')
+
+
+def downgrade():
+    set_completed(True, 'coalesce(NEW.completed, 0) = 0')
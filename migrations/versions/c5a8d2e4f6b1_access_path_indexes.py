@@ -0,0 +1,53 @@
+"""access path indexes
+
+Revision ID: c5a8d2e4f6b1
+Revises: b7e3f1a9c5d2
+Create Date: 2025-08-08 11:05:41.937214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a8d2e4f6b1'
+down_revision = 'b7e3f1a9c5d2'
+branch_labels = None
+depends_on = None
+
+
+def indexes(postgres):
+    # (name, table, columns, partial-index predicate)
+    # Postgres sorts NULLs first in DESC order; the listings put them last, so say so explicitly
+    last_applied = sa.text('last_applied DESC NULLS LAST' if postgres else 'last_applied DESC')
+    newest = [last_applied, sa.text('id DESC')]
+    pending = sa.text('completed = false' if postgres else 'completed = 0')
+    return [
+        ('ix_applicants_last_applied_id', 'applicants', newest, None),
+        ('ix_applicants_status_last_applied', 'applicants', ['status'] + newest, None),
+        ('ix_applicants_uploaded_by_last_applied', 'applicants', ['uploaded_by'] + newest, None),
+        ('ix_applicants_job_id_last_applied', 'applicants', ['job_id'] + newest, None),
+        ('ix_recruitment_history_applicant_id', 'recruitment_history', ['applicant_id'], None),
+        ('ix_interviews_applicant_id', 'interviews', ['applicant_id'], None),
+        ('ix_interviews_interviewer_id_date', 'interviews', ['interviewer_id', 'date'], None),
+        ('ix_interviews_pending_date', 'interviews', ['date', 'time'], pending),
+        ('ix_interviews_pending_scheduler_id', 'interviews', ['scheduler_id', 'date'], pending),
+        ('ix_referrals_job_id', 'referrals', ['job_id'], None),
+        ('ix_referrals_referrer_id_referral_date', 'referrals', ['referrer_id', 'referral_date'], None),
+    ]
+
+
+def upgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    # Build the indexes without blocking writes to these tables on Postgres
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in indexes(postgres):
+            op.create_index(name, table, columns, postgresql_where=where, sqlite_where=where,
+                            postgresql_concurrently=postgres)
+
+
+def downgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(indexes(postgres)):
+            op.drop_index(name, table_name=table, postgresql_concurrently=postgres)
@@ -0,0 +1,72 @@
+"""interview no overlap
+
+Revision ID: d9a4c6e2b8f1
+Revises: f3c7a1d9e5b2
+Create Date: 2025-08-14 10:12:48.306155
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime, timedelta
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a4c6e2b8f1'
+down_revision = 'f3c7a1d9e5b2'
+branch_labels = None
+depends_on = None
+
+OVERLAP = """
+    WHEN coalesce(NEW.completed, 0) = 0 AND NEW.starts_at IS NOT NULL
+    BEGIN
+        SELECT RAISE(ABORT, 'interviews_no_overlap: the interviewer already has an interview at that time')
+        WHERE EXISTS (
+            SELECT 1 FROM interviews
+            WHERE interviewer_id = NEW.interviewer_id AND completed = 0 AND id IS NOT NEW.id
+              AND starts_at < NEW.ends_at AND NEW.starts_at < ends_at
+        );
+    END
+"""
+
+
+def upgrade():
+    with op.batch_alter_table('interviews', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('starts_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('ends_at', sa.DateTime(), nullable=True))
+
+    # Existing interviews were all booked for an hour
+    interviews = sa.table('interviews', sa.column('id'), sa.column('date', sa.Date), sa.column('time', sa.Time),
+                          sa.column('starts_at', sa.DateTime), sa.column('ends_at', sa.DateTime))
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(interviews.c.id, interviews.c.date, interviews.c.time)
+                        .where(interviews.c.date.isnot(None), interviews.c.time.isnot(None))).all()
+    for id, date, time in rows:
+        starts_at = datetime.combine(date, time)
+        bind.execute(interviews.update().where(interviews.c.id == id)
+                     .values(starts_at=starts_at, ends_at=starts_at + timedelta(hours=1)))
+
+    # Pending interviews that already overlap must be moved or completed before this runs
+    if bind.dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+        op.execute(
+            "ALTER TABLE interviews ADD CONSTRAINT interviews_no_overlap "
+            "EXCLUDE USING gist (interviewer_id WITH =, tsrange(starts_at, ends_at) WITH &&) "
+            "WHERE (completed = false AND starts_at IS NOT NULL)"
+        )
+    elif bind.dialect.name == 'sqlite':
+        op.execute('CREATE TRIGGER interviews_no_overlap_insert BEFORE INSERT ON interviews' + OVERLAP)
+        op.execute('CREATE TRIGGER interviews_no_overlap_update BEFORE UPDATE OF interviewer_id, starts_at, ends_at, completed '
+                   'ON interviews' + OVERLAP)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute('ALTER TABLE interviews DROP CONSTRAINT interviews_no_overlap')
+    elif bind.dialect.name == 'sqlite':
+        op.execute('DROP TRIGGER interviews_no_overlap_update')
+        op.execute('DROP TRIGGER interviews_no_overlap_insert')
+
+    with op.batch_alter_table('interviews', schema=None) as batch_op:
+        batch_op.drop_column('ends_at')
+        batch_op.drop_column('starts_at')
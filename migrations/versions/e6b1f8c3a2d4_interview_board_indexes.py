@@ -0,0 +1,51 @@
+"""interview board indexes
+
+Revision ID: e6b1f8c3a2d4
+Revises: d9a4c6e2b8f1
+Create Date: 2025-08-15 16:27:03.518842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b1f8c3a2d4'
+down_revision = 'd9a4c6e2b8f1'
+branch_labels = None
+depends_on = None
+
+
+def pending(postgres):
+    return sa.text('completed = false' if postgres else 'completed = 0')
+
+
+# (name, columns) of the partial indexes on open interviews, before and after
+OLD = [
+    ('ix_interviews_pending_date', ['date', 'time']),
+    ('ix_interviews_pending_scheduler_id', ['scheduler_id', 'date']),
+]
+NEW = [
+    ('ix_interviews_pending_starts_at', ['starts_at', 'id']),
+    ('ix_interviews_pending_scheduler_starts_at', ['scheduler_id', 'starts_at', 'id']),
+    ('ix_interviews_pending_interviewer_starts_at', ['interviewer_id', 'starts_at', 'id']),
+]
+
+
+def replace(drop, create):
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    # Build the indexes without blocking writes to interviews on Postgres
+    with op.get_context().autocommit_block():
+        for name, columns in create:
+            op.create_index(name, 'interviews', columns, postgresql_where=pending(postgres),
+                            sqlite_where=pending(postgres), postgresql_concurrently=postgres)
+        for name, _ in drop:
+            op.drop_index(name, table_name='interviews', postgresql_concurrently=postgres)
+
+
+def upgrade():
+    replace(OLD, NEW)
+
+
+def downgrade():
+    replace(NEW, OLD)
@@ -1,9 +1,12 @@
 from flask import Flask, session, flash, redirect, url_for, got_request_exception
-from flask_session import Session
+from flask.logging import default_handler
 from myapp.extensions import db, login_manager, migrate
 from myapp.routes import register_routes
 from logging.handlers import RotatingFileHandler
-from myapp.models.users import User
+from werkzeug.middleware.proxy_fix import ProxyFix
+from myapp.stages import recompute_stages_command
+from myapp.seed import seed_data_command
+from myapp import identity, outbox, results, querystats, sessions
 from myapp import config
 import logging
 import os
@@ -12,7 +15,7 @@ login_manager.login_view = 'auth.login'
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return identity.load(int(user_id))
 
 @login_manager.unauthorized_handler
 def unauthorized():
@@ -25,25 +28,41 @@ def create_app(config_class=None):
     app = Flask(__name__)
     app.config.from_object(config_class or config.Config)
     app.config['UPLOAD_FOLDER'] = os.path.join(app.root_path, 'uploads')
-    if not os.path.exists(app.config['UPLOAD_FOLDER']):
-        os.makedirs(app.config['UPLOAD_FOLDER'])
+    # exist_ok: several workers may start at once
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+
+    if app.config['PROXY_COUNT']:
+        # Behind a TLS-terminating proxy: take scheme, host and client address from X-Forwarded-*
+        count = app.config['PROXY_COUNT']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=count, x_proto=count, x_host=count, x_port=count)
 
     db.init_app(app)
     login_manager.init_app(app)
     login_manager.session_protection = "basic"
-    Session(app)
+    sessions.init_app(app)
     migrate.init_app(app, db)
+    querystats.init_app(app)
+    outbox.init_app(app)
+    results.init_app(app)
 
-    if not os.path.exists('logs'):
-        os.mkdir('logs')
-
-    file_handler = RotatingFileHandler('logs/app.log', maxBytes=10240, backupCount=5)
-    file_handler.setLevel(logging.INFO)
+    # LOG_FILE '-' logs to stderr, which is what multi-process servers want (see gunicorn.conf.py)
+    log_file = app.config['LOG_FILE']
+    if log_file == '-':
+        log_handler = default_handler  # Flask's own stderr handler, already attached
+    else:
+        os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+        log_handler = RotatingFileHandler(log_file, maxBytes=10240, backupCount=5)
+    log_handler.setLevel(logging.INFO)
     formatter = logging.Formatter(
-        '[%(asctime)s] %(levelname)s in %(module)s: %(message)s'
+        '[%(asctime)s] %(process)d %(levelname)s in %(module)s: %(message)s'
     )
-    file_handler.setFormatter(formatter)
-    app.logger.addHandler(file_handler)
+    log_handler.setFormatter(formatter)
+    # app.logger is shared by every app built in this process; drop the handler an earlier create_app added
+    for handler in [h for h in app.logger.handlers if getattr(h, 'from_create_app', False) and h is not log_handler]:
+        app.logger.removeHandler(handler)
+        handler.close()
+    log_handler.from_create_app = True
+    app.logger.addHandler(log_handler)
     app.logger.setLevel(logging.INFO)
     app.logger.info('Flask application startup')
 
@@ -53,5 +72,10 @@ def create_app(config_class=None):
     got_request_exception.connect(log_exception, app)
 
     register_routes(app)
+    app.cli.add_command(recompute_stages_command)
+    app.cli.add_command(outbox.outbox_worker_command)
+    app.cli.add_command(results.poll_results_command)
+    app.cli.add_command(seed_data_command)
+    app.cli.add_command(sessions.session_gc_command)
 
     return app
\ No newline at end of file
@@ -1,46 +1,127 @@
 import msal
 import uuid
-from flask import current_app, session, url_for
+from flask import current_app, g, session, url_for
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from myapp.extensions import db
+from myapp.models.tokens import MicrosoftTokenCache
+import threading
 
-def _load_cache():
-    #Loads the token cache from the session (if it exists). Keeps user login tokens so they don’t have to re-authenticate every time
+# Microsoft sign-in and Graph tokens. Each process builds one ConfidentialClientApplication
+# (authority discovery happens once, not per call) and shares it between threads. Its token
+# cache is partitioned per user: every call runs with the signed-in user's own cache,
+# loaded from the ms_token_caches table and written back when MSAL changes it, so any
+# worker can refresh any user's token. Graph callers use graph_token(), which serves the
+# cached access token or silently redeems the refresh token once it has expired; only a
+# user who has never signed in with Microsoft (or whose refresh token has lapsed) has to.
+
+_current_cache = ContextVar('msal_token_cache', default=None)
+
+class PartitionedTokenCache:
+    # Stands in for the singleton app's token cache and forwards every call to the cache
+    # selected for the current thread/context by _partition()
+    CredentialType = msal.TokenCache.CredentialType
+    AuthorityType = msal.TokenCache.AuthorityType
+
+    def __getattr__(self, name):
+        if not callable(getattr(msal.TokenCache, name, None)):
+            raise AttributeError(name)
+        # Resolved on each call: MSAL binds some cache methods once, when the app is built
+        return lambda *args, **kwargs: getattr(self._cache(), name)(*args, **kwargs)
+
+    def _cache(self):
+        cache = _current_cache.get()
+        if cache is None:
+            raise RuntimeError('MSAL token cache used outside a user partition')
+        return cache
+
+@contextmanager
+def _partition(cache):
+    token = _current_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _current_cache.reset(token)
+
+_lock = threading.Lock()
+
+def msal_app():
+    app = current_app.extensions.get('msal')
+    if app is None:
+        with _lock:
+            app = current_app.extensions.get('msal')
+            if app is None:
+                config = current_app.config
+                app = current_app.extensions['msal'] = msal.ConfidentialClientApplication(
+                    config['MS_CLIENT_ID'],
+                    authority=config['MS_AUTHORITY'],
+                    client_credential=config['MS_CLIENT_SECRET'],
+                    token_cache=PartitionedTokenCache(),
+                    timeout=(config['HTTP_CONNECT_TIMEOUT'], config['HTTP_READ_TIMEOUT'])
+                )
+    return app
+
+def _load_cache(user_id):
     cache = msal.SerializableTokenCache()
-    if session.get('token_cache'):
-        cache.deserialize(session['token_cache'])
+    with db.engine.connect() as conn:
+        state = conn.execute(select(MicrosoftTokenCache.cache).where(MicrosoftTokenCache.user_id == user_id)).scalar()
+    if state:
+        cache.deserialize(state)
     return cache
 
-def _save_cache(cache):
-    if cache.has_state_changed:
-        session["token_cache"] = cache.serialize()
+_UPSERT = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
 
-def build_msal_app(cache=None):
-    return msal.ConfidentialClientApplication(
-        current_app.config['MS_CLIENT_ID'],
-        authority=current_app.config['MS_AUTHORITY'],
-        client_credential=current_app.config['MS_CLIENT_SECRET'],
-        token_cache=cache
-    )                             
+def _save_cache(user_id, cache):
+    # On its own connection, so it neither commits nor waits for the caller's transaction
+    if not cache.has_state_changed:
+        return
+    table = MicrosoftTokenCache.__table__
+    values = {'cache': cache.serialize(), 'updated_at': datetime.utcnow()}
+    with db.engine.begin() as conn:
+        upsert = _UPSERT.get(conn.dialect.name)
+        if upsert is not None:
+            statement = upsert(table).values(user_id=user_id, **values)
+            conn.execute(statement.on_conflict_do_update(index_elements=[table.c.user_id], set_=values))
+        elif not conn.execute(update(table).where(table.c.user_id == user_id).values(values)).rowcount:
+            conn.execute(insert(table).values(user_id=user_id, **values))
+    cache.has_state_changed = False
 
 def get_msal_auth_url(scopes):
-    cache = _load_cache()
-    msal_app = build_msal_app(cache)
     state = str(uuid.uuid4())
     session['msal_state'] = state
-    auth_url = msal_app.get_authorization_request_url(
+    return msal_app().get_authorization_request_url(
         scopes,
         state=state,
         redirect_uri=url_for('auth.authorized_redirect', _external=True)
     )
-    _save_cache(cache)
-    return auth_url
 
 def get_token_from_code(code, scopes):
-    cache = _load_cache()
-    msal_app = build_msal_app(cache)
-    result = msal_app.acquire_token_by_authorization_code(
-        code,
-        scopes=scopes,
-        redirect_uri=url_for("auth.authorized_redirect", _external=True)
-    )
-    _save_cache(cache)
-    return result
\ No newline at end of file
+    # The user is not known until the result is read; save_tokens() stores the cache once they are
+    cache = msal.SerializableTokenCache()
+    with _partition(cache):
+        result = msal_app().acquire_token_by_authorization_code(
+            code,
+            scopes=scopes,
+            redirect_uri=url_for("auth.authorized_redirect", _external=True)
+        )
+    g.msal_token_cache = cache
+    return result
+
+def save_tokens(user_id):
+    # Keep the tokens from this request's sign-in as the user's server-side cache
+    cache = g.pop('msal_token_cache', None)
+    if cache is not None:
+        _save_cache(user_id, cache)
+
+def graph_token(user_id, scopes=None):
+    # A valid Graph access token for the user, refreshed silently if needed; None if they must sign in again
+    cache = _load_cache(user_id)
+    with _partition(cache):
+        app = msal_app()
+        accounts = app.get_accounts()
+        result = app.acquire_token_silent(scopes or current_app.config['MS_SCOPE'], account=accounts[0]) if accounts else None
+    _save_cache(user_id, cache)
+    return result['access_token'] if result else None
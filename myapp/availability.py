@@ -0,0 +1,179 @@
+from bisect import bisect_right
+from collections import defaultdict
+from heapq import merge
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import IntegrityError
+from myapp.extensions import db
+from myapp.models.interviews import Interview
+from datetime import datetime, timedelta
+
+# Interviewer availability. An interview occupies [starts_at, ends_at): its date and time
+# plus INTERVIEW_DURATION minutes, set by the before_flush hook below whenever the date or
+# time is written, and the database refuses overlapping pending interviews for the same
+# interviewer (see myapp.models.interviews). Routes flush new bookings with reserve(),
+# which turns that refusal into False. INTERVIEW_BUFFER minutes around each interview are
+# kept clear by the searches here, but not enforced.
+#
+# Bookings for a set of interviewers over a date range are read in one range query on
+# ix_interviews_interviewer_id_date and kept per interviewer as merged, sorted busy
+# intervals, so "is X free for [start, end)" is one binary search, and listing X's free
+# windows in a day costs a binary search plus one step per booking that day. Free slots
+# are searched within working hours, INTERVIEW_DAY_START to INTERVIEW_DAY_END on
+# INTERVIEW_WEEKDAYS, and never in the past.
+#
+# Slots common to several interviewers come from one sweep over all their busy intervals
+# in start order (a k-way merge of the already sorted calendars), which yields the times
+# at least one of them is busy; the gaps in that union are the times all of them are free.
+
+def duration():
+    return timedelta(minutes=current_app.config['INTERVIEW_DURATION'])
+
+@event.listens_for(db.session, 'before_flush')
+def sync_interval(session, flush_context, instances):
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Interview):
+            continue
+        state = inspect(obj)
+        if state.pending or state.attrs.date.history.has_changes() or state.attrs.time.history.has_changes():
+            if obj.date and obj.time:
+                obj.starts_at = datetime.combine(obj.date, obj.time)
+                obj.ends_at = obj.starts_at + duration()
+            else:
+                obj.starts_at = obj.ends_at = None
+
+def is_double_booking(error):
+    return 'interviews_no_overlap' in str(error.orig)
+
+def reserve():
+    # Flush pending interview changes; False, with the transaction rolled back, if one
+    # would double-book an interviewer
+    try:
+        db.session.flush()
+    except IntegrityError as e:
+        if not is_double_booking(e):
+            raise
+        db.session.rollback()
+        return False
+    return True
+
+def _clock(value):
+    return datetime.strptime(value, '%H:%M').time()
+
+def _round_up(moment, step):
+    # The first multiple of `step` after midnight at or after `moment`
+    midnight = datetime.combine(moment.date(), datetime.min.time())
+    return midnight + -(-(moment - midnight) // step) * step
+
+class BusyCalendar:
+    # One interviewer's busy intervals, half-open and non-overlapping, in start order
+    def __init__(self, intervals=(), ordered=False):
+        self.starts, self.ends = [], []
+        for start, end in intervals if ordered else sorted(intervals):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    @classmethod
+    def union(cls, calendars):
+        # Times at least one of the calendars is busy, swept in start order
+        return cls(merge(*(zip(calendar.starts, calendar.ends) for calendar in calendars)), ordered=True)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def is_free(self, start, end):
+        # The first interval ending after `start` must not begin before `end`
+        i = bisect_right(self.ends, start)
+        return i == len(self.starts) or self.starts[i] >= end
+
+    def gaps(self, start, end):
+        # Free windows within [start, end), in order
+        i = bisect_right(self.ends, start)
+        cursor = start
+        while i < len(self.starts) and self.starts[i] < end:
+            if self.starts[i] > cursor:
+                yield cursor, self.starts[i]
+            cursor = max(cursor, self.ends[i])
+            i += 1
+        if cursor < end:
+            yield cursor, end
+
+class Availability:
+    def __init__(self, calendars, duration, buffer):
+        self.calendars = calendars
+        self.duration = duration
+        self.buffer = buffer
+
+    @classmethod
+    def load(cls, interviewer_ids, first_day, last_day):
+        # Bookings of the given interviewers that can overlap first_day..last_day
+        config = current_app.config
+        length = timedelta(minutes=config['INTERVIEW_DURATION'])
+        buffer = timedelta(minutes=config['INTERVIEW_BUFFER'])
+        # Interviews are looked up by their date; take in any that start earlier and run into the range
+        reach = timedelta(days=(length + buffer).days + 1)
+        interviewer_ids = list(interviewer_ids)
+
+        intervals = defaultdict(list)
+        if interviewer_ids:
+            rows = db.session.query(Interview.interviewer_id, Interview.starts_at, Interview.ends_at).filter(
+                Interview.interviewer_id.in_(interviewer_ids),
+                Interview.date.between(first_day - reach, last_day + reach),
+                Interview.starts_at.isnot(None),
+            )
+            for interviewer_id, start, end in rows:
+                intervals[interviewer_id].append((start - buffer, end + buffer))
+        calendars = {interviewer_id: BusyCalendar(intervals[interviewer_id]) for interviewer_id in interviewer_ids}
+        return cls(calendars, length, buffer)
+
+    def is_free(self, interviewer_id, start):
+        return self.calendars[interviewer_id].is_free(start, start + self.duration)
+
+    def free_at(self, start):
+        # Ids of the loaded interviewers who can take an interview starting at `start`
+        return [interviewer_id for interviewer_id in self.calendars if self.is_free(interviewer_id, start)]
+
+    def working_hours(self, first_day, days, now=None, day_start=None, day_end=None):
+        # [start, end) of each working day in the range, the current one cut at `now`
+        config = current_app.config
+        day_start = day_start or _clock(config['INTERVIEW_DAY_START'])
+        day_end = day_end or _clock(config['INTERVIEW_DAY_END'])
+        now = now or datetime.now()
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            if day.weekday() not in config['INTERVIEW_WEEKDAYS']:
+                continue
+            start, end = max(datetime.combine(day, day_start), now), datetime.combine(day, day_end)
+            if start < end:
+                yield start, end
+
+    def free_slots(self, interviewer_id, first_day, days, now=None):
+        # The interviewer's free windows long enough for an interview, over `days` days
+        calendar = self.calendars[interviewer_id]
+        return [
+            (start, end)
+            for window in self.working_hours(first_day, days, now)
+            for start, end in calendar.gaps(*window)
+            if end - start >= self.duration
+        ]
+
+    def common_slots(self, interviewer_ids, first_day, days, limit, length=None,
+                     day_start=None, day_end=None, now=None):
+        # The earliest `limit` (start, end) slots of `length` when all the interviewers are
+        # free, starting on INTERVIEW_SLOT_STEP boundaries
+        length = length or self.duration
+        step = timedelta(minutes=current_app.config['INTERVIEW_SLOT_STEP'])
+        busy = BusyCalendar.union(self.calendars[interviewer_id] for interviewer_id in interviewer_ids)
+        slots = []
+        for window in self.working_hours(first_day, days, now, day_start, day_end):
+            for gap_start, gap_end in busy.gaps(*window):
+                start = _round_up(gap_start, step)
+                while start + length <= gap_end:
+                    slots.append((start, start + length))
+                    if len(slots) == limit:
+                        return slots
+                    start += step
+        return slots
@@ -0,0 +1,154 @@
+from flask import current_app, render_template, request
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
+from myapp.models.applicants import Applicant
+from myapp.models.interviews import Interview
+from myapp.models.jobrequirement import JobRequirement
+from myapp.models.users import User
+from myapp.pagination import KeysetPage
+from datetime import date, datetime, timedelta
+import base64
+import binascii
+import json
+
+# The interview board: pending interviews in a date window (today, this week, or a range of
+# at most INTERVIEW_BOARD_MAX_DAYS days), optionally for one scheduler and/or interviewer,
+# in start order (or newest first), one keyset page at a time. Pending interviews from
+# before today are overdue (they still need feedback, which interviewers give from here),
+# so every window lists them too, ahead of its own. Every query is a range scan on one of
+# the partial ix_interviews_pending_*starts_at indexes, which hold only pending interviews,
+# bounded by the page size, so it costs the same however many completed ones the table holds.
+
+# Each row shows the applicant, interviewer and scheduler by name; the interviewers' own
+# board also shows the applicant's profile and job
+LINKS = (
+    joinedload(Interview.interviewer).load_only(User.id, User.name),
+    joinedload(Interview.scheduler).load_only(User.id, User.name),
+)
+HR_OPTIONS = (joinedload(Interview.applicant).load_only(Applicant.id, Applicant.name),) + LINKS
+INTERVIEWER_OPTIONS = (
+    joinedload(Interview.applicant).load_only(
+        Applicant.id, Applicant.name, Applicant.is_fresher, Applicant.experience,
+        Applicant.qualification, Applicant.job_id,
+    ).joinedload(Applicant.job).load_only(JobRequirement.id, JobRequirement.position),
+) + LINKS
+
+class Window:
+    def __init__(self, name, first_day, last_day, today=None):
+        self.name = name
+        self.first_day = first_day
+        self.last_day = last_day
+        self.today = today or date.today()
+
+    @property
+    def overdue(self):
+        # Pending interviews starting before this are listed whatever the window
+        return datetime.combine(min(self.first_day, self.today), datetime.min.time())
+
+    @property
+    def start(self):
+        return datetime.combine(self.first_day, datetime.min.time())
+
+    @property
+    def end(self):
+        return datetime.combine(self.last_day + timedelta(days=1), datetime.min.time())
+
+def _day(value):
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+def window(name=None, first=None, last=None, today=None):
+    # Unknown names and unusable ranges fall back to this week
+    today = today or date.today()
+    if name == 'today':
+        return Window(name, today, today, today)
+    if name == 'range':
+        first_day, last_day = _day(first), _day(last)
+        if first_day and last_day and first_day <= last_day:
+            span = timedelta(days=current_app.config['INTERVIEW_BOARD_MAX_DAYS'] - 1)
+            return Window(name, first_day, min(last_day, first_day + span), today)
+    monday = today - timedelta(days=today.weekday())
+    return Window('week', monday, monday + timedelta(days=6), today)
+
+def encode_cursor(order, starts_at, ident, direction):
+    payload = {'o': order, 't': starts_at.isoformat(), 'i': ident, 'd': direction}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+def decode_cursor(token, order):
+    # As for applicant listings, a malformed or stale cursor restarts from the first page
+    if not token:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        if payload.get('o') != order or payload.get('d') not in ('n', 'p'):
+            return None
+        return datetime.fromisoformat(payload['t']), int(payload['i']), payload['d'] == 'n'
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        return None
+
+def pending_interviews(span, scheduler_id=None, interviewer_id=None):
+    query = Interview.query.filter(Interview.completed == False, Interview.starts_at < span.end)
+    if span.overdue < span.start:
+        query = query.filter(or_(Interview.starts_at < span.overdue, Interview.starts_at >= span.start))
+    if scheduler_id:
+        query = query.filter(Interview.scheduler_id == scheduler_id)
+    if interviewer_id:
+        query = query.filter(Interview.interviewer_id == interviewer_id)
+    return query
+
+def interview_board(span, scheduler_id=None, interviewer_id=None, order='asc', cursor=None,
+                    per_page=25, options=HR_OPTIONS):
+    order = order if order in ('asc', 'desc') else 'asc'
+    query = pending_interviews(span, scheduler_id, interviewer_id).options(*options)
+
+    position = decode_cursor(cursor, order)
+    forward = True
+    if position:
+        starts_at, ident, forward = position
+        later = (order == 'asc') == forward
+        if later:
+            query = query.filter(or_(Interview.starts_at > starts_at,
+                                     and_(Interview.starts_at == starts_at, Interview.id > ident)))
+        else:
+            query = query.filter(or_(Interview.starts_at < starts_at,
+                                     and_(Interview.starts_at == starts_at, Interview.id < ident)))
+    else:
+        later = order == 'asc'
+
+    direction = 'asc' if later else 'desc'
+    rows = query.order_by(getattr(Interview.starts_at, direction)(), getattr(Interview.id, direction)())\
+        .limit(per_page + 1).all()
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+
+    next_cursor = prev_cursor = None
+    if rows:
+        first, last = rows[0], rows[-1]
+        if (more if forward else position is not None):
+            next_cursor = encode_cursor(order, last.starts_at, last.id, 'n')
+        if (position is not None if forward else more):
+            prev_cursor = encode_cursor(order, first.starts_at, first.id, 'p')
+    return KeysetPage(rows, per_page, next_cursor, prev_cursor)
+
+def _int(value):
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+def render_board(template, options=HR_OPTIONS, interviewer_id=None, **context):
+    # Filters come from ?hr_id=&interviewer_id= (unless the caller fixes the interviewer), the
+    # window from ?window=today|week|range&from=&to=, the order from ?order=asc|desc, the page from ?cursor=
+    args = request.args
+    scheduler_id = _int(args.get('hr_id'))
+    interviewer_id = interviewer_id or _int(args.get('interviewer_id'))
+    span = window(args.get('window'), args.get('from'), args.get('to'))
+    order = args.get('order') if args.get('order') in ('asc', 'desc') else 'asc'
+    pagination = interview_board(span, scheduler_id, interviewer_id, order, args.get('cursor'),
+                                 current_app.config['INTERVIEW_BOARD_PAGE_SIZE'], options)
+    return render_template(template, interviews=pagination.items, pagination=pagination, window=span,
+                           order=order, scheduler_id=scheduler_id, interviewer_id=interviewer_id, **context)
@@ -0,0 +1,95 @@
+from flask import current_app
+from myapp.integrations import imocha
+import threading
+import time
+import requests
+
+# iMocha test catalogue (tests and their test links) cached per process. An entry is fresh
+# for IMOCHA_CATALOGUE_TTL seconds; after that it is still served for up to
+# IMOCHA_CATALOGUE_STALE seconds while one background thread refetches it
+# (stale-while-revalidate), and it is also served if iMocha fails. Only a missing or
+# fully expired entry makes a request wait on iMocha. refresh() forces a refetch.
+
+class Catalogue:
+    def __init__(self, app):
+        self.app = app
+        self.entries = {}
+        self.refreshing = set()
+        self.lock = threading.Lock()
+
+    def get(self, key, fetch):
+        ttl = self.app.config['IMOCHA_CATALOGUE_TTL']
+        stale = self.app.config['IMOCHA_CATALOGUE_STALE']
+        entry = self.entries.get(key)
+        age = time.monotonic() - entry[0] if entry else None
+
+        if entry and age < ttl:
+            return entry[1]
+        if entry and age < ttl + stale:
+            self._revalidate(key, fetch)
+            return entry[1]
+        try:
+            return self._fetch(key, fetch)
+        except requests.RequestException:
+            if entry:
+                current_app.logger.warning(f"iMocha unavailable, serving expired catalogue entry {key}")
+                return entry[1]
+            raise
+
+    def _fetch(self, key, fetch):
+        value = fetch()
+        self.entries[key] = (time.monotonic(), value)
+        return value
+
+    def _revalidate(self, key, fetch):
+        with self.lock:
+            if key in self.refreshing:
+                return
+            self.refreshing.add(key)
+
+        def run():
+            with self.app.app_context():
+                try:
+                    self._fetch(key, fetch)
+                except Exception as e:
+                    self.app.logger.warning(f"Background refresh of catalogue entry {key} failed: {e}")
+                finally:
+                    with self.lock:
+                        self.refreshing.discard(key)
+
+        threading.Thread(target=run, name='catalogue-refresh', daemon=True).start()
+
+    def refresh(self):
+        # Refetch the test list now and drop cached links so they are fetched on next use
+        self.entries = {key: entry for key, entry in self.entries.items() if key == 'tests'}
+        return self._fetch('tests', fetch_tests)
+
+def fetch_tests():
+    response = imocha().get('tests')
+    response.raise_for_status()
+    return {test["testId"]: test["testName"] for test in response.json()["tests"]}
+
+def fetch_test_links(test_id):
+    response = imocha().get(f'tests/{test_id}/testlinks', endpoint='tests/{id}/testlinks')
+    response.raise_for_status()
+    return {
+        link["testLinkId"]: link.get("testLinkName", "Unnamed Link")
+        for link in response.json().get("testLinks", [])
+    }
+
+def _catalogue():
+    extensions = current_app.extensions
+    if 'imocha_catalogue' not in extensions:
+        extensions['imocha_catalogue'] = Catalogue(current_app._get_current_object())
+    return extensions['imocha_catalogue']
+
+def tests():
+    # testId -> testName
+    return _catalogue().get('tests', fetch_tests)
+
+def test_links(test_id):
+    # testLinkId -> testLinkName for one test
+    return _catalogue().get(('testlinks', test_id), lambda: fetch_test_links(test_id))
+
+def refresh():
+    return _catalogue().refresh()
@@ -1,24 +1,47 @@
 from datetime import timedelta
 from pathlib import Path
 from dotenv import load_dotenv
-import secrets
 import os
 
 env_path = Path(__file__).resolve().parent / '.env'
 load_dotenv(dotenv_path=env_path, override=True)
 
 class Config:
-    SECRET_KEY = secrets.token_hex(32)
+    # Signs session cookies; must be the same on every worker and node (see myapp.sessions)
+    SECRET_KEY = os.getenv("SECRET_KEY")
     SQLALCHEMY_DATABASE_URI = os.getenv("SQLALCHEMY_DATABASE_URI")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     PERMANENT_SESSION_LIFETIME = timedelta(minutes=30)
-    SESSION_TYPE = 'filesystem'
+    # Session storage: 'sql', 'redis' (SESSION_REDIS_URL) or 'local' (one process only)
+    SESSION_BACKEND = os.getenv("SESSION_BACKEND", "sql")
+    SESSION_REDIS_URL = os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0")
+    SESSION_KEY_PREFIX = 'session:'
+    SESSION_GC_INTERVAL = 600
     SESSION_PERMANENT = True
     SESSION_USE_SIGNER = True
     SESSION_COOKIE_SECURE = False
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
-    SESSION_REFRESH_EACH_REQUEST = True
+    # Unchanged sessions are written back (and their expiry extended) at most this often, in seconds
+    SESSION_REFRESH_INTERVAL = 300
+    # Signed cookie telling main.check_session when the session expires, without loading it
+    SESSION_HEARTBEAT_COOKIE = 'session_expires'
+    REFDATA_TTL = int(os.getenv("REFDATA_TTL", 300))
+    # Signed-in user identities (see myapp.identity). Without IDENTITY_REDIS_URL each worker
+    # keeps its own, so a role change or deletion reaches other workers and nodes only when
+    # their copy expires, up to IDENTITY_TTL seconds later: keep the TTL short, or set the
+    # URL when running more than one worker
+    IDENTITY_TTL = int(os.getenv("IDENTITY_TTL", 5))
+    IDENTITY_REDIS_URL = os.getenv("IDENTITY_REDIS_URL")
+
+    # Application log: a rotating file for the development server, '-' for stderr (gunicorn)
+    LOG_FILE = os.getenv("LOG_FILE", "logs/app.log")
+    # Number of proxies in front of the app that set X-Forwarded-*; 0 when clients connect directly
+    PROXY_COUNT = int(os.getenv("PROXY_COUNT", 0))
+
+    # Per-request query count/DB time headers and N+1 warnings (see myapp.querystats)
+    SQL_STATS = os.getenv("SQL_STATS", "1") == "1"
+    SQL_REPEAT_THRESHOLD = 5
 
     MS_CLIENT_ID = os.getenv("CLIENT_ID")
     MS_CLIENT_SECRET = os.getenv("CLIENT_SECRET")
@@ -31,9 +54,58 @@ class Config:
         "Mail.Send",
         "OnlineMeetings.ReadWrite"
     ]
+    GRAPH_API_URL = os.getenv("GRAPH_API_URL", "https://graph.microsoft.com/v1.0")
+
+    IMOCHA_API_URL = os.getenv("IMOCHA_API_URL", "https://apiv3.imocha.io/v3")
+    IMOCHA_API_KEY = os.getenv("IMOCHA_API_KEY")
+
+    # Upstream HTTP clients (see myapp.integrations)
+    HTTP_CONNECT_TIMEOUT = 3.05
+    HTTP_READ_TIMEOUT = 15
+    HTTP_POOL_SIZE = 10
+
+    # iMocha test/test-link lists: fresh for TTL seconds, then served stale while refetched
+    IMOCHA_CATALOGUE_TTL = 3600
+    IMOCHA_CATALOGUE_STALE = 86400
+
+    # Background ingestion of completed iMocha reports (see myapp.results)
+    RESULTS_POLLER = True
+    RESULTS_POLL_INTERVAL = 300
+    RESULTS_CONCURRENCY = 4
+    RESULTS_MAX_AGE_DAYS = 30
+
+    # Interview length and the gap kept around each one, in minutes, and the hours and
+    # weekdays (Monday is 0) free slots are searched in (see myapp.availability)
+    INTERVIEW_DURATION = 60
+    INTERVIEW_BUFFER = 0
+    INTERVIEW_DAY_START = '09:00'
+    INTERVIEW_DAY_END = '18:00'
+    INTERVIEW_WEEKDAYS = (0, 1, 2, 3, 4)
+    # Suggested slots start on multiples of this many minutes; searches cover at most MAX_DAYS
+    INTERVIEW_SLOT_STEP = 30
+    INTERVIEW_SLOT_MAX_DAYS = 31
+    INTERVIEW_SLOT_MAX_RESULTS = 50
+    # Interview board (see myapp.board): rows per page, and the longest custom date range
+    INTERVIEW_BOARD_PAGE_SIZE = 25
+    INTERVIEW_BOARD_MAX_DAYS = 92
+    # Interviewers' iCalendar feeds (see myapp.ics): the zone interview times are in, and how far back they go
+    CALENDAR_TIMEZONE = 'Asia/Kolkata'
+    CALENDAR_FEED_PAST_DAYS = 30
+
+    # Outbound calendar invites (see myapp.outbox)
+    OUTBOX_WORKER = True
+    OUTBOX_WORKERS = 4
+    OUTBOX_POLL_INTERVAL = 5
+    OUTBOX_MAX_ATTEMPTS = 8
+    OUTBOX_BACKOFF = 5
+    OUTBOX_MAX_BACKOFF = 900
+    OUTBOX_LEASE = 120
 
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    OUTBOX_WORKER = False
+    RESULTS_POLLER = False
+    SESSION_BACKEND = 'local'
     SECRET_KEY = 'test-key'
\ No newline at end of file
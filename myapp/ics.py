@@ -0,0 +1,143 @@
+from flask import current_app, request, url_for
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import event, insert, inspect, update
+from sqlalchemy.dialects import postgresql, sqlite
+from werkzeug.http import is_resource_modified
+from myapp.extensions import db
+from myapp.models.applicants import Applicant
+from myapp.models.calendar_feeds import CalendarFeed
+from myapp.models.interviews import Interview
+from datetime import date, datetime, timedelta
+from pytz import timezone, utc
+import threading
+
+# Per-interviewer iCalendar feeds, for calendar clients to subscribe to. The feed URL
+# carries the interviewer's id signed with SECRET_KEY (feed_url()), so it works without a
+# session; anyone holding it can read that interviewer's schedule. A feed lists the
+# interviewer's interviews from CALENDAR_FEED_PAST_DAYS ago onwards.
+#
+# Every flush that adds, changes or deletes an interview bumps the calendar_feeds row of
+# its interviewer (both of them, when it is reassigned) in the same transaction, with one
+# upsert, so two transactions booking an interviewer's first interviews at once both count
+# instead of racing to create the row. The row's
+# version and time are the feed's ETag and Last-Modified, so a conditional GET that finds
+# nothing new costs one primary-key lookup and returns 304. Each process keeps the last
+# body it built per interviewer and rebuilds it, from one indexed query, only when that
+# interviewer's version has moved; a change to one interviewer's interviews leaves every
+# other feed's cache alone.
+
+UID_DOMAIN = 'interviews.hr-recruitment'
+EPOCH = datetime(1970, 1, 1)
+
+_lock = threading.Lock()
+
+_UPSERT = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+@event.listens_for(db.session, 'before_flush')
+def bump_feeds(session, flush_context, instances):
+    interviewer_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Interview) and (obj not in session.dirty or session.is_modified(obj)):
+            interviewer_ids.add(obj.interviewer_id)
+            interviewer_ids.update(inspect(obj).attrs.interviewer_id.history.deleted)
+    interviewer_ids = {int(i) for i in interviewer_ids if i is not None}
+    if not interviewer_ids:
+        return
+
+    table = CalendarFeed.__table__
+    bump = {'version': table.c.version + 1, 'updated_at': datetime.utcnow()}  # in SQL, so concurrent bumps both count
+    conn = session.connection()
+    upsert = _UPSERT.get(conn.dialect.name)
+    for interviewer_id in sorted(interviewer_ids):
+        values = {'interviewer_id': interviewer_id, 'version': 1, 'updated_at': bump['updated_at']}
+        if upsert is not None:
+            conn.execute(upsert(table).values(values).on_conflict_do_update(index_elements=[table.c.interviewer_id], set_=bump))
+        elif not conn.execute(update(table).where(table.c.interviewer_id == interviewer_id).values(bump)).rowcount:
+            conn.execute(insert(table).values(values))
+
+def _serializer():
+    return URLSafeSerializer(current_app.secret_key, salt='interviewer-calendar')
+
+def feed_url(interviewer_id):
+    return url_for('interviewer.calendar_feed', token=_serializer().dumps(interviewer_id), _external=True)
+
+def interviewer_for(token):
+    try:
+        return int(_serializer().loads(token))
+    except (BadSignature, TypeError, ValueError):
+        return None
+
+def _cache():
+    return current_app.extensions.setdefault('ics', {})
+
+def _text(value):
+    return str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+def _fold(line):
+    # Content lines are at most 75 octets; longer ones continue on lines starting with a space
+    data, parts = line.encode(), []
+    while len(data) > 75:
+        cut = 75 if not parts else 74
+        while cut and (data[cut] & 0xC0) == 0x80:  # not inside a UTF-8 sequence
+            cut -= 1
+        parts.append(data[:cut])
+        data = data[cut:]
+    parts.append(data)
+    return b'\r\n '.join(parts).decode()
+
+def render(interviewer_id, first_day, stamp):
+    local = timezone(current_app.config['CALENDAR_TIMEZONE'])
+
+    def utc_time(moment):
+        return local.localize(moment).astimezone(utc).strftime('%Y%m%dT%H%M%SZ')
+
+    rows = db.session.query(
+        Interview.id, Interview.applicant_id, Interview.round_number, Interview.starts_at, Interview.ends_at,
+        Interview.completed, Applicant.name,
+    ).outerjoin(Applicant, Applicant.id == Interview.applicant_id).filter(
+        Interview.interviewer_id == interviewer_id,
+        Interview.date >= first_day,
+        Interview.starts_at.isnot(None),
+    ).order_by(Interview.starts_at, Interview.id)
+
+    lines = ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//HR Recruitment//Interviews//EN',
+             'CALSCALE:GREGORIAN', 'METHOD:PUBLISH', 'X-WR-CALNAME:Interviews']
+    for row in rows:
+        lines += [
+            'BEGIN:VEVENT',
+            f'UID:interview-{row.id}@{UID_DOMAIN}',
+            f'DTSTAMP:{stamp.strftime("%Y%m%dT%H%M%SZ")}',
+            f'DTSTART:{utc_time(row.starts_at)}',
+            f'DTEND:{utc_time(row.ends_at)}',
+            'SUMMARY:' + _text(f'{row.round_number or "Interview"} with {row.name or "applicant"}'),
+            'URL:' + url_for('interviewer.view_interviewee', id=row.applicant_id, _external=True),
+            'STATUS:CONFIRMED',
+            'END:VEVENT',
+        ]
+    lines.append('END:VCALENDAR')
+    return ''.join(_fold(line) + '\r\n' for line in lines)
+
+def response(interviewer_id):
+    first_day = date.today() - timedelta(days=current_app.config['CALENDAR_FEED_PAST_DAYS'])
+    version, updated_at = db.session.query(CalendarFeed.version, CalendarFeed.updated_at)\
+        .filter(CalendarFeed.interviewer_id == interviewer_id).first() or (0, EPOCH)
+    # The window moves daily, which changes the feed even when no interview did
+    etag = f'{interviewer_id}-{version}-{first_day.isoformat()}'
+    last_modified = max(updated_at, datetime.combine(first_day, datetime.min.time())).replace(microsecond=0)
+
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        result = current_app.response_class(status=304)
+    else:
+        cached = _cache().get(interviewer_id)
+        if cached is not None and cached[0] == etag:
+            body = cached[1]
+        else:
+            body = render(interviewer_id, first_day, last_modified)
+            with _lock:
+                _cache()[interviewer_id] = (etag, body)
+        result = current_app.response_class(body, mimetype='text/calendar')
+    result.set_etag(etag)
+    result.last_modified = last_modified
+    result.cache_control.private = True
+    result.cache_control.no_cache = True  # clients may keep it, but must revalidate
+    return result
@@ -0,0 +1,107 @@
+from flask import current_app
+from flask_login import UserMixin
+from myapp.extensions import db
+from myapp.models.users import User
+import json
+import threading
+import time
+
+# Signed-in user identity for login_manager.user_loader. Flask-Login loads the user on
+# every authenticated request; instead of a users query each time, the columns views and
+# templates read from current_user are kept as an immutable Identity for IDENTITY_TTL
+# seconds, under the user's id and a version stamp. admin.change_role, change_password
+# and delete_user and the self-service password change call invalidate() after
+# committing, which bumps the version, so role checks see the change on the next request.
+#
+# Versions and identities live in a store: by default one per process, so other workers
+# see an invalidation only once their entry's TTL runs out, which is why IDENTITY_TTL is
+# only a few seconds by default (a demoted or deleted user keeps their old role there
+# until then); with IDENTITY_REDIS_URL set, they are shared and every worker sees it at
+# once, for one Redis read per request.
+# current_user is not an ORM instance: link rows to it by id (created_by_id=current_user.id).
+
+FIELDS = ('id', 'name', 'username', 'email', 'role', 'auth_type', 'is_superuser', 'password_changed')
+COLUMNS = tuple(getattr(User, field) for field in FIELDS)
+
+class Identity(UserMixin):
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Identity is read-only; update the User row and call identity.invalidate({self.id})")
+
+    def __repr__(self):
+        return f"<Identity {self.id} {self.username} {self.role}>"
+
+class LocalStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.versions = {}
+        self.entries = {}
+
+    def version(self, user_id):
+        return self.versions.get(user_id, 0)
+
+    def bump(self, user_id):
+        with self.lock:
+            self.versions[user_id] = self.versions.get(user_id, 0) + 1
+            self.entries.pop(user_id, None)
+
+    def get(self, user_id, version):
+        entry = self.entries.get(user_id)
+        if entry and entry[0] == version and entry[1] > time.monotonic():
+            return entry[2]
+        return None
+
+    def set(self, user_id, version, values, ttl):
+        with self.lock:
+            if self.versions.get(user_id, 0) == version:  # not if invalidated meanwhile
+                self.entries[user_id] = (version, time.monotonic() + ttl, values)
+
+class RedisStore:
+    def __init__(self, client):
+        self.client = client
+
+    def version(self, user_id):
+        return int(self.client.get(f'identity:version:{user_id}') or 0)
+
+    def bump(self, user_id):
+        self.client.incr(f'identity:version:{user_id}')
+
+    def get(self, user_id, version):
+        values = self.client.get(f'identity:{user_id}:{version}')
+        return json.loads(values) if values else None
+
+    def set(self, user_id, version, values, ttl):
+        # Keyed by version, so an entry written after an invalidation is simply never read
+        self.client.set(f'identity:{user_id}:{version}', json.dumps(values), ex=ttl)
+
+def _store():
+    store = current_app.extensions.get('identity')
+    if store is None:
+        url = current_app.config.get('IDENTITY_REDIS_URL')
+        if url:
+            import redis  # only needed, and only installed, where IDENTITY_REDIS_URL is set
+            store = RedisStore(redis.from_url(url))
+        else:
+            store = LocalStore()
+        store = current_app.extensions.setdefault('identity', store)
+    return store
+
+def load(user_id):
+    ttl = current_app.config['IDENTITY_TTL']
+    store = _store()
+    version = store.version(user_id)
+    values = store.get(user_id, version) if ttl > 0 else None
+    if values is None:
+        row = db.session.query(*COLUMNS).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        values = dict(zip(FIELDS, row))
+        if ttl > 0:
+            store.set(user_id, version, values, ttl)
+    return Identity(**values)
+
+def invalidate(user_id):
+    # Call after committing a change to the user's row (role, password, deletion)
+    _store().bump(user_id)
@@ -0,0 +1,146 @@
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import deque
+import threading
+import time
+import requests
+
+# HTTP clients for the upstream services (iMocha, Microsoft Graph). Each app holds one
+# client per upstream with a pooled keep-alive requests.Session, so calls reuse open TLS
+# connections instead of handshaking each time. Every call has connect/read timeouts;
+# idempotent requests are retried on connection errors and 429/502/503/504, but a read
+# timeout is never retried, so a call costs at most about one read timeout.
+# Latency is recorded per endpoint label, e.g. 'tests/{id}/invite' rather than the
+# concrete URL, and can be read with metrics(). Credentials come from the environment only;
+# a client whose credentials are missing is never built, and calls through it raise
+# NotConfigured, a RequestException, so callers handle it like an unreachable upstream.
+
+class NotConfigured(requests.RequestException):
+    pass
+
+class EndpointStats:
+    def __init__(self, samples=1024):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=samples)
+
+    def record(self, elapsed, failed):
+        with self.lock:
+            self.count += 1
+            self.errors += failed
+            self.total += elapsed
+            self.max = max(self.max, elapsed)
+            self.samples.append(elapsed)
+
+    def snapshot(self):
+        with self.lock:
+            ordered = sorted(self.samples)
+            count, errors, total, slowest = self.count, self.errors, self.total, self.max
+
+        def percentile(p):
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 1) if ordered else None
+
+        return {
+            'count': count,
+            'errors': errors,
+            'mean_ms': round(total / count * 1000, 1) if count else None,
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'max_ms': round(slowest * 1000, 1),
+        }
+
+class UpstreamClient:
+    def __init__(self, name, base_url, headers=None, timeout=(3.05, 15), retries=2, pool_size=10):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.stats = {}
+        self.stats_lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=retries,
+                read=False,
+                backoff_factor=0.3,
+                status_forcelist=(429, 502, 503, 504),
+                allowed_methods=frozenset({'GET', 'HEAD', 'OPTIONS'}),
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _stats_for(self, endpoint):
+        stats = self.stats.get(endpoint)
+        if stats is None:
+            with self.stats_lock:
+                stats = self.stats.setdefault(endpoint, EndpointStats())
+        return stats
+
+    def request(self, method, path, endpoint=None, **kwargs):
+        # `endpoint` labels the call in the metrics; defaults to the path
+        kwargs.setdefault('timeout', self.timeout)
+        started = time.perf_counter()
+        failed = True
+        try:
+            response = self.session.request(method, f'{self.base_url}/{path.lstrip("/")}', **kwargs)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            self._stats_for(f'{method} {endpoint or path}').record(elapsed, failed)
+            current_app.logger.debug(f"{self.name} {method} {endpoint or path} took {elapsed * 1000:.0f} ms")
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def metrics(self):
+        return {endpoint: stats.snapshot() for endpoint, stats in sorted(self.stats.items())}
+
+    def close(self):
+        self.session.close()
+
+def _build(name):
+    config = current_app.config
+    timeout = (config['HTTP_CONNECT_TIMEOUT'], config['HTTP_READ_TIMEOUT'])
+    if name == 'imocha':
+        if not config.get('IMOCHA_API_KEY'):
+            raise NotConfigured('IMOCHA_API_KEY is not set')
+        return UpstreamClient('imocha', config['IMOCHA_API_URL'], timeout=timeout, pool_size=config['HTTP_POOL_SIZE'],
+                              headers={'X-API-KEY': config['IMOCHA_API_KEY'], 'Content-Type': 'application/json'})
+    if name == 'graph':
+        # No transport-level retries: Graph writes go through the outbox, which retries itself
+        return UpstreamClient('graph', config['GRAPH_API_URL'], timeout=timeout, retries=0,
+                              pool_size=config['HTTP_POOL_SIZE'], headers={'Content-Type': 'application/json'})
+    raise KeyError(name)
+
+_lock = threading.Lock()
+
+def client(name):
+    clients = current_app.extensions.setdefault('integrations', {})
+    if name not in clients:
+        with _lock:
+            if name not in clients:
+                clients[name] = _build(name)
+    return clients[name]
+
+def imocha():
+    return client('imocha')
+
+def graph():
+    return client('graph')
+
+def metrics():
+    return {name: upstream.metrics() for name, upstream in current_app.extensions.get('integrations', {}).items()}
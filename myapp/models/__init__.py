@@ -3,4 +3,8 @@ from .recruitment_history import RecruitmentHistory
 from .users import User
 from .interviews import Interview
 from .referrals import Referral
-from .jobrequirement import JobRequirement
\ No newline at end of file
+from .jobrequirement import JobRequirement
+from .outbox import OutboxMessage
+from .sessions import StoredSession
+from .tokens import MicrosoftTokenCache
+from .calendar_feeds import CalendarFeed
@@ -53,3 +53,11 @@ class Applicant(db.Model):
     referrer = db.relationship("User", foreign_keys=[referred_by], back_populates="referred_applicants")
     job = db.relationship("JobRequirement", foreign_keys=[job_id],backref="applicants")
     test_results = db.relationship("TestResult", back_populates="applicant")
+
+# Access paths of the applicant listings: newest first (myapp.pagination's default keyset
+# order, last_applied DESC, id DESC), optionally narrowed to one stage, uploader or job.
+# On Postgres the migration declares last_applied DESC NULLS LAST to match that order exactly.
+db.Index('ix_applicants_last_applied_id', Applicant.last_applied.desc(), Applicant.id.desc())
+db.Index('ix_applicants_status_last_applied', Applicant.status, Applicant.last_applied.desc(), Applicant.id.desc())
+db.Index('ix_applicants_uploaded_by_last_applied', Applicant.uploaded_by, Applicant.last_applied.desc(), Applicant.id.desc())
+db.Index('ix_applicants_job_id_last_applied', Applicant.job_id, Applicant.last_applied.desc(), Applicant.id.desc())
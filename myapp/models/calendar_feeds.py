@@ -0,0 +1,11 @@
+from myapp.extensions import db
+from datetime import datetime
+
+class CalendarFeed(db.Model):
+    __tablename__ = 'calendar_feeds'
+
+    # Bumped in the same transaction as any change to one of the interviewer's interviews, so
+    # every worker agrees on the feed's ETag and Last-Modified (see myapp.ics)
+    interviewer_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
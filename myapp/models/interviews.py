@@ -1,21 +1,70 @@
 from myapp.extensions import db
-from sqlalchemy import Time
+from sqlalchemy import DDL, Time, event
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
+
+# Pending interviews of one interviewer may not overlap. starts_at/ends_at are derived
+# from date and time (see myapp.availability) and the rule is enforced by the database
+# at write time: on Postgres by a GiST exclusion constraint over (interviewer_id,
+# tsrange(starts_at, ends_at)), which needs btree_gist for the `=` on interviewer_id; on
+# SQLite, which has neither, by triggers running the same overlap test on the same rows
+# (completed is never NULL, so `completed = false` means the same thing on both). Both
+# report a violation under the name interviews_no_overlap.
 
 class Interview(db.Model):
     __tablename__ = 'interviews'
 
     id = db.Column(db.Integer, primary_key=True)
-    applicant_id = db.Column(db.Integer, db.ForeignKey('applicants.id'))
+    applicant_id = db.Column(db.Integer, db.ForeignKey('applicants.id'), index=True)
     interviewer_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     scheduler_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     round_number = db.Column(db.Text)
     date = db.Column(db.Date)
     time = db.Column(Time)
+    starts_at = db.Column(db.DateTime)
+    ends_at = db.Column(db.DateTime)
     feedback = db.Column(db.Text)
-    completed = db.Column(db.Boolean, default=False)
+    completed = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
     job_id = db.Column(db.Integer, db.ForeignKey('jobrequirement.id'))
-    
+
+    __table_args__ = (
+        # Availability checks: one interviewer's (or a set of interviewers') bookings on a date
+        db.Index('ix_interviews_interviewer_id_date', 'interviewer_id', 'date'),
+        # The interview board (myapp.board) only lists open interviews, in (starts_at, id) order,
+        # for everyone, one scheduler or one interviewer; these cover just the completed = false rows
+        db.Index('ix_interviews_pending_starts_at', 'starts_at', 'id',
+                 postgresql_where=db.text('completed = false'), sqlite_where=db.text('completed = 0')),
+        db.Index('ix_interviews_pending_scheduler_starts_at', 'scheduler_id', 'starts_at', 'id',
+                 postgresql_where=db.text('completed = false'), sqlite_where=db.text('completed = 0')),
+        db.Index('ix_interviews_pending_interviewer_starts_at', 'interviewer_id', 'starts_at', 'id',
+                 postgresql_where=db.text('completed = false'), sqlite_where=db.text('completed = 0')),
+        ExcludeConstraint(
+            ('interviewer_id', '='), (db.func.tsrange(starts_at, ends_at), '&&'),
+            name='interviews_no_overlap', using='gist',
+            where=db.text('completed = false AND starts_at IS NOT NULL'),
+        ).ddl_if(dialect='postgresql'),
+    )
+
     job = db.relationship("JobRequirement", back_populates="interviews")
     applicant = db.relationship("Applicant", back_populates="interviews")
     interviewer = db.relationship("User", foreign_keys=[interviewer_id], back_populates="interviews_as_interviewer")
-    scheduler = db.relationship("User", foreign_keys=[scheduler_id], back_populates="scheduled_interviews")
\ No newline at end of file
+    scheduler = db.relationship("User", foreign_keys=[scheduler_id], back_populates="scheduled_interviews")
+
+_OVERLAP = """
+    WHEN NEW.completed = 0 AND NEW.starts_at IS NOT NULL
+    BEGIN
+        SELECT RAISE(ABORT, 'interviews_no_overlap: the interviewer already has an interview at that time')
+        WHERE EXISTS (
+            SELECT 1 FROM interviews
+            WHERE interviewer_id = NEW.interviewer_id AND completed = 0 AND id IS NOT NEW.id
+              AND starts_at < NEW.ends_at AND NEW.starts_at < ends_at
+        );
+    END
+"""
+
+event.listen(Interview.__table__, 'before_create',
+             DDL('CREATE EXTENSION IF NOT EXISTS btree_gist').execute_if(dialect='postgresql'))
+event.listen(Interview.__table__, 'after_create',
+             DDL('CREATE TRIGGER interviews_no_overlap_insert BEFORE INSERT ON interviews' + _OVERLAP).execute_if(dialect='sqlite'))
+event.listen(Interview.__table__, 'after_create',
+             DDL('CREATE TRIGGER interviews_no_overlap_update BEFORE UPDATE OF interviewer_id, starts_at, ends_at, completed '
+                 'ON interviews' + _OVERLAP).execute_if(dialect='sqlite'))
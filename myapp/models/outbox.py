@@ -0,0 +1,33 @@
+from myapp.extensions import db
+from datetime import datetime
+
+class OutboxMessage(db.Model):
+    __tablename__ = 'outbox'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    idempotency_key = db.Column(db.String(64), unique=True, nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_until = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    external_id = db.Column(db.Text)
+    applicant_id = db.Column(db.Integer, db.ForeignKey('applicants.id', ondelete='SET NULL'), index=True)
+    interview_id = db.Column(db.Integer, db.ForeignKey('interviews.id', ondelete='SET NULL'))
+    created_by_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'))
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+    applicant = db.relationship("Applicant")
+    interview = db.relationship("Interview")
+    created_by = db.relationship("User")
+
+    @property
+    def is_settled(self):
+        return self.status in ('sent', 'failed')
@@ -1,5 +1,5 @@
 from myapp.extensions import db
-from sqlalchemy import event, Time
+from sqlalchemy import Time
 from datetime import date, datetime, time
 from myapp.models.interviews import Interview
 
@@ -31,7 +31,7 @@ class RecruitmentHistory(db.Model):
     __tablename__ = 'recruitment_history'
 
     id = db.Column(db.Integer, primary_key=True)
-    applicant_id = db.Column(db.Integer, db.ForeignKey('applicants.id'), nullable=False)
+    applicant_id = db.Column(db.Integer, db.ForeignKey('applicants.id'), nullable=False, index=True)
     applied_date = db.Column(db.Date)
     test_date = db.Column(db.Date)
     test_time = db.Column(Time)
@@ -60,68 +60,50 @@ class RecruitmentHistory(db.Model):
         return f"{interview_type} scheduled on {date.strftime('%Y-%m-%d')} at {time_str} with {interviewer}"
 
     def compute_current_stage(self):
-        today = date.today()
-        applicant = self.applicant
-
-        # Priority overrides
-        if applicant.status == "Rejected" or self.rejected:
-            return "Rejected"
-        if applicant.status == "Joined":
-            return "Joined"
-        if applicant.status == "Offered":
-            return "Offered"
-        if applicant.status == "On Hold":
-            return "On Hold"
-
-        # Latest interviews
-        latest_hr = Interview.query.filter_by(applicant_id=self.applicant_id, round_number='HR') \
-            .order_by(Interview.id.desc()).first()
-        latest_round2 = Interview.query.filter(
-            Interview.applicant_id == self.applicant_id,
-            Interview.round_number.in_(['Round 2', 'Client Round 2'])
-        ).order_by(Interview.id.desc()).first()
-        latest_round1 = Interview.query.filter(
-            Interview.applicant_id == self.applicant_id,
-            Interview.round_number.in_(['Round 1', 'Client Round 1'])
-        ).order_by(Interview.id.desc()).first()
-
-        # HR Round
-        if self.hr_round_date and not self.hr_round_comments:
-            return "HR Round Scheduled"
-        if self.hr_round_comments:
-            return "HR Round Completed"
-
-        # Interview Round 2
-        if self.interview_round_2_date and not self.interview_round_2_comments:
-            return "Interview Round 2 Scheduled"
-        if self.interview_round_2_comments and not self.hr_round_date:
-            return "Interview Round 2 Completed"
-
-        # Interview Round 1
-        if self.interview_round_1_date and not self.interview_round_1_comments:
-            return "Interview Round 1 Scheduled"
-        if self.interview_round_1_comments and not self.interview_round_2_date:
-            return "Interview Round 1 Completed"
-
-        # Test
-        if self.test_date:
-            if not self.test_result:
-                return "Test Scheduled"
-            elif self.test_result and not self.interview_round_1_date:
-                return "Test Completed"
-
-        # Fallbacks
-        if not self.test_date and not self.interview_round_1_date:
-            return "Need to Schedule Test or Interview"
-
-        return "In Progress"
-
-@event.listens_for(RecruitmentHistory, 'after_update')
-def after_history_update(mapper, connection, target):
-    from myapp.models.applicants import Applicant
-    new_stage = target.compute_current_stage()
-    connection.execute(
-        Applicant.__table__.update()
-        .where(Applicant.id == target.applicant_id)
-        .values(current_stage=new_stage)
-    )   
\ No newline at end of file
+        return derive_stage(self.applicant.status, self)
+
+def derive_stage(status, history):
+    # Stage from the applicant's status and one history record. `history` may be a
+    # RecruitmentHistory or any row exposing the same column names, so stages can be
+    # derived in bulk from a single query (see myapp.stages).
+
+    # Priority overrides
+    if status == "Rejected" or history.rejected:
+        return "Rejected"
+    if status == "Joined":
+        return "Joined"
+    if status == "Offered":
+        return "Offered"
+    if status == "On Hold":
+        return "On Hold"
+
+    # HR Round
+    if history.hr_round_date and not history.hr_round_comments:
+        return "HR Round Scheduled"
+    if history.hr_round_comments:
+        return "HR Round Completed"
+
+    # Interview Round 2
+    if history.interview_round_2_date and not history.interview_round_2_comments:
+        return "Interview Round 2 Scheduled"
+    if history.interview_round_2_comments and not history.hr_round_date:
+        return "Interview Round 2 Completed"
+
+    # Interview Round 1
+    if history.interview_round_1_date and not history.interview_round_1_comments:
+        return "Interview Round 1 Scheduled"
+    if history.interview_round_1_comments and not history.interview_round_2_date:
+        return "Interview Round 1 Completed"
+
+    # Test
+    if history.test_date:
+        if not history.test_result:
+            return "Test Scheduled"
+        elif history.test_result and not history.interview_round_1_date:
+            return "Test Completed"
+
+    # Fallbacks
+    if not history.test_date and not history.interview_round_1_date:
+        return "Need to Schedule Test or Interview"
+
+    return "In Progress"
@@ -10,9 +10,15 @@ class Referral(db.Model):
     referred_by = db.Column(db.Text)
     referral_date = db.Column(db.Date)
     cv_file_path = db.Column(db.Text)
-    job_id = db.Column(db.Integer, db.ForeignKey('jobrequirement.id'), nullable = True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobrequirement.id'), nullable = True, index=True)
     is_fresher = db.Column(db.Boolean, default = False)
     is_external_referrer = db.Column(db.Boolean, default = False)
+
+    __table_args__ = (
+        # "My referrals" pages: one referrer's referrals, newest first
+        db.Index('ix_referrals_referrer_id_referral_date', 'referrer_id', 'referral_date'),
+    )
+
     job = db.relationship("JobRequirement", backref="referrals")
     applicant = db.relationship("Applicant", back_populates="referred_candidate")
     applicant_id = db.Column(db.Integer, db.ForeignKey('applicants.id'), nullable=True)
@@ -0,0 +1,9 @@
+from myapp.extensions import db
+
+class StoredSession(db.Model):
+    __tablename__ = 'sessions'
+
+    # id is the session store key (key prefix + session id), data the serialized session
+    id = db.Column(db.String(255), primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    expiry = db.Column(db.DateTime, nullable=False, index=True)
@@ -16,6 +16,7 @@ class TestResult(db.Model):
     test_name  = db.Column(db.String(100), nullable = False)
     pdf_link = db.Column(db.String(200), nullable = False)
     sections = db.Column(db.Text, nullable = False)
+    report = db.Column(db.JSON)
     applicant_id = db.Column(db.Integer, db.ForeignKey('applicants.id'), nullable=False)
 
     applicant = db.relationship("Applicant", back_populates="test_results")
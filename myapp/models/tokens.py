@@ -0,0 +1,10 @@
+from myapp.extensions import db
+from datetime import datetime
+
+class MicrosoftTokenCache(db.Model):
+    __tablename__ = 'ms_token_caches'
+
+    # One serialized MSAL token cache per user who signed in with Microsoft (see myapp.auth.helpers)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    cache = db.Column(db.Text, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,242 @@
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import and_, or_, update
+from myapp.extensions import db
+from myapp.models.outbox import OutboxMessage
+from myapp.integrations import graph
+from myapp.auth.helpers import graph_token
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+import click
+import random
+import requests
+import threading
+import uuid
+
+# Outbound integration queue. Routes enqueue() a message in the same transaction as the
+# change it announces and return straight away; the OutboxWorker claims due messages,
+# sends them from a small thread pool and records the outcome on the row, which is what
+# the UI shows. Failed sends are retried with exponential backoff; every message carries
+# an idempotency key so a retry after a lost response never creates a second event.
+#
+# Claiming is a conditional UPDATE, so any number of worker threads or processes can
+# share the table. A message left in 'sending' by a crashed worker is picked up again
+# once its lease (OUTBOX_LEASE seconds) runs out.
+
+RETRYABLE_STATUS = {408, 409, 423, 429, 500, 502, 503, 504}
+
+class DeliveryError(Exception):
+    def __init__(self, message, retryable=True, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+def _retry_after(response):
+    try:
+        return int(response.headers.get('Retry-After', ''))
+    except ValueError:
+        return None
+
+def send_graph_event(message):
+    # Sent as the user who queued it, with a token refreshed for them if it has expired
+    try:
+        access_token = graph_token(message.created_by_id) if message.created_by_id else None
+    except requests.RequestException as e:
+        raise DeliveryError(f"Token refresh failed: {e}")
+    if access_token is None:
+        raise DeliveryError("No Microsoft sign-in to send with; the sender must sign in again", retryable=False)
+
+    # Graph treats transactionId as the idempotency key for event creation
+    body = dict(message.payload, transactionId=message.idempotency_key)
+    try:
+        response = graph().post('me/events', headers={'Authorization': f'Bearer {access_token}'}, json=body)
+    except requests.RequestException as e:
+        raise DeliveryError(f"Graph API unreachable: {e}")
+
+    if response.status_code in (200, 201):
+        return response.json().get('id')
+    raise DeliveryError(
+        f"Graph API error: {response.status_code}, {response.text}",
+        retryable=response.status_code in RETRYABLE_STATUS,
+        retry_after=_retry_after(response)
+    )
+
+# message kind -> sender returning the remote id, or raising DeliveryError
+HANDLERS = {
+    'graph_event': send_graph_event,
+}
+
+def enqueue(kind, payload, **links):
+    # Added to the current transaction; nothing is sent until it commits. `links` are the
+    # applicant, interview and created_by the message is shown against; Graph messages are
+    # sent as created_by.
+    message = OutboxMessage(
+        kind=kind,
+        idempotency_key=uuid.uuid4().hex,
+        payload=payload,
+        **links
+    )
+    db.session.add(message)
+    return message
+
+def backoff(attempts, retry_after=None):
+    config = current_app.config
+    delay = min(config['OUTBOX_BACKOFF'] * 2 ** (attempts - 1), config['OUTBOX_MAX_BACKOFF'])
+    delay = random.uniform(delay / 2, delay)
+    return timedelta(seconds=max(delay, retry_after or 0))
+
+def _due(now):
+    return or_(
+        and_(OutboxMessage.status == 'pending', OutboxMessage.next_attempt_at <= now),
+        and_(OutboxMessage.status == 'sending', OutboxMessage.locked_until < now)
+    )
+
+def claim_due(limit=20):
+    now = datetime.utcnow()
+    lease = now + timedelta(seconds=current_app.config['OUTBOX_LEASE'])
+    candidates = [row.id for row in db.session.query(OutboxMessage.id)
+                  .filter(_due(now))
+                  .order_by(OutboxMessage.next_attempt_at)
+                  .limit(limit)]
+
+    claimed = []
+    for message_id in candidates:
+        result = db.session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id == message_id, _due(now))
+            .values(status='sending', locked_until=lease)
+        )
+        if result.rowcount == 1:
+            claimed.append(message_id)
+    db.session.commit()
+    return claimed
+
+def deliver(message_id):
+    message = db.session.get(OutboxMessage, message_id)
+    if message is None or message.status != 'sending':
+        return message
+
+    message.attempts += 1
+    try:
+        message.external_id = HANDLERS[message.kind](message)
+    except Exception as error:
+        if not isinstance(error, DeliveryError):
+            # A bug rather than a transient upstream problem; retrying will not help
+            current_app.logger.exception(f"Outbox message {message.id} raised while sending")
+            error = DeliveryError(repr(error), retryable=False)
+        message.last_error = str(error)[:2000]
+        if error.retryable and message.attempts < current_app.config['OUTBOX_MAX_ATTEMPTS']:
+            message.status = 'pending'
+            message.next_attempt_at = datetime.utcnow() + backoff(message.attempts, error.retry_after)
+            current_app.logger.warning(f"Outbox message {message.id} attempt {message.attempts} failed, will retry: {error}")
+        else:
+            message.status = 'failed'
+            current_app.logger.error(f"Outbox message {message.id} failed after {message.attempts} attempt(s): {error}")
+    else:
+        message.status = 'sent'
+        message.sent_at = datetime.utcnow()
+        message.last_error = None
+        current_app.logger.info(f"Outbox message {message.id} ({message.kind}) delivered")
+
+    message.locked_until = None
+    db.session.commit()
+    return message
+
+def process_due(limit=20):
+    # Claim and deliver in the calling thread; returns the number of messages handled
+    claimed = claim_due(limit)
+    for message_id in claimed:
+        deliver(message_id)
+    return len(claimed)
+
+def retry(message):
+    # Put a failed message back in the queue with a fresh attempt budget
+    message.status = 'pending'
+    message.attempts = 0
+    message.next_attempt_at = datetime.utcnow()
+    message.last_error = None
+
+class OutboxWorker:
+    def __init__(self, app):
+        self.app = app
+        self.wakeup = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.executor = None
+        self.stopping = False
+
+    def start(self):
+        if self.thread is not None:
+            return
+        with self.lock:
+            if self.thread is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.app.config['OUTBOX_WORKERS'],
+                    thread_name_prefix='outbox'
+                )
+                self.thread = threading.Thread(target=self.run, name='outbox-dispatcher', daemon=True)
+                self.thread.start()
+
+    def stop(self):
+        # Finish the sends in flight and stop polling
+        if self.thread is None:
+            return
+        self.stopping = True
+        self.wakeup.set()
+        self.thread.join()
+        self.executor.shutdown()
+        self.thread = None
+
+    def wake(self):
+        self.wakeup.set()
+
+    def run(self):
+        while not self.stopping:
+            try:
+                self.dispatch()
+            except Exception:
+                self.app.logger.exception('Outbox dispatch failed')
+            self.wakeup.wait(self.app.config['OUTBOX_POLL_INTERVAL'])
+            self.wakeup.clear()
+
+    def dispatch(self):
+        # Keep claiming while there is work, at most OUTBOX_WORKERS sends in flight
+        while not self.stopping:
+            with self.app.app_context():
+                claimed = claim_due(self.app.config['OUTBOX_WORKERS'])
+            if not claimed:
+                return
+            wait([self.executor.submit(self._deliver, message_id) for message_id in claimed])
+
+    def _deliver(self, message_id):
+        with self.app.app_context():
+            try:
+                deliver(message_id)
+            except Exception:
+                db.session.rollback()
+                self.app.logger.exception(f'Outbox message {message_id} could not be delivered')
+
+def init_app(app):
+    worker = OutboxWorker(app)
+    app.extensions['outbox'] = worker
+    if app.config.get('OUTBOX_WORKER'):
+        # Started on first request rather than here, so CLI commands never spawn it
+        app.before_request(worker.start)
+
+def wake():
+    # Call after committing enqueued messages
+    worker = current_app.extensions.get('outbox')
+    if worker is not None:
+        worker.wake()
+
+@click.command('outbox-worker')
+@click.option('--once', is_flag=True, help='Deliver what is due now and exit.')
+@with_appcontext
+def outbox_worker_command(once):
+    """Deliver queued outbound messages (calendar invites)."""
+    if once:
+        click.echo(f'Processed {process_due(limit=1000)} message(s).')
+        return
+    worker = current_app.extensions['outbox']
+    worker.start()
+    worker.thread.join()
@@ -0,0 +1,183 @@
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload, load_only
+from myapp.extensions import db
+from myapp.models.applicants import Applicant
+from myapp.models.users import User
+from myapp.models.jobrequirement import JobRequirement
+from datetime import date
+import base64
+import binascii
+import json
+import operator
+
+# Keyset (seek) pagination for applicant listings. Instead of OFFSET/LIMIT each page
+# continues from the (sort key, id) of the last row already shown, so page 5000 costs
+# the same as page 1 and no COUNT(*) is needed unless the caller asks for one.
+
+# Columns the applicant list templates render. Listings load only these, plus the uploader's
+# and job's names, so the wide Text columns (reason_for_change, comments, ...) are neither
+# transferred nor hydrated for rows that never show them.
+LIST_COLUMNS = (
+    Applicant.id, Applicant.name, Applicant.email, Applicant.phone_number, Applicant.is_fresher,
+    Applicant.experience, Applicant.notice_period, Applicant.last_applied, Applicant.status,
+    Applicant.current_stage, Applicant.uploaded_by, Applicant.job_id,
+)
+
+# Built once: loader options are immutable, and reusing them keeps statement cache lookups cheap
+LIST_OPTIONS = (
+    load_only(*LIST_COLUMNS),
+    joinedload(Applicant.uploader).load_only(User.id, User.name),
+    joinedload(Applicant.job).load_only(JobRequirement.id, JobRequirement.position),
+)
+
+def applicant_rows():
+    # Base query for every applicant listing; filters and keyset paging are applied on top
+    return Applicant.query.options(*LIST_OPTIONS)
+
+class SortKey:
+    def __init__(self, column, descending, value_of, parse=str, join=None):
+        self.column = column
+        self.descending = descending
+        self.value_of = value_of
+        self.parse = parse
+        self.join = join
+
+SORT_KEYS = {
+    'date': SortKey(Applicant.last_applied, True, lambda a: a.last_applied, parse=date.fromisoformat),
+    'name': SortKey(Applicant.name, False, lambda a: a.name),
+    'hr': SortKey(User.name, False, lambda a: a.uploader.name if a.uploader else None, join=Applicant.uploader),
+}
+
+class KeysetPage:
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None, total=None, approximate=False):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+        self.approximate = approximate
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+def encode_cursor(sort_by, value, ident, direction):
+    payload = {'s': sort_by, 'k': value.isoformat() if isinstance(value, date) else value, 'i': ident, 'd': direction}
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(token, sort_by):
+    # A malformed or stale cursor (e.g. the sort order changed) just restarts from the first page
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+        if payload.get('s') != sort_by or payload.get('d') not in ('n', 'p'):
+            return None
+        value = payload['k']
+        if value is not None:
+            value = SORT_KEYS[sort_by].parse(value)
+        return value, int(payload['i']), payload['d'] == 'n'
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        return None
+
+def _ordering(key, forward):
+    # Rows with a NULL sort key always sit at the end of the listing, on every backend
+    direction = 'desc' if key.descending == forward else 'asc'
+    column = getattr(key.column, direction)()
+    column = column.nulls_last() if forward else column.nulls_first()
+    return [column, getattr(Applicant.id, direction)()]
+
+def _seek(key, value, ident, forward):
+    beyond = operator.lt if key.descending == forward else operator.gt
+    column = key.column
+
+    if value is None:
+        if forward:
+            return and_(column.is_(None), beyond(Applicant.id, ident))
+        return or_(column.isnot(None), and_(column.is_(None), beyond(Applicant.id, ident)))
+
+    clause = or_(beyond(column, value), and_(column == value, beyond(Applicant.id, ident)))
+    if forward:
+        clause = or_(clause, column.is_(None))
+    return clause
+
+def approximate_count(query):
+    # Postgres can estimate the row count from the planner without scanning the table;
+    # other backends (SQLite in tests) fall back to an exact count.
+    query = query.with_entities(Applicant.id).order_by(None)
+    bind = db.session.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return query.count(), False
+
+    compiled = query.statement.compile(dialect=bind.dialect)
+    plan = db.session.connection().exec_driver_sql(
+        'EXPLAIN (FORMAT JSON) ' + str(compiled), compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows']), True
+
+def keyset_paginate(query, sort_by='date', cursor=None, per_page=20, count=None):
+    if sort_by not in SORT_KEYS:
+        sort_by = 'date'
+    key = SORT_KEYS[sort_by]
+
+    if key.join is not None:
+        query = query.join(key.join)
+
+    total, approximate = None, False
+    if count == 'exact':
+        total = query.with_entities(Applicant.id).order_by(None).count()
+    elif count == 'approx':
+        total, approximate = approximate_count(query)
+
+    position = decode_cursor(cursor, sort_by)
+    forward = True
+    if position:
+        value, ident, forward = position
+        query = query.filter(_seek(key, value, ident, forward))
+
+    # Fetch one extra row to learn whether another page exists in this direction
+    rows = query.order_by(None).order_by(*_ordering(key, forward)).limit(per_page + 1).all()
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+
+    next_cursor = prev_cursor = None
+    if rows:
+        first, last = rows[0], rows[-1]
+        if (more if forward else position is not None):
+            next_cursor = encode_cursor(sort_by, key.value_of(last), last.id, 'n')
+        if (position is not None if forward else more):
+            prev_cursor = encode_cursor(sort_by, key.value_of(first), first.id, 'p')
+
+    return KeysetPage(rows, per_page, next_cursor, prev_cursor, total, approximate)
+
+class StreamedRows:
+    # Full listing for streamed templates: rows are pulled from the database in fixed-size
+    # batches while the response is being written, so only one batch is ever held in memory.
+    def __init__(self, query, sort_by='date', batch_size=500):
+        key = SORT_KEYS.get(sort_by, SORT_KEYS['date'])
+        if key.join is not None:
+            query = query.join(key.join)
+        self.query = query.order_by(None).order_by(*_ordering(key, True))
+        self.batch_size = batch_size
+        self._count = None
+
+    def __iter__(self):
+        return iter(self.query.yield_per(self.batch_size))
+
+    def __len__(self):
+        if self._count is None:
+            self._count = self.query.with_entities(Applicant.id).order_by(None).count()
+        return self._count
+
+    def __bool__(self):
+        return len(self) > 0
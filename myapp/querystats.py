@@ -0,0 +1,133 @@
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from collections import Counter
+from contextlib import contextmanager
+import threading
+import time
+import re
+
+# Per-request SQL instrumentation. Every statement executed while a collector is active is
+# counted and timed, and reduced to a fingerprint (literals, bound parameters and IN lists
+# collapsed), so the same statement issued once per row, the usual N+1 shape, stands out.
+# Each request reports its totals in the X-Query-Count and Server-Timing response headers
+# (the latter shows up in browser dev tools) and in a debug log line; a request that
+# repeats one statement SQL_REPEAT_THRESHOLD times or more is logged as a warning.
+# capture() collects outside requests too, which is what the tests' query_budget uses.
+# Statements a streamed response issues after its headers are sent are not counted.
+
+_local = threading.local()
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMS = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\?")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+def fingerprint(statement):
+    statement = _LITERALS.sub('?', statement)
+    statement = _PARAMS.sub('?', statement)
+    statement = _LISTS.sub('(?)', statement)
+    return _SPACE.sub(' ', statement).strip()
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.duration += elapsed
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold=2):
+        # (fingerprint, times) for statements issued at least `threshold` times, most frequent first
+        return [(sql, n) for sql, n in self.fingerprints.most_common() if n >= threshold]
+
+    def report(self):
+        lines = [f"{self.count} queries, {self.duration * 1000:.1f} ms"]
+        lines += [f"  {n}x {sql}" for sql, n in self.fingerprints.most_common()]
+        return '\n'.join(lines)
+
+def _collectors():
+    if not hasattr(_local, 'collectors'):
+        _local.collectors = []
+    return _local.collectors
+
+@contextmanager
+def capture():
+    stats = QueryStats()
+    collectors = _collectors()
+    collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        collectors.remove(stats)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_local, 'collectors', None):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    collectors = getattr(_local, 'collectors', None)
+    started = conn.info.get('query_started')
+    if not collectors or not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    for stats in collectors:
+        stats.record(statement, elapsed)
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    started = context.connection.info.get('query_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+_listening = False
+_listen_lock = threading.Lock()
+
+def _listen():
+    # Engine-class listeners, registered once per process however many apps are created
+    global _listening
+    with _listen_lock:
+        if not _listening:
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            event.listen(Engine, 'handle_error', _handle_error)
+            _listening = True
+
+def _start_request():
+    g.query_stats = QueryStats()
+    _collectors().append(g.query_stats)
+
+def _finish_request(response):
+    stats = g.pop('query_stats', None)
+    if stats is None:
+        return response
+    _collectors().remove(stats)
+
+    db_ms = stats.duration * 1000
+    response.headers['X-Query-Count'] = str(stats.count)
+    response.headers.add('Server-Timing', f'db;dur={db_ms:.1f};desc="{stats.count} queries"')
+
+    summary = f"{request.method} {request.path} {response.status_code}: {stats.count} queries, {db_ms:.1f} ms in DB"
+    repeated = stats.repeated(current_app.config['SQL_REPEAT_THRESHOLD'])
+    if repeated:
+        sql, times = repeated[0]
+        current_app.logger.warning(f"{summary}; possible N+1, {times}x: {sql[:300]}")
+    else:
+        current_app.logger.debug(summary)
+    return response
+
+def _discard_request(exc=None):
+    # A request that failed before after_request still has to drop its collector
+    stats = g.pop('query_stats', None)
+    if stats is not None and stats in _collectors():
+        _collectors().remove(stats)
+
+def init_app(app):
+    _listen()
+    if app.config.get('SQL_STATS'):
+        app.before_request(_start_request)
+        app.after_request(_finish_request)
+        app.teardown_request(_discard_request)
@@ -0,0 +1,79 @@
+from flask import current_app, g
+from myapp.extensions import db
+from myapp.models.users import User
+from myapp.models.jobrequirement import JobRequirement
+import threading
+import time
+
+# Reference data for dropdowns (HR users, interviewers, jobs). Lists are fetched as plain
+# column rows rather than ORM instances, so one copy can be shared by every request and
+# session. Each list is memoised on `g` for the rest of the request and kept process-wide
+# for REFDATA_TTL seconds; routes that change users' roles or job listings call
+# invalidate() after committing. Other worker processes pick the change up within the TTL.
+
+USER_COLUMNS = (User.id, User.name, User.username, User.email, User.role)
+JOB_COLUMNS = (JobRequirement.id, JobRequirement.position)
+
+# list name -> query returning the rows
+LISTS = {
+    'hr_users': lambda: db.session.query(*USER_COLUMNS).filter(User.role.in_(['hr', 'admin'])),
+    'interviewers': lambda: db.session.query(*USER_COLUMNS).filter_by(role='interviewer'),
+    'referral_users': lambda: db.session.query(*USER_COLUMNS)
+        .filter(User.role.in_(['external_referrer', 'internal_referrer', 'hr', 'admin'])),
+    'hr_interviewers': lambda: db.session.query(*USER_COLUMNS).filter(User.role.in_(['HR', 'Admin', 'Interviewer'])),
+    'jobs': lambda: db.session.query(*JOB_COLUMNS).order_by(JobRequirement.position),
+    'open_jobs': lambda: db.session.query(*JOB_COLUMNS).filter(JobRequirement.is_open == True).order_by(JobRequirement.position),
+}
+
+USER_LISTS = ('hr_users', 'interviewers', 'referral_users', 'hr_interviewers')
+JOB_LISTS = ('jobs', 'open_jobs')
+
+_lock = threading.Lock()
+
+def _store():
+    return current_app.extensions.setdefault('refdata', {})
+
+def get_list(name):
+    memo = g.setdefault('refdata', {})
+    if name in memo:
+        return memo[name]
+
+    ttl = current_app.config.get('REFDATA_TTL', 300)
+    store = _store()
+    entry = store.get(name)
+    if entry is None or entry[0] <= time.monotonic():
+        rows = tuple(LISTS[name]().all())
+        entry = (time.monotonic() + ttl, rows)
+        if ttl > 0:
+            with _lock:
+                store[name] = entry
+    memo[name] = entry[1]
+    return entry[1]
+
+def invalidate(*names):
+    # Drop the given lists (all of them if none are named) for this process and request
+    names = names or tuple(LISTS)
+    with _lock:
+        for name in names:
+            _store().pop(name, None)
+    memo = g.get('refdata', {})
+    for name in names:
+        memo.pop(name, None)
+
+def hr_users():
+    return get_list('hr_users')
+
+def interviewers():
+    return get_list('interviewers')
+
+def referral_users():
+    return get_list('referral_users')
+
+def hr_interviewers():
+    return get_list('hr_interviewers')
+
+def all_jobs():
+    return get_list('jobs')
+
+def open_jobs():
+    return get_list('open_jobs')
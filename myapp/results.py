@@ -0,0 +1,196 @@
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import func, or_, select
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from myapp.extensions import db
+from myapp.models.recruitment_history import RecruitmentHistory
+from myapp.models.testresult import TestResult
+from myapp.integrations import imocha
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import click
+import threading
+import requests
+
+# iMocha result ingestion. The poller walks every scheduled test that has no stored
+# result yet, fetches the reports RESULTS_CONCURRENCY at a time, and upserts a TestResult
+# (including the raw report, so hr.test_result renders from the database) for each one
+# iMocha reports as complete. Upserts are keyed on the test invitation id, so running the
+# poller in several processes, or alongside a page that ingests the same report, is safe.
+#
+# Every web worker runs a ResultPoller, but only one of them polls: the one holding the
+# Postgres advisory lock LOCK_KEY, which it takes on a connection of its own and keeps for
+# as long as it runs. The others try for the lock every RESULTS_POLL_INTERVAL, so when the
+# holder exits or loses its connection another worker (on any node) takes over. Other
+# databases have no such lock, and there every poller polls.
+
+LOCK_KEY = 0x694d6f63  # arbitrary, but no other advisory lock may use it
+
+def outstanding_tests(after_id=0, limit=100):
+    # History rows with a scheduled test, no result yet, and not older than RESULTS_MAX_AGE_DAYS
+    oldest = date.today() - timedelta(days=current_app.config['RESULTS_MAX_AGE_DAYS'])
+    return RecruitmentHistory.query\
+        .outerjoin(TestResult, TestResult.testlink_id == RecruitmentHistory.test_id)\
+        .filter(
+            RecruitmentHistory.id > after_id,
+            RecruitmentHistory.test_id.isnot(None),
+            or_(RecruitmentHistory.test_result.is_(None), RecruitmentHistory.test_result == False),
+            or_(RecruitmentHistory.test_date.is_(None), RecruitmentHistory.test_date >= oldest),
+            TestResult.testlink_id.is_(None)
+        )\
+        .order_by(RecruitmentHistory.id)\
+        .limit(limit)\
+        .all()
+
+def fetch_report(test_invitation_id):
+    response = imocha().get(f'reports/{test_invitation_id}', endpoint='reports/{id}', params={'reportType': 1})
+    response.raise_for_status()
+    return response.json()
+
+def is_complete(report):
+    return report.get('status') == 'Complete'
+
+def upsert_result(history, report):
+    # Insert or refresh the TestResult for this history's test invitation
+    result = db.session.get(TestResult, history.test_id) or TestResult(testlink_id=history.test_id)
+    result.applicant_id = history.applicant_id
+    result.name = history.applicant.name
+    result.email = report['candidateEmail']
+    result.date = datetime.strptime(report['attemptedOn'], '%Y-%m-%dT%H:%M:%S.%fZ').date()
+    result.score = report['candidatePoints']
+    result.total_score = report['totalTestPoints']
+    result.time_taken = report['timeTaken'] / 60
+    result.test_time = report['testDuration']
+    result.test_name = report['testName']
+    result.pdf_link = report['pdfReportUrl']
+    result.sections = str(report['sections'])
+    result.report = report
+    db.session.add(result)
+    history.test_result = True
+    return result
+
+def _fetch_all(app, test_ids):
+    # test invitation id -> report, or None when it could not be fetched
+    def fetch(test_id):
+        with app.app_context():
+            try:
+                return test_id, fetch_report(test_id)
+            except (requests.RequestException, ValueError) as e:
+                app.logger.warning(f"Could not fetch iMocha report {test_id}: {e}")
+                return test_id, None
+
+    with ThreadPoolExecutor(max_workers=app.config['RESULTS_CONCURRENCY'], thread_name_prefix='results') as pool:
+        return dict(pool.map(fetch, test_ids))
+
+def poll_results(batch_size=100):
+    # One pass over all outstanding tests; returns the number of results stored
+    app = current_app._get_current_object()
+    stored, after_id = 0, 0
+    while True:
+        batch = outstanding_tests(after_id, batch_size)
+        if not batch:
+            return stored
+        after_id = batch[-1].id
+
+        reports = _fetch_all(app, [history.test_id for history in batch])
+        for history in batch:
+            report = reports[history.test_id]
+            if not report or not is_complete(report):
+                continue
+            # One savepoint per result, so a malformed report or a row another process
+            # stored first only skips that result
+            try:
+                with db.session.begin_nested():
+                    upsert_result(history, report)
+                stored += 1
+            except (IntegrityError, KeyError, TypeError, ValueError) as e:
+                app.logger.warning(f"Could not store iMocha report {history.test_id}: {e!r}")
+        db.session.commit()
+
+class ResultPoller:
+    def __init__(self, app):
+        self.app = app
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.connection = None  # holds the advisory lock while this poller leads
+
+    def start(self):
+        if self.thread is not None:
+            return
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='results-poller', daemon=True)
+                self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        try:
+            while not self.stopped.is_set():
+                with self.app.app_context():
+                    if self.lead():
+                        try:
+                            stored = poll_results()
+                            if stored:
+                                self.app.logger.info(f"Stored {stored} iMocha result(s)")
+                        except Exception:
+                            db.session.rollback()
+                            self.app.logger.exception('iMocha result poll failed')
+                self.stopped.wait(self.app.config['RESULTS_POLL_INTERVAL'])
+        finally:
+            self.release()
+
+    def lead(self):
+        # Whether this process should poll: take the lock, or check it still has it
+        if db.engine.dialect.name != 'postgresql':
+            return True
+        try:
+            if self.connection is None:
+                self.connection = db.engine.connect()
+                held = self.connection.scalar(select(func.pg_try_advisory_lock(LOCK_KEY)))
+                self.connection.commit()
+                if not held:
+                    self.connection, connection = None, self.connection
+                    connection.close()
+                    return False
+                self.app.logger.info('Polling iMocha results from this process')
+            else:
+                # The lock lives as long as the connection does
+                self.connection.scalar(select(1))
+                self.connection.commit()
+            return True
+        except DBAPIError:
+            self.app.logger.warning('Could not take or keep the iMocha results poller lock', exc_info=True)
+            self.release()
+            return False
+
+    def release(self):
+        connection, self.connection = self.connection, None
+        if connection is not None:
+            # Discard the connection rather than return it to the pool, so the server drops
+            # the lock with it
+            connection.invalidate()
+            connection.close()
+
+def init_app(app):
+    poller = ResultPoller(app)
+    app.extensions['results_poller'] = poller
+    if app.config.get('RESULTS_POLLER'):
+        if not app.config.get('IMOCHA_API_KEY'):
+            # Every fetch would fail; say so once rather than once per outstanding test
+            app.logger.warning('IMOCHA_API_KEY is not set; iMocha results will not be polled')
+        else:
+            # Started on first request rather than here, so CLI commands never spawn it
+            app.before_request(poller.start)
+
+@click.command('poll-results')
+@click.option('--batch-size', default=100, show_default=True, help='Reports fetched per batch.')
+@with_appcontext
+def poll_results_command(batch_size):
+    """Fetch completed iMocha reports into TestResult."""
+    click.echo(f'Stored {poll_results(batch_size)} result(s).')
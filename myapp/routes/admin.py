@@ -3,6 +3,7 @@ from flask_login import login_required, current_user
 from myapp.auth.decorators import role_required, no_cache
 from myapp.models.users import User
 from myapp.extensions import db
+from myapp import identity, refdata, integrations
 
 bp = Blueprint('admin', __name__, url_prefix='/admin')
 
@@ -60,6 +61,8 @@ def change_role(user_id):
     db.session.execute(text(f"SET app.current_user_id = '{current_user.id}'"))
 
     db.session.commit()
+    refdata.invalidate(*refdata.USER_LISTS)
+    identity.invalidate(user.id)
     current_app.logger.info(f"Role updated for user {user.username}: {role.capitalize() if role != 'hr' else 'HR'} by Admin {current_user.username}")
     flash('User role updated successfully', 'success')
     if request.referrer and request.referrer.endswith(url_for('admin.manage_users')):
@@ -93,6 +96,7 @@ def change_password(user_id):
     if user.role != 'admin':
         user.password_changed = True
     db.session.commit()
+    identity.invalidate(user.id)
     current_app.logger.info(f"Password updated for user {user.username} by Admin {current_user.username}")
     flash('User password updated successfully', 'success')
     if request.referrer and request.referrer.endswith(url_for('main.profile')):
@@ -114,10 +118,20 @@ def delete_user(user_id):
     
     db.session.delete(user)
     db.session.commit()
+    refdata.invalidate(*refdata.USER_LISTS)
+    identity.invalidate(user_id)
     current_app.logger.info(f"User {user.username} deleted by Admin {current_user.username}")
     flash('User deleted successfully', 'success')
     return redirect(url_for('admin.manage_users'))
 
+@bp.route('/integrations')
+@no_cache
+@login_required
+@role_required('admin')
+def integration_metrics():
+    # Per-endpoint latency of calls to iMocha and Graph made by this worker process
+    return jsonify(integrations.metrics())
+
 @bp.route('/logs')
 @login_required
 @role_required('admin')
@@ -5,7 +5,7 @@ from myapp.models.users import User
 from myapp.extensions import db
 from myapp.utils import is_valid_email
 from myapp.auth.decorators import no_cache
-from myapp.auth.helpers import get_msal_auth_url, get_token_from_code
+from myapp.auth.helpers import get_msal_auth_url, get_token_from_code, save_tokens
 
 bp = Blueprint('auth', __name__)
 
@@ -198,7 +198,6 @@ def authorized_redirect():
         return redirect(url_for("auth.login"))
 
     # 5. Proceed with user info
-    session["token"] = token
     session["ms_authenticated"] = True
     msal_user = token["id_token_claims"]
     email = (msal_user.get("preferred_username") or
@@ -223,6 +222,7 @@ def authorized_redirect():
         flash("Your account is pending admin approval.", "warning")
         return redirect(url_for("main.home"))
 
+    save_tokens(user.id)  # Graph calls made for this user from now on refresh them silently
     login_user(user)
     session.permanent = True
     flash("Login successful!", "success")
@@ -6,6 +6,7 @@ from myapp.models.users import User
 from myapp.models.jobrequirement import JobRequirement
 from myapp.utils import validate_file
 from myapp.extensions import db
+from myapp import identity, refdata
 from werkzeug.utils import secure_filename
 from datetime import date, datetime
 from myapp.utils import validate_file, can_upload_applicant_email, can_upload_applicant_phone
@@ -47,7 +48,7 @@ def show_upload_form():
 @role_required('external_referrer', 'admin')
 def referrals():
     referrals = Referral.query.filter_by(referrer_id=current_user.id).order_by(Referral.referral_date.desc()).all()
-    jobs= JobRequirement.query.filter(JobRequirement.is_open == True).order_by(JobRequirement.position).all()
+    jobs = refdata.open_jobs()
     return render_template('external_referrer/candidates.html', referrals=referrals, jobs=jobs)
 
 @bp.route('/profile')
@@ -83,6 +84,7 @@ def change_password(user_id):
     # Update password
     user.set_password(new_password)
     db.session.commit()
+    identity.invalidate(user.id)
 
     flash("Password changed successfully.", "success")
     return redirect(url_for('external_referrer.profile'))
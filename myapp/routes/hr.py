@@ -1,17 +1,24 @@
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
 from sqlalchemy import func
-from flask import Blueprint, jsonify, render_template, request, redirect, url_for, flash, current_app, session, jsonify, send_file
+from flask import Blueprint, jsonify, render_template, stream_template, request, redirect, url_for, flash, current_app, session, jsonify, send_file
 from flask_login import login_required, current_user
 from myapp.auth.decorators import role_required, no_cache
+from myapp.auth.helpers import graph_token
 from myapp.models.users import User
 from myapp.models.applicants import Applicant
 from myapp.models.recruitment_history import RecruitmentHistory
 from myapp.models.interviews import Interview
 from myapp.models.referrals import Referral
 from myapp.models.jobrequirement import JobRequirement
-from myapp.utils import validate_file, update_status, can_upload_applicant_email, can_upload_applicant_phone, is_future_or_today, get_json_info, can_update_applicant, store_result
+from myapp.models.outbox import OutboxMessage
+from myapp.models.testresult import TestResult
+from myapp.utils import validate_file, can_upload_applicant_email, can_upload_applicant_phone, is_future_or_today, get_json_info, can_update_applicant
 from myapp.extensions import db
+from myapp.pagination import keyset_paginate, StreamedRows, applicant_rows
+from myapp.search import applicant_search_filter, suggest_applicants
+from myapp import refdata, outbox, catalogue, results, availability, board
+from myapp.integrations import imocha
 from werkzeug.utils import secure_filename
 from datetime import datetime, date, timedelta
 from pytz import timezone, utc
@@ -25,6 +32,14 @@ HR_ROLES = ('hr', 'admin')
 
 excluded_stages = ['Rejected', 'On Hold', 'Joined']
 
+def render_applicant_listing(template, query, sort_by='date', **context):
+    # Listings are served one keyset page at a time; ?full=1 streams every matching row instead
+    if request.args.get('full'):
+        return stream_template(template, applicants=StreamedRows(query, sort_by), sort_by=sort_by, **context)
+
+    pagination = keyset_paginate(query, sort_by, cursor=request.args.get('cursor'), per_page=20, count='approx')
+    return render_template(template, applicants=pagination.items, pagination=pagination, sort_by=sort_by, streamable=True, **context)
+
 @bp.route('/dashboard')
 @no_cache
 @login_required
@@ -38,22 +53,19 @@ def dashboard():
 @role_required(*HR_ROLES)
 def applicants():
     search_query = request.args.get('search', '').strip()
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     per_page = 20
     
     if search_query:
         return redirect(url_for('hr.search_applicants', query=search_query))
     
     excluded_stages = ['Rejected', 'On Hold', 'Joined']
-    applicants_pagination = Applicant.query.options(joinedload(Applicant.uploader))\
-        .filter(~Applicant.status.in_(excluded_stages))\
-        .order_by(Applicant.last_applied.desc())\
-        .paginate(page=page, per_page=per_page, error_out=False)
+    query = applicant_rows()\
+        .filter(~Applicant.status.in_(excluded_stages))
+    applicants_pagination = keyset_paginate(query, 'date', cursor=cursor, per_page=per_page, count='approx')
     applicants = applicants_pagination.items
-    jobs = JobRequirement.query.filter(JobRequirement.is_open == True).order_by(JobRequirement.position).all()
-    hrs = User.query.filter(User.role.in_(['hr', 'admin'])).all()
-    for applicant in applicants:
-        update_status(applicant.id)
+    jobs = refdata.open_jobs()
+    hrs = refdata.hr_users()
     return render_template('hr/applicants.html', applicants=applicants, users=hrs, jobs=jobs, pagination=applicants_pagination)
 
 @bp.route('/all_applicants')
@@ -69,12 +81,10 @@ def all_applicants():
     if search_query:
         return redirect(url_for('hr.search_applicants', query=search_query))
     
-    applicants = Applicant.query.options(joinedload(Applicant.uploader)).order_by(Applicant.last_applied.desc()).all()
-    jobs = JobRequirement.query.filter(JobRequirement.is_open == True).order_by(JobRequirement.position).all()
-    hrs = User.query.filter(User.role.in_(['hr', 'admin'])).all()
-    for applicant in applicants:
-        update_status(applicant.id)
-    return render_template('hr/applicants_all.html', users=hrs, jobs=jobs, all_stages=stages)
+    query = applicant_rows()
+    jobs = refdata.open_jobs()
+    hrs = refdata.hr_users()
+    return render_applicant_listing('hr/applicants_all.html', query, users=hrs, jobs=jobs, all_stages=stages)
 
 @bp.route('/upload_applicants', methods=['GET'])
 @no_cache
@@ -94,7 +104,7 @@ def show_upload_form():
         }
         for user in User.query.filter(func.lower(User.role).in_(['referrer', 'hr', 'admin'])).all()
     ]
-    job_positions = JobRequirement.query.with_entities(JobRequirement.id, JobRequirement.position).filter(JobRequirement.is_open == True).all()
+    job_positions = refdata.open_jobs()
     return render_template('hr/upload.html', referrer_names=referrer_names, job_positions=job_positions, form_data=form_data)
 
 def is_valid_mobile(phone_number):
@@ -278,7 +288,7 @@ def show_update_form(id):
     referrer_names = [
         {'id': user.id, 'name': user.name} for user in User.query.filter_by(role='internal_referrer').all()
     ]
-    job_positions = JobRequirement.query.with_entities(JobRequirement.id, JobRequirement.position).filter(JobRequirement.is_open == True).all()
+    job_positions = refdata.open_jobs()
 
     return render_template('hr/update_applicant.html', applicant=applicant, referrer_names=referrer_names, job_positions=job_positions, form_data=form_data)
 
@@ -416,10 +426,9 @@ def update_applicant(id):
 @login_required
 @role_required(*HR_ROLES)
 def view_applicant(id):
-    update_status(id)
     applicant = Applicant.query.get_or_404(id)
-    interviewers = User.query.filter_by(role='interviewer').all()
-    hr_interviewers = User.query.filter(User.role.in_(['HR', 'Admin', 'Interviewer'])).all()
+    interviewers = refdata.interviewers()
+    hr_interviewers = refdata.hr_interviewers()
     current_date = date.today().isoformat() 
     
     # Get the recruitment history record
@@ -429,7 +438,50 @@ def view_applicant(id):
         .order_by(RecruitmentHistory.updated_at.desc())
         .first()
     )
-    return render_template('hr/view_applicant.html', applicant=applicant, interviewers=interviewers, hr_interviewers=hr_interviewers, current_date = current_date, recruitment_history = recruitment_history)
+    invite = latest_invite(id)
+    return render_template('hr/view_applicant.html', applicant=applicant, interviewers=interviewers, hr_interviewers=hr_interviewers, current_date = current_date, recruitment_history = recruitment_history, invite=invite)
+
+def latest_invite(applicant_id):
+    return OutboxMessage.query.filter_by(applicant_id=applicant_id, kind='graph_event')\
+        .order_by(OutboxMessage.id.desc()).first()
+
+@bp.route('/invite_status/<int:id>')
+@no_cache
+@login_required
+@role_required(*HR_ROLES)
+def invite_status(id):
+    invite = latest_invite(id)
+    if not invite:
+        return jsonify({'status': None})
+    return jsonify({
+        'id': invite.id,
+        'status': invite.status,
+        'attempts': invite.attempts,
+        'last_error': invite.last_error,
+        'sent_at': invite.sent_at.isoformat() if invite.sent_at else None
+    })
+
+@bp.route('/retry_invite/<int:message_id>', methods=['POST'])
+@no_cache
+@login_required
+@role_required(*HR_ROLES)
+def retry_invite(message_id):
+    invite = OutboxMessage.query.get_or_404(message_id)
+    if invite.status != 'failed':
+        flash('This calendar invite has not failed.', 'warning')
+        return redirect(url_for('hr.view_applicant', id=invite.applicant_id))
+
+    if graph_token(current_user.id) is None:
+        flash("You must be logged in through Microsoft to schedule interviews.", "error")
+        return redirect(url_for('auth.login'))
+
+    invite.created_by_id = current_user.id  # sent from the calendar of whoever retries it
+    outbox.retry(invite)
+    db.session.commit()
+    outbox.wake()
+    current_app.logger.info(f"Calendar invite {invite.id} requeued by {current_user.username}")
+    flash('The calendar invite is being sent again.', 'success')
+    return redirect(url_for('hr.view_applicant', id=invite.applicant_id))
 
 
 @bp.route('/filter_applicants')
@@ -437,9 +489,9 @@ def view_applicant(id):
 @login_required
 @role_required(*HR_ROLES)
 def filter_applicants():
-    hr_users = User.query.filter(User.role.in_(['hr', 'admin'])).all()
-    jobs = JobRequirement.query.order_by(JobRequirement.position).all()
-    page = request.args.get('page', 1, type=int)
+    hr_users = refdata.hr_users()
+    jobs = refdata.all_jobs()
+    cursor = request.args.get('cursor')
     per_page = 20
 
     hr_id = request.args.get('hr_id', '').strip()
@@ -448,10 +500,7 @@ def filter_applicants():
 
     excluded_stages = ['Rejected','On Hold' ,'Joined']  
 
-    query = Applicant.query.options(
-        joinedload(Applicant.uploader),
-        joinedload(Applicant.job)
-    )
+    query = applicant_rows()
 
     # Apply filters
     if hr_id:
@@ -468,8 +517,7 @@ def filter_applicants():
         query = query.filter(~Applicant.status.in_(excluded_stages))
 
     # Order and paginate
-    query = query.order_by(Applicant.last_applied.desc())
-    applicants_pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    applicants_pagination = keyset_paginate(query, 'date', cursor=cursor, per_page=per_page, count='approx')
     applicants = applicants_pagination.items
 
     return render_template(
@@ -491,32 +539,22 @@ def filter_applicants():
 def sort_applicants():
     sort_by = request.args.get('sort_by', 'date')
     
-    # Eager load uploader and job for display
-    query = Applicant.query.options(
-        joinedload(Applicant.uploader),
-        joinedload(Applicant.job)
-    )
-
-    if sort_by == 'name':
-        query = query.order_by(Applicant.name.asc())
-    elif sort_by == 'hr':
-        # join uploader explicitly and order by User.name
-        query = query.join(Applicant.uploader).order_by(User.name.asc())
-    else:  # Default to sorting by latest application
-        query = query.order_by(Applicant.last_applied.desc())
-
-    applicants = query.all()
+    # List columns only, with the uploader and job names for display
+    query = applicant_rows()
 
     # For filter dropdowns
-    users = User.query.filter(User.role.in_(['hr', 'admin'])).all()
-    jobs = JobRequirement.query.all()
+    users = refdata.hr_users()
+    jobs = refdata.all_jobs()
 
-    return render_template(
+    # Sorted by latest application (default), name or uploader name, one page at a time
+    return render_applicant_listing(
         'hr/applicants_all.html',
-        applicants=applicants,
+        query,
+        sort_by,
         users=users,
         jobs=jobs,
-        search_query='' )
+        search_query=''
+    )
 
 
 @bp.route('/search_applicants')
@@ -530,30 +568,40 @@ def search_applicants():
     if not search_query:
         return redirect(url_for('hr.applicants'))
 
-    base_query = Applicant.query.options(joinedload(Applicant.uploader))
+    base_query = applicant_rows()
 
-    if '@' in search_query:
-        base_query = base_query.filter(Applicant.email.ilike(f'%{search_query}%'))
-    else:
-        base_query = base_query.filter(Applicant.name.ilike(f'%{search_query}%'))
+    base_query = base_query.filter(applicant_search_filter(search_query))
 
     if excluded_stages:
         base_query = base_query.filter(~Applicant.status.in_(excluded_stages))
 
-    applicants = base_query.order_by(Applicant.last_applied.desc()).all()
-
-    jobs = JobRequirement.query.filter(JobRequirement.is_open == True).order_by(JobRequirement.position).all()
-    hrs = User.query.filter(User.role.in_(['hr', 'admin'])).all()
+    jobs = refdata.open_jobs()
+    hrs = refdata.hr_users()
 
-    return render_template(
+    return render_applicant_listing(
         'hr/applicants.html',
-        applicants=applicants,
+        base_query,
+        sort_by,
         users=hrs,
         jobs=jobs,
-        search_query=search_query,
-        sort_by=sort_by
+        search_query=search_query
     )
 
+@bp.route('/search_suggestions')
+@no_cache
+@login_required
+@role_required(*HR_ROLES)
+def search_suggestions():
+    search_query = request.args.get('q', '').strip()
+    if not search_query:
+        return jsonify([])
+
+    applicants = suggest_applicants(search_query, limit=10)
+    return jsonify([
+        {"id": applicant.id, "name": applicant.name, "email": applicant.email}
+        for applicant in applicants
+    ])
+
 #cv download
 @bp.route('/applicants/<int:id>/download_cv')
 @no_cache
@@ -576,11 +624,11 @@ def schedule_interview(id):
         current_date = date.today().isoformat()
         return render_template('hr/schedule_interview.html', current_date=current_date)
 
-    if "token" not in session:
+    # The invite is sent later with a token refreshed for this user; check now that one can be had
+    if graph_token(current_user.id) is None:
         flash("You must be logged in through Microsoft to schedule interviews.", "error")
         return redirect(url_for('auth.login'))
     
-    access_token = session["token"]["access_token"]
     interview_date = request.form.get('interview_date')
     interview_time = request.form.get('interview_time')
     interviewer_id = request.form.get('interviewer_id')
@@ -609,7 +657,7 @@ def schedule_interview(id):
     interviewer = User.query.get_or_404(interviewer_id)
     history = RecruitmentHistory.query.filter_by(applicant_id = id).first()
     start_datetime = datetime.combine(date, time)
-    end_datetime = start_datetime + timedelta(hours=1)
+    end_datetime = start_datetime + availability.duration()
 
     if interviewer.auth_type == 'local':
         if not history.interview_round_1_date:
@@ -652,7 +700,9 @@ def schedule_interview(id):
         scheduler_id=current_user.id
     )
     db.session.add(interview)
-    db.session.commit()
+    if not availability.reserve():
+        flash(f'{interviewer.name} already has an interview at that time. Choose another time or interviewer.', 'error')
+        return redirect(url_for('hr.view_applicant', id=id))
 
     attendees = [
         {
@@ -684,12 +734,6 @@ def schedule_interview(id):
     
     attendees.append(get_json_info())
 
-    graph_endpoint = 'https://graph.microsoft.com/v1.0/me/events'
-    headers = {
-        'Authorization': f'Bearer {access_token}',
-        'Content-Type': 'application/json'
-    }
-
     body = {
         "subject": f"Interview Round {round} with {applicant.name}",
         "start": {
@@ -708,18 +752,14 @@ def schedule_interview(id):
         "onlineMeetingProvider": "teamsForBusiness"
     }
 
-    response = requests.post(graph_endpoint, headers=headers, json=body)
-
-    if response.status_code == 201:
-        flash(f'Interview round {round} scheduled and calendar invite sent.', 'success')
-        current_app.logger.info(f"Meeting created for round {round} for applicant {id}")
-        if history.test_result and history.test_date and not history.interview_round_1_comments:
-            store_result(id)
-    else:
-        flash('Interview saved, but failed to schedule calendar meeting.', 'warning')
-        current_app.logger.error(f"Graph API error: {response.status_code}, {response.text}")
-    
+    # The invite is saved with the interview and sent in the background
+    outbox.enqueue('graph_event', body,
+                   applicant=applicant, interview=interview, created_by_id=current_user.id)
+    db.session.commit()
+    outbox.wake()
 
+    flash(f'Interview round {round} scheduled. The calendar invite is being sent.', 'success')
+    current_app.logger.info(f"Meeting queued for round {round} for applicant {id}")
 
     return redirect(url_for('hr.view_applicant', id=id))
 
@@ -792,9 +832,9 @@ def reject_application(id):
 @login_required
 @role_required(*HR_ROLES)
 def view_referrals():
-    referrals = Referral.query.all()
-    users =User.query.filter(User.role.in_(['external_referrer', 'internal_referrer', 'hr', 'admin'])).all()
-    jobs= JobRequirement.query.order_by(JobRequirement.position).all()
+    referrals = Referral.query.options(joinedload(Referral.job)).all()
+    users = refdata.referral_users()
+    jobs = refdata.all_jobs()
     return render_template('hr/view_referrals.html', referrals=referrals,jobs=jobs,users=users)
 
 @bp.route('/filter_referrals')
@@ -804,8 +844,8 @@ def view_referrals():
 def filter_referrals():
     referral_id = request.args.get('referral_id', type=int)
     job_id = request.args.get('job_id', type=int)
-    referral_users = User.query.filter(User.role.in_(['external_referrer', 'internal_referrer', 'hr', 'admin'])).all()
-    jobs = JobRequirement.query.order_by(JobRequirement.position).all()
+    referral_users = refdata.referral_users()
+    jobs = refdata.all_jobs()
     query = Referral.query.outerjoin(Referral.job).options(joinedload(Referral.job))
 
     if referral_id:
@@ -827,8 +867,7 @@ def upload_referral_applicant(referral_id,referrer_id, name):
 
     if request.method == 'GET':
         form_data = session.pop('form_data', None)
-        job_positions = JobRequirement.query.with_entities(JobRequirement.id, JobRequirement.position)\
-                                            .filter(JobRequirement.is_open == True).all()
+        job_positions = refdata.open_jobs()
         referral = Referral.query.get_or_404(referral_id)
         if not form_data:
             form_data = {}
@@ -997,71 +1036,31 @@ def onboarding():
     return "Onboarding and Offer Letter Page"
 
 
+# The board's filters; both land on the same board (see myapp.board), which reads ?hr_id= and ?interviewer_id=
 @bp.route('/filter_interviews')
 @no_cache
 @login_required
 @role_required(*HR_ROLES)
 def filter_interviews_by_hr():
-    hr_users = User.query.filter(User.role.in_(['hr', 'admin'])).all()
-    hr_id = request.args.get('hr_id', '')
-    if hr_id:
-        interviews = Interview.query\
-            .filter_by(completed=False, scheduler_id=hr_id)\
-            .options(
-                joinedload(Interview.applicant),
-                joinedload(Interview.interviewer),
-                joinedload(Interview.scheduler)
-            )\
-            .all()
-    else:
-        interviews = Interview.query\
-            .filter_by(completed=False)\
-            .options(
-                joinedload(Interview.applicant),
-                joinedload(Interview.interviewer),
-                joinedload(Interview.scheduler)
-            )\
-            .all()
-    return render_template('hr/view_interviews.html', interviews=interviews, users=hr_users)
-
-#filter by interviewers
-@bp.route('/filter_interviews')
+    return board.render_board('hr/view_interviews.html', users=refdata.hr_users(), interviewers=refdata.interviewers())
+
+@bp.route('/filter_interviews_by_interviewer')
 @no_cache
 @login_required
 @role_required(*HR_ROLES)
 def filter_interviews_by_interviewer():
-    interviewer_users = User.query.filter(User.role.in_(['interviewer'])).all()
-    interviewer_id = request.args.get('interviewer_id', '')
-    if interviewer_id:
-        interviews = Interview.query\
-            .filter_by(completed=False, scheduler_id=interviewer_id)\
-            .options(
-                joinedload(Interview.applicant),
-                joinedload(Interview.interviewer),
-                joinedload(Interview.scheduler)
-            )\
-            .all()
-    else:
-        interviews = Interview.query\
-            .filter_by(completed=False)\
-            .options(
-                joinedload(Interview.applicant),
-                joinedload(Interview.interviewer),
-                joinedload(Interview.scheduler)
-            )\
-            .all()
-    return render_template('hr/view_interviews.html', interviews=interviews, interviewers=interviewer_users)
+    return board.render_board('hr/view_interviews.html', users=refdata.hr_users(), interviewers=refdata.interviewers())
 
 @bp.route('/reschedule_interview/<int:id>', methods=['POST'])
 @no_cache
 @login_required
 @role_required(*HR_ROLES)
 def reschedule_interview(id):
-    if "token" not in session:
+    # The invite is sent later with a token refreshed for this user; check now that one can be had
+    if graph_token(current_user.id) is None:
         flash("You must be logged in through Microsoft to schedule interviews.", "error")
         return redirect(url_for('auth.login'))
     
-    access_token = session["token"]["access_token"]
     date = request.form.get('interview_date')
     time = request.form.get('interview_time')
     interviewer_ids = [int(id) for id in request.form.getlist('interviewer_ids')]
@@ -1126,10 +1125,17 @@ def reschedule_interview(id):
             scheduler_id=current_user.id
         )
         db.session.add(new_interview)
+
+    if not availability.reserve():
+        flash('One of the selected interviewers already has an interview at that time. Choose another time or interviewer.', 'error')
+        referrer = request.referrer
+        if referrer and 'view_interviews' in referrer:
+            return redirect(url_for('hr.view_interviews'))
+        return redirect(url_for('hr.view_applicant', id=id))
     
     history = RecruitmentHistory.query.filter_by(applicant_id=applicant.id).first()
     start_datetime = datetime.combine(date, time)
-    end_datetime = start_datetime + timedelta(hours=1)
+    end_datetime = start_datetime + availability.duration()
 
     if round_number == 1 or round_number == 'Client Round 1':
         history.interview_round_1_date = date
@@ -1141,8 +1147,6 @@ def reschedule_interview(id):
         history.hr_round_date = date
         history.hr_round_time = time
 
-    db.session.commit()
-
     attendees = []
 
     for interviewer in interviewers:
@@ -1175,15 +1179,8 @@ def reschedule_interview(id):
     
     attendees.append(get_json_info())
 
-    graph_endpoint = 'https://graph.microsoft.com/v1.0/me/events'
-    headers = {
-        'Authorization': f'Bearer {access_token}',
-        'Content-Type': 'application/json'
-    }
-
-
     body = {
-        "subject": f"Rescheduled {round} with {applicant.name}",
+        "subject": f"Rescheduled {round_number} with {applicant.name}",
         "start": {
             "dateTime": start_datetime.isoformat(),
             "timeZone": "Asia/Kolkata"
@@ -1200,14 +1197,13 @@ def reschedule_interview(id):
         "onlineMeetingProvider": "teamsForBusiness"
     }
 
-    response = requests.post(graph_endpoint, headers=headers, json=body)
+    outbox.enqueue('graph_event', body,
+                   applicant=applicant, interview=existing_interviews[0], created_by_id=current_user.id)
+    db.session.commit()
+    outbox.wake()
 
-    if response.status_code == 201:
-        flash(f'Interview rescheduled with {len(interviewers)} interviewer(s) and calendar invite sent.', 'success')
-        current_app.logger.info(f"Meeting rescheduled for {round} for applicant {id} with {len(interviewers)} interviewers")
-    else:
-        flash('Interview rescheduling saved, but failed to schedule calendar meeting.', 'warning')
-        current_app.logger.error(f"Graph API error: {response.status_code}, {response.text}")
+    flash(f'Interview rescheduled with {len(interviewers)} interviewer(s). The calendar invite is being sent.', 'success')
+    current_app.logger.info(f"Meeting rescheduled for {round_number} for applicant {id} with {len(interviewers)} interviewers")
 
     referrer = request.referrer
     if referrer and 'view_interviews' in referrer:
@@ -1247,7 +1243,7 @@ def submit_job_form():
     new_jobrequirement = JobRequirement(
         position=job_position,
         description=job_description,
-        created_by=current_user,
+        created_by_id=current_user.id,
         skillset=job_skillset,
         clients=job_clients or None ,
         budget=job_budget,
@@ -1257,6 +1253,7 @@ def submit_job_form():
 
     db.session.add(new_jobrequirement)
     db.session.commit()
+    refdata.invalidate(*refdata.JOB_LISTS)
 
     flash('New job listing successfully created!', 'success')
     current_app.logger.info(f"New job listing (Posting: {new_jobrequirement.position}) added by {current_user.name}")
@@ -1302,6 +1299,7 @@ def submit_joblisting_update(id):
     job.for_vendor = for_vendor
 
     db.session.commit()
+    refdata.invalidate(*refdata.JOB_LISTS)
 
     flash('Job listing updated successfully!', 'success')
     return redirect(url_for('main.view_details_joblisting', id=id))
@@ -1315,6 +1313,7 @@ def close_joblisting(id):
     joblisting.is_open = False
     joblisting.for_vendor = False
     db.session.commit()
+    refdata.invalidate(*refdata.JOB_LISTS)
     current_app.logger.info(f"Job listing {joblisting.position} closed by {current_user.username}")
     flash('Job listing closed successfully', 'success')
     return redirect(url_for('main.view_joblisting'))
@@ -1327,6 +1326,7 @@ def open_joblisting(id):
     joblisting = JobRequirement.query.get_or_404(id)
     joblisting.is_open = True
     db.session.commit()
+    refdata.invalidate(*refdata.JOB_LISTS)
     current_app.logger.info(f"Job listing {joblisting.position} opened by {current_user.username}")
     flash('Job listing reopened successfully', 'success')
     return redirect(url_for('main.view_joblisting'))
@@ -1363,21 +1363,11 @@ def delete_joblisting(id):
     joblisting = JobRequirement.query.get_or_404(id)
     db.session.delete(joblisting)
     db.session.commit()
+    refdata.invalidate(*refdata.JOB_LISTS)
     current_app.logger.info(f"Job listing {joblisting.position} deleted by Admin {current_user.username}")
     flash('Job listing deleted successfully', 'success')
     return redirect(url_for('main.view_joblisting'))
 
-def get_test_ids():
-    url_for="https://apiv3.imocha.io/v3/tests"
-    headers = {
-        "X-API-KEY":"MLgDuuMLvhyRcoHxmaGBBHxBItiKrb",
-        "Content-Type":"application/json"
-    }
-    response = requests.get(url_for, headers=headers)
-    result=response.json()
-    test_dict = {test["testId"]: test["testName"] for test in result["tests"]}
-    return test_dict
-
 @bp.route('/schedule_test/<int:id>', methods=['GET', 'POST'])
 @no_cache
 @login_required
@@ -1407,27 +1397,22 @@ def schedule_test(id):
         else:
             return redirect(url_for('hr.schedule_linkid',id=id,testId=test_id,testLinkId=test_link,start_test_date=start_date,end_test_date=end_date,test_time=time_str))
 
-    url = "https://apiv3.imocha.io/v3/tests"
-    headers = {
-        "X-API-KEY": "MLgDuuMLvhyRcoHxmaGBBHxBItiKrb",
-        "Content-Type": "application/json"
-    }
-    response = requests.get(url, headers=headers)
-    result = response.json()
-    test_dict = {test["testId"]: test["testName"] for test in result["tests"]}
-
     selected_test_id = request.args.get('test_id', type=int)
     test_links = {}
 
+    # Served from the local catalogue cache; iMocha is only hit when it has expired
+    try:
+        test_dict = catalogue.tests()
+    except requests.RequestException as e:
+        current_app.logger.error(f"Failed to load iMocha tests: {e}")
+        flash('Could not reach iMocha. Please try again later.', 'error')
+        return redirect(url_for('hr.view_applicant', id=id))
+
     if selected_test_id:
-        link_url = f"https://apiv3.imocha.io/v3/tests/{selected_test_id}/testlinks"
-        link_response = requests.get(link_url, headers=headers)
-        if link_response.status_code == 200:
-            link_data = link_response.json()
-            test_links = {
-                link["testLinkId"]: link.get("testLinkName", "Unnamed Link")
-                for link in link_data.get("testLinks", [])
-            }
+        try:
+            test_links = catalogue.test_links(selected_test_id)
+        except requests.RequestException as e:
+            current_app.logger.error(f"Failed to load test links for test {selected_test_id}: {e}")
 
     return render_template(
         'hr/test_schedule.html',
@@ -1437,17 +1422,25 @@ def schedule_test(id):
         test_links=test_links
     )
 
+@bp.route('/refresh_test_catalogue/<int:id>', methods=['POST'])
+@no_cache
+@login_required
+@role_required(*HR_ROLES)
+def refresh_test_catalogue(id):
+    try:
+        catalogue.refresh()
+        flash('Test list refreshed from iMocha.', 'success')
+        current_app.logger.info(f"iMocha test catalogue refreshed by {current_user.username}")
+    except requests.RequestException as e:
+        current_app.logger.error(f"Failed to refresh iMocha tests: {e}")
+        flash('Could not reach iMocha. Please try again later.', 'error')
+    return redirect(url_for('hr.schedule_test', id=id, test_id=request.form.get('test_id', type=int)))
+
 @bp.route('/schedule_default/<int:id>/<int:testId>/<start_test_date>/<test_time>/<end_test_date>', methods=['GET', 'POST'])
 @no_cache
 @login_required
 @role_required(*HR_ROLES)
 def schedule_default(id,testId,start_test_date,end_test_date,test_time):
-    api_url="https://apiv3.imocha.io/v3/tests/"+str(testId)+"/invite"
-    headers = {
-        "X-API-KEY": "MLgDuuMLvhyRcoHxmaGBBHxBItiKrb",
-        "Content-Type": "application/json"
-    }
-    
     applicant = Applicant.query.get_or_404(id)
     history= RecruitmentHistory.query.filter_by(applicant_id=applicant.id).first()
     if history.test_id:
@@ -1464,7 +1457,12 @@ def schedule_default(id,testId,start_test_date,end_test_date,test_time):
         "timeZoneId": 1720,
         "ProctoringMode": "image",
     }
-    response = requests.post(api_url, headers=headers, json=data)  
+    try:
+        response = imocha().post(f'tests/{testId}/invite', endpoint='tests/{id}/invite', json=data)
+    except requests.RequestException as e:
+        current_app.logger.error(f"Failed to schedule test for applicant {applicant.id}: {e}")
+        flash('Could not reach iMocha. Please try again later.', 'error')
+        return redirect(url_for('hr.view_applicant', id=applicant.id))
 
     try:
         response_data = response.json()
@@ -1501,13 +1499,13 @@ def schedule_linkid(id, testId, testLinkId, start_test_date, end_test_date, test
         "ProctoringMode": "image",
     }
 
-    api_url = f"https://apiv3.imocha.io/v3/tests/{testId}/testlinks/{testLinkId}/invite"
-    headers = {
-        "X-API-KEY": "MLgDuuMLvhyRcoHxmaGBBHxBItiKrb",
-        "Content-Type": "application/json"
-    }
-
-    response = requests.post(api_url, headers=headers, json=data)
+    try:
+        response = imocha().post(f'tests/{testId}/testlinks/{testLinkId}/invite',
+                                 endpoint='tests/{id}/testlinks/{id}/invite', json=data)
+    except requests.RequestException as e:
+        current_app.logger.error(f"Failed to schedule test with link for applicant {applicant.id}: {e}")
+        flash('Could not reach iMocha. Please try again later.', 'error')
+        return redirect(url_for('hr.view_applicant', id=applicant.id))
 
     if response.status_code != 200:
         flash('Failed to schedule test with link. Please try again later.', 'error')
@@ -1548,13 +1546,20 @@ def test_result(id):
     applicant= Applicant.query.get_or_404(id)
     history = RecruitmentHistory.query.filter_by(applicant_id=applicant.id).first()
     testInviteid = history.test_id
-    api_url="https://apiv3.imocha.io/v3/reports/"+str(testInviteid)+"?reportType=1"
-    headers = {
-        "X-API-KEY": "MLgDuuMLvhyRcoHxmaGBBHxBItiKrb",
-        "Content-Type": "application/json"
-    }
 
-    response = requests.get(api_url, headers=headers)
+    # Completed reports are stored by the results poller; iMocha is only asked directly
+    # for tests it has not picked up yet
+    stored = db.session.get(TestResult, testInviteid) if testInviteid else None
+    if stored and stored.report:
+        return render_template('hr/test_result.html', id=id, result=stored.report)
+
+    try:
+        response = imocha().get(f'reports/{testInviteid}', endpoint='reports/{id}', params={'reportType': 1})
+    except requests.RequestException as e:
+        current_app.logger.error(f"Failed to fetch test results for applicant {id}: {e}")
+        flash('Could not reach iMocha. Please try again later.', 'error')
+        return redirect(url_for('hr.view_applicant', id=id))
+
     if response.status_code != 200:
         flash('Failed to fetch test results. Please try again later.', 'error')
         current_app.logger.error(f"Failed to fetch test results for applicant {id}: {response.text}")
@@ -1568,6 +1573,12 @@ def test_result(id):
         return redirect(url_for('hr.view_applicant', id=id))
     
     else:
+        if results.is_complete(result):
+            try:
+                with db.session.begin_nested():
+                    results.upsert_result(history, result)
+            except (IntegrityError, KeyError, TypeError, ValueError) as e:
+                current_app.logger.warning(f"Could not store test result for applicant {id}: {e!r}")
         history.test_result=True
         db.session.commit()
         return render_template('hr/test_result.html',id=id, result=result)
@@ -1589,36 +1600,79 @@ def available_interviewers():
         if not is_future_or_today(interview_datetime.date()):
             return jsonify([])
 
-        interviewers = User.query.filter_by(role='interviewer').all()
-        hr_interviewers = User.query.filter(User.role.in_(['HR', 'Admin', 'Interviewer'])).all()
-        interviewer_ids = [i.id for i in interviewers]
-
-        scheduled_interviews = Interview.query.filter(
-            Interview.date == interview_datetime.date(),
-            Interview.interviewer_id.in_(interviewer_ids)
-        ).all()
-
-        busy_interviewers = set()
-
-        for interview in scheduled_interviews:
-            scheduled_datetime = datetime.combine(interview.date, interview.time)
-            time_diff = abs((scheduled_datetime - interview_datetime))
-
-            if time_diff < timedelta(hours=1):
-                busy_interviewers.add(interview.interviewer_id)
+        interviewers = refdata.interviewers()
+        day = interview_datetime.date()
+        free = set(availability.Availability.load([i.id for i in interviewers], day, day).free_at(interview_datetime))
 
         available_interviewers = [
             {"id": interviewer.id, "name": interviewer.name}
             for interviewer in interviewers
-            if interviewer.id not in busy_interviewers
+            if interviewer.id in free
         ]
 
         return jsonify(available_interviewers)
 
     except ValueError:
         return jsonify([])
-    
-    
+
+@bp.route('/interviewer_slots', methods=['GET'])
+@no_cache
+@login_required
+@role_required(*HR_ROLES)
+def interviewer_slots():
+    # ?interviewer_ids=1&interviewer_ids=2&start=YYYY-MM-DD&days=N: each interviewer's free windows
+    try:
+        interviewer_ids = [int(i) for i in request.args.getlist('interviewer_ids')]
+        start_str = request.args.get('start')
+        first_day = datetime.strptime(start_str, '%Y-%m-%d').date() if start_str else date.today()
+        days = int(request.args.get('days', 7))
+    except ValueError:
+        return jsonify({"error": "Invalid interviewer ids, start date or number of days."}), 400
+    days = max(1, min(days, current_app.config['INTERVIEW_SLOT_MAX_DAYS']))
+    first_day = max(first_day, date.today())
+
+    calendar = availability.Availability.load(interviewer_ids, first_day, first_day + timedelta(days=days - 1))
+    return jsonify({
+        str(interviewer_id): [
+            {"start": start.isoformat(timespec='minutes'), "end": end.isoformat(timespec='minutes')}
+            for start, end in calendar.free_slots(interviewer_id, first_day, days)
+        ]
+        for interviewer_id in interviewer_ids
+    })
+
+@bp.route('/common_slots', methods=['GET'])
+@no_cache
+@login_required
+@role_required(*HR_ROLES)
+def common_slots():
+    # The earliest slots when every interviewer in ?interviewer_ids= is free, e.g. for reschedule_interview:
+    # &start=YYYY-MM-DD&days=N&duration=<minutes>&day_start=HH:MM&day_end=HH:MM&limit=N (all optional)
+    config = current_app.config
+    try:
+        interviewer_ids = list(dict.fromkeys(int(i) for i in request.args.getlist('interviewer_ids')))
+        start_str = request.args.get('start')
+        first_day = datetime.strptime(start_str, '%Y-%m-%d').date() if start_str else date.today()
+        days = int(request.args.get('days', 14))
+        length = timedelta(minutes=int(request.args.get('duration', config['INTERVIEW_DURATION'])))
+        day_start = datetime.strptime(request.args.get('day_start', config['INTERVIEW_DAY_START']), '%H:%M').time()
+        day_end = datetime.strptime(request.args.get('day_end', config['INTERVIEW_DAY_END']), '%H:%M').time()
+        limit = int(request.args.get('limit', 5))
+    except ValueError:
+        return jsonify({"error": "Invalid interviewer ids, date range, duration, working hours or limit."}), 400
+    if not interviewer_ids or length <= timedelta(0) or limit < 1 or day_start >= day_end:
+        return jsonify({"error": "Give at least one interviewer, a positive duration and limit, and working hours that end after they start."}), 400
+    days = max(1, min(days, config['INTERVIEW_SLOT_MAX_DAYS']))
+    first_day = max(first_day, date.today())
+
+    calendar = availability.Availability.load(interviewer_ids, first_day, first_day + timedelta(days=days - 1))
+    slots = calendar.common_slots(interviewer_ids, first_day, days, min(limit, config['INTERVIEW_SLOT_MAX_RESULTS']),
+                                  length=length, day_start=day_start, day_end=day_end)
+    return jsonify([
+        {"start": start.isoformat(timespec='minutes'), "end": end.isoformat(timespec='minutes')}
+        for start, end in slots
+    ])
+
+
 # @bp.route('/available_interviewers', methods=['GET'])
 # @no_cache
 # @login_required
@@ -1687,10 +1741,10 @@ def available_interviewers():
 @login_required
 @role_required(*HR_ROLES)
 def filter_all_applicants():
-    hr_users = User.query.filter(User.role.in_(['hr', 'admin'])).all()
-    jobs = JobRequirement.query.order_by(JobRequirement.position).all()
+    hr_users = refdata.hr_users()
+    jobs = refdata.all_jobs()
     stages = ['Applied','On Hold','Offered','Joined','Rejected']
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     per_page = 20
 
     hr_id = request.args.get('hr_id', '')
@@ -1698,7 +1752,7 @@ def filter_all_applicants():
     status_id = request.args.get('status', '')
     stage = request.args.get('all_stages','').strip()
 
-    query = Applicant.query
+    query = applicant_rows()
 
     if hr_id:
         query = query.filter(Applicant.uploaded_by == int(hr_id))
@@ -1714,7 +1768,7 @@ def filter_all_applicants():
     if stage:
         query = query.filter(Applicant.status==stage)
 
-    applicants_pagination = query.order_by(Applicant.last_applied.desc()).paginate(page=page, per_page=per_page, error_out=False)
+    applicants_pagination = keyset_paginate(query, 'date', cursor=cursor, per_page=per_page, count='approx')
     applicants = applicants_pagination.items
 
     return render_template('hr/applicants_all.html', applicants=applicants, users=hr_users, jobs=jobs, all_stages=stages, selected_stage=stage, pagination=applicants_pagination)
@@ -1726,32 +1780,21 @@ def filter_all_applicants():
 def sort_all_applicants():
     sort_by = request.args.get('sort_by', 'date')
     
-    # Eager load uploader and job for display
-    query = Applicant.query.options(
-        joinedload(Applicant.uploader),
-        joinedload(Applicant.job)
-    )
-
-    if sort_by == 'name':
-        query = query.order_by(Applicant.name.asc())
-    elif sort_by == 'hr':
-        # join uploader explicitly and order by User.name
-        query = query.join(Applicant.uploader).order_by(User.name.asc())
-    else:  # Default to sorting by latest application
-        query = query.order_by(Applicant.last_applied.desc())
-
-    applicants = query.all()
+    # List columns only, with the uploader and job names for display
+    query = applicant_rows()
 
     # For filter dropdowns
-    users = User.query.filter(User.role.in_(['hr', 'admin'])).all()
-    jobs = JobRequirement.query.all()
+    users = refdata.hr_users()
+    jobs = refdata.all_jobs()
 
-    return render_template(
+    # Sorted by latest application (default), name or uploader name, one page at a time
+    return render_applicant_listing(
         'hr/applicants_all.html',
-        applicants=applicants,
+        query,
+        sort_by,
         users=users,
         jobs=jobs,
-        search_query='' 
+        search_query=''
     )
 
 @bp.route('/search_all_applicants')
@@ -1764,20 +1807,13 @@ def search_all_applicants():
     if not search_query:
         return redirect(url_for('hr.applicants'))
     
-    if '@' in search_query:
-        applicants = Applicant.query.filter(
-            Applicant.email.ilike(f'%{search_query}%')
-        ).options(joinedload(Applicant.uploader)).order_by(Applicant.last_applied.desc()).all()
-    else:
-        applicants = Applicant.query.filter(
-            Applicant.name.ilike(f'%{search_query}%'),
-        ).options(joinedload(Applicant.uploader)).order_by(Applicant.last_applied.desc()).all()
-    
+    query = applicant_rows()
+    query = query.filter(applicant_search_filter(search_query))
     
-    jobs = JobRequirement.query.filter(JobRequirement.is_open == True).order_by(JobRequirement.position).all()
-    hrs = User.query.filter(User.role.in_(['hr', 'admin'])).all()
+    jobs = refdata.open_jobs()
+    hrs = refdata.hr_users()
     
-    return render_template('hr/applicants_all.html', applicants=applicants, users=hrs, jobs=jobs, search_query=search_query)
+    return render_applicant_listing('hr/applicants_all.html', query, users=hrs, jobs=jobs, search_query=search_query)
 
 
 @bp.route('/search_sort_filter_all_applicants', methods=['GET'])
@@ -1787,7 +1823,7 @@ def search_all_applicants():
 def search_sort_filter_all_applicants():
     search_query = request.args.get('query', '').strip()
     sort_by = request.args.get('sort_by', 'date')
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     per_page = 20
 
     hr_id = request.args.get('hr_id', '')
@@ -1795,17 +1831,11 @@ def search_sort_filter_all_applicants():
     status_id = request.args.get('status', '')
     stage = request.args.get('all_stages', '').strip()
 
-    query = Applicant.query.options(
-        joinedload(Applicant.uploader),
-        joinedload(Applicant.job)
-    )
+    query = applicant_rows()
 
     # Apply search filter
     if search_query:
-        if '@' in search_query:
-            query = query.filter(Applicant.email.ilike(f'%{search_query}%'))
-        else:
-            query = query.filter(Applicant.name.ilike(f'%{search_query}%'))
+        query = query.filter(applicant_search_filter(search_query))
 
     # Apply additional filters
     if hr_id:
@@ -1819,20 +1849,13 @@ def search_sort_filter_all_applicants():
     if stage:
         query = query.filter(Applicant.status == stage)
 
-    # Apply sort filter
-    if sort_by == 'name':
-        query = query.order_by(Applicant.name.asc())
-    elif sort_by == 'hr':
-        query = query.join(Applicant.uploader).order_by(User.name.asc())
-    else:
-        query = query.order_by(Applicant.last_applied.desc())
-
-    applicants_pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    # Apply sort filter and paginate
+    applicants_pagination = keyset_paginate(query, sort_by, cursor=cursor, per_page=per_page, count='approx')
     applicants = applicants_pagination.items
 
     # For the dropdowns (HR, Jobs)
-    users = User.query.filter(User.role.in_(['hr', 'admin'])).all()
-    jobs = JobRequirement.query.all()
+    users = refdata.hr_users()
+    jobs = refdata.all_jobs()
     stages = ['Applied','On Hold','Offered','Joined','Rejected']
     selected_stage = stage
 
@@ -1855,7 +1878,7 @@ def search_sort_filter_all_applicants():
 def search_sort_filter_applicants():
     search_query = request.args.get('query', '').strip()
     sort_by = request.args.get('sort_by', 'date')
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     per_page = 20
 
     hr_id = request.args.get('hr_id', '')
@@ -1863,17 +1886,11 @@ def search_sort_filter_applicants():
     status_id = request.args.get('status', '')
     stage = request.args.get('all_stages', '').strip()
 
-    query = Applicant.query.options(
-        joinedload(Applicant.uploader),
-        joinedload(Applicant.job)
-    )
+    query = applicant_rows()
 
     # Apply search filter
     if search_query:
-        if '@' in search_query:
-            query = query.filter(Applicant.email.ilike(f'%{search_query}%'))
-        else:
-            query = query.filter(Applicant.name.ilike(f'%{search_query}%'))
+        query = query.filter(applicant_search_filter(search_query))
 
     query = query.filter(~Applicant.status.in_(excluded_stages))
 
@@ -1889,20 +1906,13 @@ def search_sort_filter_applicants():
     if stage:
         query = query.filter(Applicant.status == stage)
 
-    # Apply sort filter
-    if sort_by == 'name':
-        query = query.order_by(Applicant.name.asc())
-    elif sort_by == 'hr':
-        query = query.join(Applicant.uploader).order_by(User.name.asc())
-    else:
-        query = query.order_by(Applicant.last_applied.desc())
-
-    applicants_pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    # Apply sort filter and paginate
+    applicants_pagination = keyset_paginate(query, sort_by, cursor=cursor, per_page=per_page, count='approx')
     applicants = applicants_pagination.items
 
     # For the dropdowns (HR, Jobs)
-    users = User.query.filter(User.role.in_(['hr', 'admin'])).all()
-    jobs = JobRequirement.query.all()
+    users = refdata.hr_users()
+    jobs = refdata.all_jobs()
     stages = ['Applied','On Hold','Offered','Joined','Rejected']
     selected_stage = stage
 
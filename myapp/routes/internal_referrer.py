@@ -6,6 +6,7 @@ from myapp.models.users import User
 from myapp.models.jobrequirement import JobRequirement
 from myapp.utils import validate_file
 from myapp.extensions import db
+from myapp import refdata
 from werkzeug.utils import secure_filename
 from datetime import date
 import os
@@ -29,7 +30,7 @@ def refer_candidates():
         return {'error': 'Session expired. Please log in again.'}, 401
 
     # Fetch all job positions (id + position name) for dropdown
-    job_positions = JobRequirement.query.with_entities(JobRequirement.id, JobRequirement.position).filter(JobRequirement.is_open == True).all()
+    job_positions = refdata.open_jobs()
 
     if request.method == 'POST':
         file = request.files.get('cv')
@@ -87,5 +88,5 @@ def refer_candidates():
 @role_required('internal_referrer', 'admin')
 def referrals():
     referrals = Referral.query.filter_by(referrer_id=current_user.id).order_by(Referral.referral_date.desc()).all()
-    jobs= JobRequirement.query.filter(JobRequirement.is_open == True).order_by(JobRequirement.position).all()
+    jobs = refdata.open_jobs()
     return render_template('internal_referrer/candidates.html', referrals=referrals, jobs=jobs)
\ No newline at end of file
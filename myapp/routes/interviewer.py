@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, abort
 from flask_login import login_required, current_user
 from myapp.auth.decorators import role_required, no_cache
 from myapp.models.interviews import Interview
@@ -7,6 +7,7 @@ from myapp.models.users import User
 from myapp.models.jobrequirement import JobRequirement
 from myapp.models.recruitment_history import RecruitmentHistory
 from myapp.extensions import db
+from myapp import refdata, board, ics
 from sqlalchemy.orm import joinedload
 
 bp = Blueprint('interviewer', __name__, url_prefix='/interviewer')
@@ -25,25 +26,17 @@ def dashboard():
 @role_required(*INTERVIEWER_ROLES, 'hr')
 def view_interviews():
     if current_user.role == 'interviewer':
-        interviews = Interview.query.filter_by(interviewer_id=current_user.id).filter_by(completed=False).all()
-        applicant_ids = [interview.applicant_id for interview in interviews]
-        applicants = Applicant.query.filter(Applicant.id.in_(applicant_ids)).all()
-        return render_template('interviewer/interviews.html', interviews=interviews, applicants=applicants)
-    else:
-        hr_users = User.query.filter(User.role.in_(['hr', 'admin'])).all()
-        interviewers = User.query.filter_by(role='interviewer').all()
-        
-        # Get interviews with relationships
-        interviews = db.session.query(Interview)\
-            .filter_by(completed=False)\
-            .options(
-                joinedload(Interview.applicant),
-                joinedload(Interview.interviewer),
-                joinedload(Interview.scheduler)
-            )\
-            .all()
+        return board.render_board('interviewer/interviews.html', options=board.INTERVIEWER_OPTIONS,
+                                  interviewer_id=current_user.id, calendar_url=ics.feed_url(current_user.id))
+    return board.render_board('hr/view_interviews.html', users=refdata.hr_users(), interviewers=refdata.interviewers())
 
-        return render_template('hr/view_interviews.html', interviews=interviews, users=hr_users, interviewers=interviewers)
+# No login: calendar clients authenticate with the signed token in the URL
+@bp.route('/calendar/<token>.ics')
+def calendar_feed(token):
+    interviewer_id = ics.interviewer_for(token)
+    if interviewer_id is None:
+        abort(404)
+    return ics.response(interviewer_id)
 
 @bp.route('/view_interviewee/<int:id>')
 @no_cache
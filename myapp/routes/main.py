@@ -6,7 +6,10 @@ from myapp.auth.decorators import role_required, no_cache
 from myapp.models.applicants import Applicant
 from myapp.models.jobrequirement import JobRequirement
 from myapp.models.referrals import Referral
-from myapp.utils import generate_timeline, update_status
+from myapp.utils import generate_timeline
+from myapp.search import search_jobs
+from myapp import refdata
+from myapp.sessions import heartbeat, sessionless
 from myapp.extensions import db
 
 
@@ -29,14 +32,17 @@ def profile():
 @login_required
 @role_required('hr', 'admin', 'internal_referrer', 'external_referrer')
 def track_status(id):
-    update_status(id)
     timeline = generate_timeline(id)
     applicant = Applicant.query.get_or_404(id)
     return render_template('track.html', timeline=timeline, applicant=applicant)
 
 @bp.route('/check_session')
+@no_cache
+@sessionless
 def check_session():
-    return jsonify({'active': current_user.is_authenticated})
+    # Polled by every open tab; answered from the heartbeat cookie, without the session or the user
+    expires_in = heartbeat()
+    return jsonify({'active': expires_in > 0, 'expires_in': expires_in})
 
 # Job Listing Routes
 @bp.route('/view_joblisting')
@@ -46,7 +52,7 @@ def view_joblisting():
     jobs = JobRequirement.query.options(joinedload(JobRequirement.created_by)).order_by(JobRequirement.is_open.desc()).all()
     if current_user.role=='referral':
         jobs = JobRequirement.query.options(joinedload(JobRequirement.created_by)).order_by(JobRequirement.is_open.desc()).all()
-    hr_users = User.query.filter(User.role.in_(['hr', 'admin'])).all()
+    hr_users = refdata.hr_users()
     
     return render_template('viewjobs.html', jobs=jobs, users=hr_users, is_open=jobs)
 
@@ -63,7 +69,7 @@ def view_details_joblisting(id):
 def filter_joblistings():
     hr_id = request.args.get('hr_id')
     status = request.args.get('status')
-    hr_users = User.query.filter(User.role.in_(['hr', 'admin'])).all()
+    hr_users = refdata.hr_users()
     query = JobRequirement.query
 
     # Apply HR filter if provided
@@ -85,12 +91,9 @@ def filter_joblistings():
 @no_cache
 @login_required
 def search_job():
-    query = request.args.get('q', '')
+    query = request.args.get('q', '').strip()
     if query:
-        jobs = JobRequirement.query.filter(
-            (JobRequirement.position.ilike(f'%{query}%')) |
-            (JobRequirement.description.ilike(f'%{query}%'))
-        ).order_by(JobRequirement.position.asc()).all()
+        jobs = search_jobs(query)
     else:
         jobs = JobRequirement.query.order_by(JobRequirement.position.asc()).all()
 
@@ -0,0 +1,174 @@
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, literal_column, or_
+from myapp.extensions import db
+from myapp.models.applicants import Applicant
+from myapp.models.jobrequirement import JobRequirement
+from collections import defaultdict
+import bisect
+import re
+
+# Applicant and job search. On Postgres, matching runs against the pg_trgm GIN indexes
+# (substring ILIKE) and the generated search_vector tsvector columns (word-prefix
+# full-text) added by the search migration. Other backends (SQLite in tests) use an
+# in-process trigram/prefix index with the same matching and ranking rules.
+
+def _is_postgres():
+    return db.session.get_bind().dialect.name == 'postgresql'
+
+def _words(term):
+    return re.findall(r'\w+', term.lower())
+
+def prefix_tsquery(term):
+    # "jo smi" -> "jo:* & smi:*" so every word typed so far matches the start of a word
+    return ' & '.join(f'{word}:*' for word in _words(term))
+
+def _trigrams(text, padded=False):
+    grams = set()
+    for word in (_words(text) if padded else [text.lower()]):
+        word = f'  {word} ' if padded else word
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return grams
+
+def similarity(a, b):
+    # Same measure as pg_trgm's similarity(): shared padded word trigrams over all trigrams
+    left, right = _trigrams(a, padded=True), _trigrams(b, padded=True)
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+class SearchIndex:
+    def __init__(self):
+        self.docs = {}
+        self.trigrams = defaultdict(set)
+        self.tokens = defaultdict(set)
+        self._sorted_tokens = None
+
+    def add(self, ident, text):
+        self.remove(ident)
+        text = (text or '').lower()
+        self.docs[ident] = text
+        for gram in _trigrams(text):
+            self.trigrams[gram].add(ident)
+        for word in _words(text):
+            self.tokens[word].add(ident)
+        self._sorted_tokens = None
+
+    def remove(self, ident):
+        text = self.docs.pop(ident, None)
+        if text is None:
+            return
+        for gram in _trigrams(text):
+            self.trigrams[gram].discard(ident)
+        for word in _words(text):
+            self.tokens[word].discard(ident)
+        self._sorted_tokens = None
+
+    def _substring(self, term):
+        needle = term.lower()
+        grams = _trigrams(needle)
+        if grams:
+            candidates = set.intersection(*(self.trigrams.get(g, set()) for g in grams))
+        else:
+            candidates = self.docs.keys()
+        return {ident for ident in candidates if needle in self.docs[ident]}
+
+    def _prefix(self, term):
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(t for t, ids in self.tokens.items() if ids)
+        matches = None
+        for word in _words(term):
+            ids = set()
+            start = bisect.bisect_left(self._sorted_tokens, word)
+            for token in self._sorted_tokens[start:]:
+                if not token.startswith(word):
+                    break
+                ids |= self.tokens[token]
+            matches = ids if matches is None else matches & ids
+        return matches or set()
+
+    def search(self, term):
+        prefixed = self._prefix(term)
+        scores = {}
+        for ident in self._substring(term) | prefixed:
+            scores[ident] = similarity(term, self.docs[ident]) + (1.0 if ident in prefixed else 0.0)
+        return scores
+
+# index name -> (model, indexed columns, text of a row or entity)
+SOURCES = {
+    'applicant_name': (Applicant, (Applicant.name,), lambda a: a.name),
+    'applicant_email': (Applicant, (Applicant.email,), lambda a: a.email),
+    'job': (JobRequirement, (JobRequirement.position, JobRequirement.description),
+            lambda j: f'{j.position or ""} {j.description or ""}'),
+}
+
+def get_index(name):
+    # Built once per app from the table, then kept current by the mapper events below
+    indexes = current_app.extensions.setdefault('search_index', {})
+    if name not in indexes:
+        model, columns, text_of = SOURCES[name]
+        index = SearchIndex()
+        for row in db.session.query(model.id, *columns).yield_per(1000):
+            index.add(row.id, text_of(row))
+        indexes[name] = index
+    return indexes[name]
+
+def _sync(mapper, connection, target, removed=False):
+    if not has_app_context():
+        return
+    indexes = current_app.extensions.get('search_index', {})
+    for name, (model, _, text_of) in SOURCES.items():
+        if isinstance(target, model) and name in indexes:
+            if removed:
+                indexes[name].remove(target.id)
+            else:
+                indexes[name].add(target.id, text_of(target))
+
+for _model in (Applicant, JobRequirement):
+    event.listen(_model, 'after_insert', _sync)
+    event.listen(_model, 'after_update', _sync)
+    event.listen(_model, 'after_delete', lambda m, c, t: _sync(m, c, t, removed=True))
+
+def applicant_search_filter(term):
+    # Email-looking queries match on email, anything else on the applicant's name
+    if '@' in term:
+        if _is_postgres():
+            return Applicant.email.ilike(f'%{term}%')
+        return Applicant.id.in_(list(get_index('applicant_email').search(term)))
+
+    if _is_postgres():
+        clause = Applicant.name.ilike(f'%{term}%')
+        if _words(term):
+            vector = literal_column('applicants.search_vector')
+            clause = or_(clause, vector.op('@@')(func.to_tsquery('simple', prefix_tsquery(term))))
+        return clause
+    return Applicant.id.in_(list(get_index('applicant_name').search(term)))
+
+def suggest_applicants(term, limit=10):
+    if '@' in term or not _words(term):
+        return Applicant.query.filter(applicant_search_filter(term)).order_by(Applicant.last_applied.desc()).limit(limit).all()
+
+    if _is_postgres():
+        vector = literal_column('applicants.search_vector')
+        rank = func.ts_rank(vector, func.to_tsquery('simple', prefix_tsquery(term))) + func.similarity(Applicant.name, term)
+        return Applicant.query.filter(applicant_search_filter(term)).order_by(rank.desc(), Applicant.id).limit(limit).all()
+
+    scores = get_index('applicant_name').search(term)
+    best = sorted(scores, key=lambda ident: (-scores[ident], ident))[:limit]
+    rows = {a.id: a for a in Applicant.query.filter(Applicant.id.in_(best)).all()}
+    return [rows[ident] for ident in best if ident in rows]
+
+def search_jobs(term):
+    # Jobs matching on position or description, most relevant first
+    if _is_postgres():
+        clause = or_(JobRequirement.position.ilike(f'%{term}%'), JobRequirement.description.ilike(f'%{term}%'))
+        rank = func.similarity(JobRequirement.position, term)
+        if _words(term):
+            vector = literal_column('jobrequirement.search_vector')
+            tsquery = func.to_tsquery('english', prefix_tsquery(term))
+            clause = or_(clause, vector.op('@@')(tsquery))
+            rank = rank + func.ts_rank(vector, tsquery)
+        return JobRequirement.query.filter(clause).order_by(rank.desc(), JobRequirement.position.asc()).all()
+
+    scores = get_index('job').search(term)
+    jobs = JobRequirement.query.filter(JobRequirement.id.in_(list(scores))).all()
+    return sorted(jobs, key=lambda job: (-scores[job.id], job.position))
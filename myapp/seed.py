@@ -0,0 +1,238 @@
+from flask.cli import with_appcontext
+from sqlalchemy import func, insert
+from werkzeug.security import generate_password_hash
+from myapp.availability import duration
+from myapp.extensions import db
+from myapp.models.applicants import Applicant
+from myapp.models.recruitment_history import RecruitmentHistory, derive_stage
+from myapp.models.interviews import Interview
+from myapp.models.referrals import Referral
+from myapp.models.jobrequirement import JobRequirement
+from myapp.models.testresult import TestResult
+from myapp.models.users import User
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+import click
+import random
+
+# Synthetic data for load testing and benchmarks (see benchmarks/endpoints.py). Staff
+# users and job listings are created once; applicants are appended in batches, each one
+# with a recruitment history and, depending on how far along it is, a test result,
+# interview rows and a referral. Rows go in through multi-row INSERTs, and current_stage
+# is derived as rows are generated, so 1M applicants is a matter of minutes rather than
+# hours. The same --seed produces the same data. Generated users sign in with
+# SEED_PASSWORD; their usernames start with 'seed-'.
+#
+# The INSERTs bypass the session, so interview starts_at/ends_at are filled in here rather
+# than by myapp.availability. Interviews from today on are pending, and the database refuses
+# overlapping pending interviews for one interviewer, so each of those is given an
+# interviewer and time that are still free, as far as this and earlier runs have booked.
+
+SEED_PASSWORD = 'seed-password'
+
+STAFF = {'hr': 10, 'interviewer': 40, 'internal_referrer': 20, 'external_referrer': 10}
+POSITIONS = ['Backend Engineer', 'Frontend Engineer', 'Data Engineer', 'QA Engineer', 'DevOps Engineer',
+             'Product Manager', 'Business Analyst', 'Embedded Engineer', 'ML Engineer', 'Support Engineer']
+FIRST_NAMES = ['Aarav', 'Ananya', 'Rohan', 'Priya', 'Vikram', 'Sneha', 'Arjun', 'Kavya', 'Rahul', 'Meera',
+               'Karthik', 'Divya', 'Nikhil', 'Pooja', 'Siddharth', 'Lakshmi', 'Aditya', 'Neha', 'Varun', 'Isha']
+LAST_NAMES = ['Sharma', 'Iyer', 'Reddy', 'Nair', 'Gupta', 'Rao', 'Patel', 'Menon', 'Kulkarni', 'Shetty',
+              'Joshi', 'Pillai', 'Verma', 'Hegde', 'Das', 'Bhat', 'Kapoor', 'Naidu', 'Mishra', 'Gowda']
+CITIES = ['Bengaluru', 'Mysuru', 'Chennai', 'Hyderabad', 'Pune', 'Mumbai', 'Kochi', 'Mangaluru']
+STATUSES = [('Applied', 80), ('Rejected', 10), ('On Hold', 4), ('Offered', 3), ('Joined', 3)]
+FILLER = ('Worked on customer-facing services, owned releases and on-call for two quarters, '
+          'and mentored two junior engineers. ')
+
+def staff(rng):
+    # Staff users and job listings, created on the first run and reused afterwards
+    existing = {u.username: u for u in User.query.filter(User.username.like('seed-%'))}
+    password_hash = generate_password_hash(SEED_PASSWORD, method="pbkdf2:sha256")
+    users = {}
+    for role, count in STAFF.items():
+        users[role] = []
+        for i in range(count):
+            username = f'seed-{role}-{i}'
+            user = existing.get(username)
+            if user is None:
+                user = User(username=username, email=f'{username}@example.test', role=role, auth_type='local',
+                            name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}', password_hash=password_hash)
+                db.session.add(user)
+            users[role].append(user)
+    db.session.flush()
+
+    jobs = JobRequirement.query.filter(JobRequirement.description.like('Seeded:%')).all()
+    for i in range(len(jobs), 50):
+        job = JobRequirement(position=f'{POSITIONS[i % len(POSITIONS)]} {i // len(POSITIONS) + 1}',
+                             description=f'Seeded: {FILLER * 3}', skillset='Python, SQL',
+                             experience=f'{i % 8}+ years', budget=f'{8 + i % 20} LPA', is_open=i % 5 != 0,
+                             created_by_id=users['hr'][i % STAFF['hr']].id)
+        db.session.add(job)
+        jobs.append(job)
+    db.session.commit()
+    return {role: [u.id for u in members] for role, members in users.items()}, [j.id for j in jobs]
+
+def working_time(rng):
+    return time(rng.randint(9, 17), rng.choice((0, 30)))
+
+def pending_bookings(today):
+    # (interviewer id, day) -> [(starts_at, ends_at)] of the pending interviews from today on
+    pending = defaultdict(list)
+    rows = db.session.query(Interview.interviewer_id, Interview.starts_at, Interview.ends_at)\
+        .filter(Interview.completed == False, Interview.starts_at >= datetime.combine(today, time()))
+    for interviewer_id, starts_at, ends_at in rows:
+        pending[interviewer_id, starts_at.date()].append((starts_at, ends_at))
+    return pending
+
+def free_slot(rng, pending, interviewers, day, length):
+    # A random interviewer and working time on `day` clear of every pending booking, trying
+    # each interviewer in turn, and the following days once all of them are full
+    slots = [time(hour, minute) for hour in range(9, 18) for minute in (0, 30)]
+    while True:
+        first = rng.randrange(len(interviewers))
+        for interviewer_id in interviewers[first:] + interviewers[:first]:
+            taken = pending[interviewer_id, day]
+            for slot in rng.sample(slots, len(slots)):
+                starts_at = datetime.combine(day, slot)
+                ends_at = starts_at + length
+                if all(ends_at <= start or end <= starts_at for start, end in taken):
+                    taken.append((starts_at, ends_at))
+                    return interviewer_id, slot, starts_at, ends_at
+        day += timedelta(days=1)
+
+def applicant_row(rng, n, users, jobs, today):
+    fresher = rng.random() < 0.35
+    referred = rng.random() < 0.1
+    return {
+        'name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+        'email': f'candidate{n}@example.test',
+        'phone_number': 6000000000 + n,
+        'dob': today - timedelta(days=rng.randint(21 * 365, 40 * 365)),
+        'gender': rng.choice(('Male', 'Female')),
+        'marital_status': rng.choice(('Single', 'Married')),
+        'native_place': rng.choice(CITIES),
+        'graduation_year': today.year - rng.randint(0, 15),
+        'is_fresher': fresher,
+        'qualification': rng.choice(('B.E.', 'B.Tech', 'MCA', 'M.Tech', 'B.Sc')),
+        'current_location': rng.choice(CITIES),
+        'work_location': rng.choice(CITIES),
+        'experience': None if fresher else str(rng.randint(1, 12)),
+        'current_company': None if fresher else f'Company {rng.randint(1, 500)}',
+        'current_ctc': None if fresher else rng.randint(3, 40) * 100000,
+        'expected_ctc': rng.randint(4, 50) * 100000,
+        'notice_period': None if fresher else rng.choice((15, 30, 60, 90)),
+        'tenure_at_current_company': None if fresher else f'{rng.randint(1, 6)} years',
+        'reason_for_change': None if fresher else FILLER * rng.randint(1, 4),
+        'comments': FILLER * rng.randint(0, 3) or None,
+        'last_applied': today - timedelta(days=rng.randint(0, 720)),
+        'cv_file_path': f'seed/cv_{n}.pdf',
+        'status': rng.choices([s for s, _ in STATUSES], [w for _, w in STATUSES])[0],
+        'uploaded_by': rng.choice(users['hr']),
+        'is_referred': referred,
+        'referred_by': rng.choice(users['internal_referrer'] + users['external_referrer']) if referred else None,
+        'job_id': rng.choice(jobs) if rng.random() < 0.8 else None,
+    }
+
+def progress(rng, row, n, users, today, pending, length):
+    # History for one applicant, plus the interview, test result and referral rows it implies.
+    # applicant_id is filled in once the applicant has been inserted.
+    applied = row['last_applied']
+    history = {'applicant_id': None, 'applied_date': applied, 'rejected': row['status'] == 'Rejected'}
+    interviews, results = [], []
+    day = applied
+
+    if rng.random() < 0.6:
+        day += timedelta(days=rng.randint(1, 10))
+        history.update(test_date=day, test_time=working_time(rng), test_id=5000000 + n)
+        if day < today and rng.random() < 0.8:
+            history['test_result'] = True
+            score = rng.randint(20, 100)
+            results.append({
+                'testlink_id': 5000000 + n, 'applicant_id': None, 'name': row['name'], 'email': row['email'],
+                'date': day, 'score': score, 'total_score': 100, 'time_taken': rng.randint(20, 60), 'test_time': 60,
+                'test_name': 'Seeded Aptitude', 'pdf_link': f'https://example.test/{n}.pdf',
+                'sections': str([{'sectionName': 'Core', 'candidateScore': score, 'sectionScore': 100}]),
+            })
+
+    for stage, round_number in (('interview_round_1', '1'), ('interview_round_2', '2'), ('hr_round', 'HR')):
+        if rng.random() > 0.55:
+            break
+        day += timedelta(days=rng.randint(1, 14))
+        completed = day < today
+        if completed:
+            interviewer_id, slot = rng.choice(users['interviewer']), working_time(rng)
+            starts_at = datetime.combine(day, slot)
+            ends_at = starts_at + length
+        else:
+            interviewer_id, slot, starts_at, ends_at = free_slot(rng, pending, users['interviewer'], day, length)
+            day = starts_at.date()
+        history[f'{stage}_date'], history[f'{stage}_time'] = day, slot
+        if completed:
+            history[f'{stage}_comments'] = rng.choice(('Good fundamentals', 'Needs improvement', 'Strong hire'))
+        interviews.append({
+            'applicant_id': None, 'interviewer_id': interviewer_id,
+            'scheduler_id': rng.choice(users['hr']), 'round_number': round_number, 'date': day, 'time': slot,
+            'starts_at': starts_at, 'ends_at': ends_at,
+            'completed': completed, 'feedback': history.get(f'{stage}_comments'), 'job_id': row['job_id'],
+        })
+
+    history['current_stage'] = derive_stage(row['status'], SimpleNamespace(**{
+        column: history.get(column) for column in (
+            'rejected', 'test_date', 'test_result', 'interview_round_1_date', 'interview_round_1_comments',
+            'interview_round_2_date', 'interview_round_2_comments', 'hr_round_date', 'hr_round_comments')
+    }))
+
+    referral = None
+    if row['is_referred']:
+        referral = {
+            'name': row['name'], 'applicant_id': None, 'referrer_id': row['referred_by'],
+            'referred_by': 'Seeded referrer', 'referral_date': applied - timedelta(days=rng.randint(0, 5)),
+            'cv_file_path': row['cv_file_path'], 'job_id': row['job_id'], 'is_fresher': row['is_fresher'],
+            'is_external_referrer': row['referred_by'] in users['external_referrer'],
+        }
+    return history, interviews, results, referral
+
+def seed_data(applicants, batch_size=5000, seed=42):
+    rng = random.Random(seed)
+    users, jobs = staff(rng)
+    today = date.today()
+    pending, length = pending_bookings(today), duration()
+    start = (db.session.query(func.max(Applicant.id)).scalar() or 0) + 1
+    created = 0
+
+    while created < applicants:
+        numbers = range(start + created, start + min(created + batch_size, applicants))
+        rows = [applicant_row(rng, n, users, jobs, today) for n in numbers]
+        generated = [progress(rng, row, n, users, today, pending, length) for n, row in zip(numbers, rows)]
+        for row, (history, *_) in zip(rows, generated):
+            row['current_stage'] = history['current_stage']
+
+        ids = db.session.scalars(insert(Applicant).returning(Applicant.id, sort_by_parameter_order=True), rows).all()
+        histories, interviews, results, referrals = [], [], [], []
+        for applicant_id, (history, booked, tested, referral) in zip(ids, generated):
+            dependents = [history] + booked + tested + ([referral] if referral else [])
+            for dependent in dependents:
+                dependent['applicant_id'] = applicant_id
+            histories.append(history)
+            interviews += booked
+            results += tested
+            if referral:
+                referrals.append(referral)
+
+        db.session.execute(insert(RecruitmentHistory), histories)
+        for model, batch in ((Interview, interviews), (TestResult, results), (Referral, referrals)):
+            if batch:
+                db.session.execute(insert(model), batch)
+        db.session.commit()
+        created += len(rows)
+        click.echo(f'{created}/{applicants} applicants', err=True)
+    return created
+
+@click.command('seed-data')
+@click.option('--applicants', default=10000, show_default=True, help='Applicants to add.')
+@click.option('--batch-size', default=5000, show_default=True, help='Applicants per transaction.')
+@click.option('--seed', default=42, show_default=True, help='Random seed; the same seed gives the same data.')
+@with_appcontext
+def seed_data_command(applicants, batch_size, seed):
+    """Add synthetic applicants, histories, interviews, referrals and test results."""
+    created = seed_data(applicants, batch_size, seed)
+    click.echo(f'Added {created} applicant(s). Seeded users sign in with password {SEED_PASSWORD!r}.')
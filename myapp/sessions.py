@@ -0,0 +1,209 @@
+from flask import current_app, request
+from flask.cli import with_appcontext
+from flask_session.base import ServerSideSession, ServerSideSessionInterface
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from myapp.extensions import db
+from myapp.models.sessions import StoredSession
+from datetime import datetime
+import click
+import secrets
+import threading
+import time
+
+# Server-side session storage, chosen with SESSION_BACKEND:
+#   sql    the `sessions` table in the application database (default)
+#   redis  the Redis server at SESSION_REDIS_URL; keys expire on their own
+#   local  an in-process cache; a stand-in for Redis in development and tests only, as
+#          every process has its own
+# With sql or redis, any worker on any node can serve any session, provided they all
+# share SECRET_KEY (the session cookie is signed with it).
+#
+# A session is written back only when a request changes it, or when its stored copy is
+# SESSION_REFRESH_INTERVAL seconds old, which pushes its expiry (and the cookie's) out
+# again. Every other request costs one read and no write, so an idle user's session lasts
+# between PERMANENT_SESSION_LIFETIME minus the interval and the full lifetime. Keep large
+# values (tokens, caches) out of the session: it is loaded on every request.
+#
+# Signed-in sessions also carry a small signed heartbeat cookie holding the time the
+# stored session expires. Views marked @sessionless (main.check_session) are served
+# without loading or saving the session, so the heartbeat() they answer from costs no
+# database, session store or user lookup, and polling it never keeps a session alive.
+#
+# SQL has no TTL, so expired rows are skipped on read and deleted by `flask session-gc`,
+# and by each process at most once every SESSION_GC_INTERVAL seconds. Session rows are
+# read and written on their own connection, so saving a session never commits the
+# request's unit of work.
+
+_UPSERT = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+# When the session was last written, in epoch seconds; kept in the session itself so every backend works alike
+STORED_AT = '_stored_at'
+
+class WindowedSession(ServerSideSession):
+    def __bool__(self):
+        # A session holding only bookkeeping keys is empty: it is neither stored nor sent as a cookie
+        return bool(self.keys() - {'_permanent', STORED_AT})
+
+def sessionless(view):
+    # Serve this view without a session (see heartbeat); its rule must have no URL variables
+    view.sessionless = True
+    return view
+
+def _heartbeat_serializer(app):
+    return URLSafeSerializer(app.secret_key, salt='session-heartbeat')
+
+def heartbeat():
+    # Seconds left in the signed-in session, read from the heartbeat cookie alone; 0 when signed out
+    token = request.cookies.get(current_app.config['SESSION_HEARTBEAT_COOKIE'])
+    if not token:
+        return 0
+    try:
+        expires_at = _heartbeat_serializer(current_app).loads(token)
+    except BadSignature:
+        return 0
+    return max(0, int(expires_at - time.time()))
+
+class RefreshWindow:
+    # Mixed into each backend's session interface, ahead of it
+    session_class = WindowedSession
+    sessionless_paths = None
+
+    def open_session(self, app, request):
+        if self.sessionless_paths is None:
+            self.sessionless_paths = {rule.rule for rule in app.url_map.iter_rules()
+                                      if getattr(app.view_functions[rule.endpoint], 'sessionless', False)}
+        if request.path in self.sessionless_paths:
+            return self.make_null_session(app)  # Flask neither saves nor writes to a null session
+        return super().open_session(app, request)
+
+    def should_set_storage(self, app, session):
+        # Called by save_session just before the session is stored; stamps it when it will be
+        now = int(time.time())
+        stored_at = dict.get(session, STORED_AT)  # not session.get, which would add Vary: Cookie
+        if not session.modified and stored_at is not None and now - stored_at < app.config['SESSION_REFRESH_INTERVAL']:
+            return False
+        dict.__setitem__(session, STORED_AT, now)
+        session.expires_at = now + int(app.permanent_session_lifetime.total_seconds())
+        return True
+
+    def should_set_cookie(self, app, session):
+        # Only reached once the session has been stored; the cookie's expiry follows the stored copy's
+        return True
+
+    def save_session(self, app, session, response):
+        super().save_session(app, session, response)
+        name = app.config['SESSION_HEARTBEAT_COOKIE']
+        cookie = {'domain': self.get_cookie_domain(app), 'path': self.get_cookie_path(app)}
+        if '_user_id' not in session:
+            if name in request.cookies:
+                response.delete_cookie(name, **cookie)
+        elif getattr(session, 'expires_at', None):
+            response.set_cookie(
+                name, _heartbeat_serializer(app).dumps(session.expires_at), expires=session.expires_at,
+                httponly=self.get_cookie_httponly(app), secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app), **cookie
+            )
+
+class SqlSessionInterface(RefreshWindow, ServerSideSessionInterface):
+    # Not False: that would make the base class register its own cleanup command
+    ttl = None
+
+    def __init__(self, app, gc_interval=None, **options):
+        super().__init__(app, **options)
+        self.table = StoredSession.__table__
+        self.gc_interval = gc_interval
+        self.gc_lock = threading.Lock()
+        self.next_gc = 0
+        if gc_interval:
+            app.before_request(self.collect_garbage)
+
+    def _retrieve_session_data(self, store_id):
+        with db.engine.connect() as conn:
+            data = conn.execute(select(self.table.c.data).where(
+                self.table.c.id == store_id, self.table.c.expiry > datetime.utcnow()
+            )).scalar()
+        return None if data is None else self.serializer.decode(data)
+
+    def _delete_session(self, store_id):
+        with db.engine.begin() as conn:
+            conn.execute(delete(self.table).where(self.table.c.id == store_id))
+
+    def _upsert_session(self, session_lifetime, session, store_id):
+        values = {'data': self.serializer.encode(session), 'expiry': datetime.utcnow() + session_lifetime}
+        with db.engine.begin() as conn:
+            upsert = _UPSERT.get(conn.dialect.name)
+            if upsert is not None:
+                statement = upsert(self.table).values(id=store_id, **values)
+                conn.execute(statement.on_conflict_do_update(index_elements=[self.table.c.id], set_=values))
+            elif not conn.execute(update(self.table).where(self.table.c.id == store_id).values(values)).rowcount:
+                conn.execute(insert(self.table).values(id=store_id, **values))
+
+    def _delete_expired_sessions(self):
+        with db.engine.begin() as conn:
+            return conn.execute(delete(self.table).where(self.table.c.expiry <= datetime.utcnow())).rowcount
+
+    def collect_garbage(self):
+        # One process-wide sweep per interval; requests arriving meanwhile do not wait for it
+        now = time.monotonic()
+        if request.path in (self.sessionless_paths or ()) or now < self.next_gc or not self.gc_lock.acquire(blocking=False):
+            return
+        try:
+            self.next_gc = now + self.gc_interval
+            self._delete_expired_sessions()
+        finally:
+            self.gc_lock.release()
+
+def _redis_interface(app, options):
+    # redis is only needed, and only installed, where SESSION_BACKEND=redis
+    from flask_session.redis import RedisSessionInterface
+    import redis
+
+    class Interface(RefreshWindow, RedisSessionInterface):
+        pass
+    return Interface(app, client=redis.from_url(app.config['SESSION_REDIS_URL']), **options)
+
+def _local_interface(app, options):
+    from flask_session.cachelib import CacheLibSessionInterface
+    from cachelib import SimpleCache
+
+    class Interface(RefreshWindow, CacheLibSessionInterface):
+        pass
+    return Interface(app, client=SimpleCache(threshold=1000), **options)
+
+def init_app(app):
+    if not app.secret_key:
+        # A key made up per process signs session ids no other worker, node or restart accepts,
+        # logging users out; only a debug or test run may get by with one
+        if not (app.debug or app.testing):
+            raise RuntimeError('SECRET_KEY is not set; set the same SECRET_KEY on every worker and node')
+        app.secret_key = secrets.token_hex(32)
+        app.logger.warning('SECRET_KEY is not set; using a temporary key for this process')
+
+    config = app.config
+    options = {
+        'key_prefix': config['SESSION_KEY_PREFIX'],
+        'use_signer': config['SESSION_USE_SIGNER'],
+        'permanent': config['SESSION_PERMANENT'],
+    }
+    backend = config['SESSION_BACKEND']
+    if backend == 'sql':
+        interface = SqlSessionInterface(app, gc_interval=config['SESSION_GC_INTERVAL'], **options)
+    elif backend == 'redis':
+        interface = _redis_interface(app, options)
+    elif backend == 'local':
+        interface = _local_interface(app, options)
+    else:
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend!r}")
+    app.session_interface = interface
+
+@click.command('session-gc')
+@with_appcontext
+def session_gc_command():
+    """Delete expired sessions from the sessions table."""
+    interface = current_app.session_interface
+    if not isinstance(interface, SqlSessionInterface):
+        click.echo('Sessions are not stored in SQL; nothing to do.')
+        return
+    click.echo(f'Deleted {interface._delete_expired_sessions()} expired session(s).')
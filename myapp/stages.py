@@ -0,0 +1,111 @@
+from flask.cli import with_appcontext
+from sqlalchemy import event, func, inspect, update
+from myapp.extensions import db
+from myapp.models.applicants import Applicant
+from myapp.models.recruitment_history import RecruitmentHistory, derive_stage
+import click
+
+# Stage maintenance. current_stage is a materialized column: it is kept up to date at
+# write time by the before_flush hook below, so pages that display it never recompute
+# or write it. recompute_stages/backfill_stages repair it in bulk, deriving stages from
+# one joined SELECT and writing back only changed rows, one bulk UPDATE per table.
+
+HISTORY_COLUMNS = (
+    RecruitmentHistory.id,
+    RecruitmentHistory.applicant_id,
+    RecruitmentHistory.current_stage,
+    RecruitmentHistory.rejected,
+    RecruitmentHistory.test_date,
+    RecruitmentHistory.test_result,
+    RecruitmentHistory.interview_round_1_date,
+    RecruitmentHistory.interview_round_1_comments,
+    RecruitmentHistory.interview_round_2_date,
+    RecruitmentHistory.interview_round_2_comments,
+    RecruitmentHistory.hr_round_date,
+    RecruitmentHistory.hr_round_comments,
+)
+
+@event.listens_for(db.session, 'before_flush')
+def sync_stages(session, flush_context, instances):
+    # Any flush that touches a history record or an applicant's status also carries the
+    # new stage for both rows, so no separate UPDATE is issued for it
+    with session.no_autoflush:
+        for obj in list(session.new) + list(session.dirty):
+            if isinstance(obj, RecruitmentHistory):
+                history = obj
+                applicant = obj.applicant or (session.get(Applicant, obj.applicant_id) if obj.applicant_id else None)
+            elif isinstance(obj, Applicant) and inspect(obj).attrs.status.history.has_changes() and obj.history_entries:
+                applicant = obj
+                history = min(obj.history_entries, key=lambda h: h.id or 0)
+            else:
+                continue
+
+            if applicant is None:
+                continue
+            stage = derive_stage(applicant.status, history)
+            if history.current_stage != stage:
+                history.current_stage = stage
+            if applicant.current_stage != stage:
+                applicant.current_stage = stage
+
+def derive_stages(applicant_ids):
+    # applicant id -> (history id, stored applicant stage, stored history stage, derived stage)
+    first_history = db.session.query(func.min(RecruitmentHistory.id))\
+        .filter(RecruitmentHistory.applicant_id.in_(applicant_ids))\
+        .group_by(RecruitmentHistory.applicant_id)
+
+    rows = db.session.query(
+        Applicant.status,
+        Applicant.current_stage.label('applicant_stage'),
+        *HISTORY_COLUMNS
+    ).join(RecruitmentHistory, RecruitmentHistory.applicant_id == Applicant.id)\
+        .filter(RecruitmentHistory.id.in_(first_history))\
+        .all()
+
+    return {
+        row.applicant_id: (row.id, row.applicant_stage, row.current_stage, derive_stage(row.status, row))
+        for row in rows
+    }
+
+def recompute_stages(applicant_ids, commit=True):
+    applicant_ids = list(applicant_ids)
+    if not applicant_ids:
+        return 0
+
+    applicant_updates, history_updates = [], []
+    for applicant_id, (history_id, applicant_stage, history_stage, stage) in derive_stages(applicant_ids).items():
+        if applicant_stage != stage:
+            applicant_updates.append({'id': applicant_id, 'current_stage': stage})
+        if history_stage != stage:
+            history_updates.append({'id': history_id, 'current_stage': stage})
+
+    # Bulk UPDATE by primary key; these bypass the per-row after_update listener
+    if applicant_updates:
+        db.session.execute(update(Applicant), applicant_updates)
+    if history_updates:
+        db.session.execute(update(RecruitmentHistory), history_updates)
+    if commit and (applicant_updates or history_updates):
+        db.session.commit()
+
+    return len(applicant_updates)
+
+def backfill_stages(batch_size=1000):
+    # Walks every applicant in id order, one batch per transaction
+    changed, last_id = 0, 0
+    while True:
+        ids = [row.id for row in db.session.query(Applicant.id)
+               .filter(Applicant.id > last_id)
+               .order_by(Applicant.id)
+               .limit(batch_size)]
+        if not ids:
+            return changed
+        changed += recompute_stages(ids)
+        last_id = ids[-1]
+
+@click.command('recompute-stages')
+@click.option('--batch-size', default=1000, show_default=True, help='Applicants per transaction.')
+@with_appcontext
+def recompute_stages_command(batch_size):
+    """Recompute current_stage for every applicant."""
+    changed = backfill_stages(batch_size)
+    click.echo(f'Updated stage for {changed} applicant(s).')
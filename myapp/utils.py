@@ -3,9 +3,7 @@ from myapp.extensions import db
 from myapp.models.applicants import Applicant
 from myapp.models.recruitment_history import RecruitmentHistory
 from datetime import  datetime, timedelta
-from myapp.models.testresult import TestResult
 import zipfile
-import requests
 import re
 import json
 
@@ -62,17 +60,6 @@ def is_valid_email(email):
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
     return re.match(pattern, email) is not None
 
-def update_status(id):
-    applicant = Applicant.query.get_or_404(id)
-    history = RecruitmentHistory.query.filter_by(applicant_id=id).first()
-
-    if history:
-        new_stage = history.compute_current_stage()
-        if history.current_stage != new_stage or applicant.current_stage != new_stage:
-            history.current_stage = new_stage
-            applicant.current_stage = new_stage
-            db.session.commit()
-
 def generate_timeline(id):
     history = RecruitmentHistory.query.filter_by(applicant_id=id).first()
     timeline = [
@@ -153,37 +140,3 @@ def is_future_or_today(date_obj):
 def get_json_info():
     with open('/app/myapp/config/config.json') as f:
         return json.load(f)
-
-def store_result(id):
-    applicant = Applicant.query.get_or_404(id)
-    history = RecruitmentHistory.query.filter_by(applicant_id=id).first()
-    testInviteid = history.test_id
-
-    api_url="https://apiv3.imocha.io/v3/reports/"+str(testInviteid)+"?reportType=1"
-    headers = {
-        "X-API-KEY": "MLgDuuMLvhyRcoHxmaGBBHxBItiKrb",
-        "Content-Type": "application/json"
-    }
-    
-    response = requests.get(api_url, headers=headers)
-    if response.status_code == 200:
-        result = response.json()
-        if result.get('status') == 'Complete':
-            new_test_result = TestResult(
-                testlink_id=testInviteid,
-                name=applicant.name,
-                email=result['candidateEmail'],
-                date = datetime.strptime(result['attemptedOn'], '%Y-%m-%dT%H:%M:%S.%fZ').date(),
-                score=result['candidatePoints'],
-                total_score=result['totalTestPoints'],
-                time_taken=result['timeTaken']/60,
-                test_time=result['testDuration'],
-                test_name=result['testName'],
-                pdf_link=result['pdfReportUrl'],
-                sections=str(result['sections']),
-                applicant_id=id
-            )
-            db.session.add(new_test_result)
-            history.test_result = True
-            db.session.commit()
-           
@@ -1,7 +1,8 @@
 import pytest
+from contextlib import contextmanager
 from myapp.config import TestingConfig
-from myapp.models import User
-from myapp import create_app, db
+from myapp.models import Interview, User
+from myapp import create_app, db, querystats
 
 @pytest.fixture
 def app():
@@ -33,6 +34,76 @@ def logged_in_client(client, app):
 def client(app):
     return app.test_client()
 
+def _sign_in(client, user_id):
+    # What Flask-Login stores on a fresh login, without going through the login form
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user_id)
+        sess['_fresh'] = True
+    return client
+
+@pytest.fixture
+def login_as(app, client):
+    # `login_as('hr')` adds a user with that role (named after it) and signs `client` in as them
+    def login(role):
+        user = User(username=role, email=f'{role}@example.com', role=role, name=role.upper())
+        db.session.add(user)
+        db.session.commit()
+        _sign_in(client, user.id)
+        return user
+    return login
+
+@pytest.fixture
+def request_app():
+    # An app with no context held around the requests, which would keep current_user on `g`
+    # from one request to the next; open `with request_app.app_context():` to use the database
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+@pytest.fixture
+def signed_in(request):
+    # `signed_in(20)` is a new client of `request_app` signed in as user 20; pass `app` for another app
+    def sign_in(user_id, app=None):
+        app = app or request.getfixturevalue('request_app')
+        return _sign_in(app.test_client(), user_id)
+    return sign_in
+
+@pytest.fixture
+def staff(request_app):
+    # HR user 1 and interviewers 2 and 3
+    with request_app.app_context():
+        db.session.add(User(id=1, username='hr', email='hr@example.com', password_hash='test', role='hr', name='HR'))
+        for user_id in (2, 3):
+            db.session.add(User(id=user_id, username=f'i{user_id}', email=f'i{user_id}@example.com',
+                                password_hash='test', role='interviewer', name=f'Interviewer {user_id}'))
+        db.session.commit()
+
+@pytest.fixture
+def book(request_app):
+    # `book(2, starts_at, completed=True)` adds an interview for interviewer 2 and returns its id
+    def add(interviewer_id, starts_at, **values):
+        with request_app.app_context():
+            interview = Interview(interviewer_id=interviewer_id, date=starts_at.date(), time=starts_at.time(), **values)
+            db.session.add(interview)
+            db.session.commit()
+            return interview.id
+    return add
+
 @pytest.fixture
 def runner(app):
-    return app.test_cli_runner()
\ No newline at end of file
+    return app.test_cli_runner()
+
+@pytest.fixture
+def query_budget():
+    # `with query_budget(8): client.get(...)` fails if the block runs more than 8 statements,
+    # or any one statement `max_repeats` times or more (an N+1)
+    @contextmanager
+    def budget(limit, max_repeats=3):
+        with querystats.capture() as stats:
+            yield stats
+        assert stats.count <= limit, f"over the query budget of {limit}:\n{stats.report()}"
+        assert not stats.repeated(max_repeats), f"repeated statements:\n{stats.report()}"
+    return budget
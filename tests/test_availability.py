@@ -0,0 +1,172 @@
+from myapp import db, querystats
+from myapp.availability import Availability, BusyCalendar, is_double_booking, reserve
+from myapp.models import Applicant, Interview, RecruitmentHistory, User
+from myapp.routes import hr
+from sqlalchemy.exc import IntegrityError
+from datetime import date, datetime, time, timedelta
+import pytest
+
+# A Monday far enough ahead that no slot is in the past
+DAY = date.today() + timedelta(days=7 - date.today().weekday() + 7)
+
+def at(hour, minute=0, day=DAY):
+    return datetime.combine(day, time(hour, minute))
+
+# Staff users for every test: HR user 1, interviewers 2 and 3
+pytestmark = pytest.mark.usefixtures('staff')
+
+def test_busy_calendar_merges_and_searches_intervals():
+    calendar = BusyCalendar([(at(11), at(12)), (at(9), at(10)), (at(9, 30), at(10, 30))])
+    assert len(calendar) == 2
+    assert calendar.is_free(at(10, 30), at(11))
+    assert not calendar.is_free(at(10), at(11))
+    assert not calendar.is_free(at(11, 59), at(13))
+    assert list(calendar.gaps(at(8), at(13))) == [(at(8), at(9)), (at(10, 30), at(11)), (at(12), at(13))]
+    assert list(calendar.gaps(at(9, 15), at(10))) == []
+
+def test_who_is_free_at_a_time(request_app, book):
+    book(2, at(10))
+    with request_app.app_context():
+        calendar = Availability.load([2, 3], DAY, DAY)
+        assert calendar.free_at(at(10, 30)) == [3]
+        assert calendar.free_at(at(11)) == [2, 3]
+        assert calendar.free_at(at(9, 1)) == [3]
+
+def test_duration_and_buffer_are_configurable(request_app, book):
+    request_app.config.update(INTERVIEW_DURATION=30, INTERVIEW_BUFFER=15)
+    book(2, at(10))
+    with request_app.app_context():
+        calendar = Availability.load([2], DAY, DAY)
+        assert calendar.is_free(2, at(9, 15)) and not calendar.is_free(2, at(9, 16))
+        assert calendar.is_free(2, at(10, 45)) and not calendar.is_free(2, at(10, 44))
+
+def test_free_slots_over_several_days(request_app, book):
+    book(2, at(9))
+    book(2, at(17, 30))
+    tuesday = DAY + timedelta(days=1)
+    with request_app.app_context():
+        slots = Availability.load([2], DAY, tuesday).free_slots(2, DAY, 2, now=at(0))
+    assert slots == [(at(10), at(17, 30)), (at(9, day=tuesday), at(18, day=tuesday))]
+
+def test_free_slots_skip_weekends_and_the_past(request_app):
+    with request_app.app_context():
+        calendar = Availability.load([3], DAY, DAY)
+        assert calendar.free_slots(3, DAY - timedelta(days=2), 2) == []
+        assert calendar.free_slots(3, DAY, 1, now=at(16, 30)) == [(at(16, 30), at(18))]
+        assert calendar.free_slots(3, DAY, 1, now=at(17, 30)) == []
+
+def test_available_interviewers_endpoint(signed_in, book):
+    book(2, at(10))
+    client = signed_in(1)
+    with querystats.capture() as stats:
+        response = client.get(f'/hr/available_interviewers?date={DAY}&time=10:30')
+    assert response.json == [{'id': 3, 'name': 'Interviewer 3'}]
+    assert sum(n for sql, n in stats.fingerprints.items() if 'FROM interviews' in sql) == 1
+
+def test_interviewer_slots_endpoint(signed_in, book):
+    book(3, at(12))
+    response = signed_in(1).get(f'/hr/interviewer_slots?interviewer_ids=3&start={DAY}&days=1')
+    assert response.json == {'3': [
+        {'start': f'{DAY}T09:00', 'end': f'{DAY}T12:00'},
+        {'start': f'{DAY}T13:00', 'end': f'{DAY}T18:00'},
+    ]}
+    assert signed_in(1).get('/hr/interviewer_slots?interviewer_ids=x').status_code == 400
+
+def test_common_slots_sweep_every_interviewer(request_app, book):
+    book(2, at(9))
+    book(3, at(10, 30))
+    book(3, at(13))
+    request_app.config.update(INTERVIEW_SLOT_STEP=30)
+    with request_app.app_context():
+        calendar = Availability.load([2, 3], DAY, DAY + timedelta(days=1))
+        slots = calendar.common_slots([2, 3], DAY, 2, 4, now=at(0))
+        assert slots == [(at(11, 30), at(12, 30)), (at(12), at(13)), (at(14), at(15)), (at(14, 30), at(15, 30))]
+        assert calendar.common_slots([2, 3], DAY, 1, 1, length=timedelta(minutes=30), now=at(0)) == [(at(10), at(10, 30))]
+
+def test_common_slots_run_into_the_next_working_day(request_app, book):
+    book(2, at(9))
+    tuesday = DAY + timedelta(days=1)
+    with request_app.app_context():
+        calendar = Availability.load([2], DAY, tuesday)
+        slots = calendar.common_slots([2], DAY, 2, 2, length=timedelta(hours=2), day_start=time(9), day_end=time(11), now=at(0))
+    assert slots == [(at(9, day=tuesday), at(11, day=tuesday))]
+
+def test_common_slots_endpoint(signed_in, book):
+    book(2, at(9))
+    book(3, at(10))
+    client = signed_in(1)
+    with querystats.capture() as stats:
+        response = client.get(f'/hr/common_slots?interviewer_ids=2&interviewer_ids=3&start={DAY}&limit=2&duration=45')
+    assert response.json == [{'start': f'{DAY}T11:00', 'end': f'{DAY}T11:45'},
+                             {'start': f'{DAY}T11:30', 'end': f'{DAY}T12:15'}]
+    assert sum(n for sql, n in stats.fingerprints.items() if 'FROM interviews' in sql) == 1
+    assert client.get('/hr/common_slots?interviewer_ids=2&day_start=18:00&day_end=09:00').status_code == 400
+    assert client.get('/hr/common_slots').status_code == 400
+
+def test_interviews_carry_their_time_range(request_app, book):
+    interview_id = book(2, at(10))
+    request_app.config.update(INTERVIEW_DURATION=45)
+    with request_app.app_context():
+        interview = db.session.get(Interview, interview_id)
+        assert (interview.starts_at, interview.ends_at) == (at(10), at(11))
+        interview.time = time(14)
+        db.session.commit()
+        assert (interview.starts_at, interview.ends_at) == (at(14), at(14, 45))
+
+def test_the_database_refuses_double_bookings(request_app, book):
+    book(2, at(10))
+    book(3, at(10))
+    book(2, at(11))
+    book(2, at(12), completed=True)
+    book(2, at(12, 30))
+    with pytest.raises(IntegrityError) as error:
+        book(2, at(10, 30))
+    assert is_double_booking(error.value)
+
+    second = book(2, at(15))
+    with request_app.app_context():
+        db.session.get(Interview, second).date = DAY
+        db.session.get(Interview, second).time = time(11, 59)
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+
+def test_interviews_are_either_pending_or_completed(request_app):
+    # So the overlap rule means the same on SQLite and Postgres
+    insert = Interview.__table__.insert().values(interviewer_id=2, starts_at=at(10), ends_at=at(11))
+    with request_app.app_context():
+        with pytest.raises(IntegrityError):
+            db.session.execute(insert.values(completed=None))
+        db.session.rollback()
+        db.session.execute(insert)
+        assert db.session.query(Interview.completed).scalar() is False
+
+def test_reserve_reports_a_conflict_and_rolls_back(request_app, book):
+    book(2, at(10))
+    with request_app.app_context():
+        db.session.get(User, 3).name = 'Renamed'
+        db.session.add(Interview(interviewer_id=2, date=DAY, time=time(9, 30)))
+        assert reserve() is False
+        assert db.session.get(User, 3).name == 'Interviewer 3'
+        assert Interview.query.count() == 1
+
+        db.session.add(Interview(interviewer_id=2, date=DAY, time=time(9)))
+        assert reserve() is True
+
+def test_scheduling_a_busy_interviewer_is_refused(request_app, signed_in, book, monkeypatch):
+    monkeypatch.setattr(hr, 'graph_token', lambda user_id: 'token')
+    book(2, at(10))
+    with request_app.app_context():
+        db.session.add(Applicant(id=20, name='Applicant', email='applicant@example.com'))
+        db.session.add(RecruitmentHistory(applicant_id=20))
+        db.session.commit()
+
+    client = signed_in(1)
+    response = client.post('/hr/schedule_interview/20', data={
+        'interview_date': str(DAY), 'interview_time': '10:30', 'interviewer_id': '2'
+    })
+    assert response.location == '/hr/view_applicant/20'
+    with client.session_transaction() as sess:
+        assert 'Interviewer 2 already has an interview at that time' in sess['_flashes'][0][1]
+    with request_app.app_context():
+        assert Interview.query.count() == 1
+        assert RecruitmentHistory.query.one().interview_round_1_date is None
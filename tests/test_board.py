@@ -0,0 +1,107 @@
+from myapp import db
+from myapp.board import interview_board, window
+from myapp.models import Applicant
+from datetime import date, datetime, time, timedelta
+import pytest
+
+MONDAY = date(2030, 1, 7)
+
+pytestmark = pytest.mark.usefixtures('staff')
+
+@pytest.fixture(autouse=True)
+def applicant(request_app):
+    with request_app.app_context():
+        db.session.add(Applicant(id=1, name='Applicant One', email='one@example.com'))
+        db.session.commit()
+
+@pytest.fixture
+def book(book):
+    # Client rounds with applicant 1, scheduled by HR unless said otherwise
+    def add(interviewer_id, day, hour, scheduler_id=1, completed=False):
+        return book(interviewer_id, datetime.combine(day, time(hour)), applicant_id=1, scheduler_id=scheduler_id,
+                    round_number='Client Round 1', completed=completed)
+    return add
+
+def test_windows(request_app):
+    with request_app.app_context():
+        week = window('week', today=MONDAY + timedelta(days=3))
+        assert (week.first_day, week.last_day) == (MONDAY, MONDAY + timedelta(days=6))
+        assert window('today', today=MONDAY).last_day == MONDAY
+        custom = window('range', '2030-01-01', '2031-01-01')
+        assert custom.name == 'range' and (custom.last_day - custom.first_day).days == request_app.config['INTERVIEW_BOARD_MAX_DAYS'] - 1
+        assert window('range', '2030-01-02', '2030-01-01', today=MONDAY).name == 'week'
+        assert window('range', 'junk', None, today=MONDAY).name == 'week'
+
+def test_board_pages_through_a_window_in_start_order(request_app, book):
+    # The Sunday before is overdue, so it comes first
+    ids = [book(2, MONDAY - timedelta(days=1), 10), book(2, MONDAY, 9), book(3, MONDAY, 9),
+           book(2, MONDAY, 11), book(3, MONDAY + timedelta(days=2), 10),
+           book(2, MONDAY + timedelta(days=6), 17)]
+    book(3, MONDAY, 14, completed=True)
+    book(2, MONDAY - timedelta(days=1), 12, completed=True)
+    book(2, MONDAY + timedelta(days=7), 10)
+
+    with request_app.app_context():
+        week = window('week', today=MONDAY)
+        first = interview_board(week, per_page=2)
+        assert [i.id for i in first.items] == ids[:2] and not first.has_prev
+        second = interview_board(week, cursor=first.next_cursor, per_page=2)
+        assert [i.id for i in second.items] == ids[2:4]
+        third = interview_board(week, cursor=second.next_cursor, per_page=2)
+        assert [i.id for i in third.items] == ids[4:] and not third.has_next
+        back = interview_board(week, cursor=third.prev_cursor, per_page=2)
+        assert [i.id for i in back.items] == ids[2:4] and back.has_prev
+
+        latest = interview_board(week, order='desc', per_page=3)
+        assert [i.id for i in latest.items] == ids[:2:-1]
+        assert [i.id for i in interview_board(week, order='desc', cursor=latest.next_cursor).items] == ids[2::-1]
+        # A cursor for the other order starts over
+        assert [i.id for i in interview_board(week, cursor=latest.next_cursor, per_page=2).items] == ids[:2]
+
+def test_overdue_interviews_stay_on_the_board(request_app, book):
+    # Interviewers give feedback from the board, so last week's pending interview must stay on it
+    overdue = book(2, MONDAY - timedelta(days=5), 10)
+    book(2, MONDAY - timedelta(days=5), 12, completed=True)
+    this_week = book(2, MONDAY + timedelta(days=1), 10)
+    next_week = book(2, MONDAY + timedelta(days=8), 10)
+    with request_app.app_context():
+        assert [i.id for i in interview_board(window('week', today=MONDAY)).items] == [overdue, this_week]
+        assert [i.id for i in interview_board(window('today', today=MONDAY)).items] == [overdue]
+        later = window('range', '2030-01-14', '2030-01-20', today=MONDAY)
+        assert [i.id for i in interview_board(later).items] == [overdue, next_week]
+        assert [i.id for i in interview_board(later, order='desc').items] == [next_week, overdue]
+
+def test_overdue_interviews_can_be_given_feedback(signed_in, book):
+    book(2, date.today() - timedelta(days=7), 10)
+    response = signed_in(2).get('/interviewer/interviews')
+    assert response.status_code == 200
+    assert response.data.count(b'Applicant One') == 1 and b'Overdue' in response.data
+
+def test_board_filters_by_scheduler_and_interviewer(request_app, book):
+    mine = book(2, MONDAY, 9)
+    book(3, MONDAY, 9)
+    book(2, MONDAY, 11, scheduler_id=None)
+    with request_app.app_context():
+        week = window('week', today=MONDAY)
+        assert [i.id for i in interview_board(week, scheduler_id=1, interviewer_id=2).items] == [mine]
+        assert len(interview_board(week, interviewer_id=2).items) == 2
+
+def test_hr_board_cost_does_not_grow_with_history(signed_in, book, query_budget):
+    client = signed_in(1)
+    for days_ago in range(1, 30):
+        book(2, MONDAY - timedelta(days=days_ago), 10)
+    book(3, MONDAY, 10)
+
+    with query_budget(6):
+        response = client.get('/interviewer/interviews?window=range&from=2030-01-07&to=2030-01-13')
+    assert response.status_code == 200
+    assert response.data.count(b'id="reschedule-modal-') == 1
+    assert b'Interviewer 3' in response.data
+
+def test_interviewers_see_only_their_own_board(signed_in, book):
+    book(2, date.today(), 23)
+    book(3, date.today(), 23)
+    response = signed_in(2).get('/interviewer/interviews?window=today')
+    assert response.status_code == 200
+    assert response.data.count(b'Applicant One') == 1
+    assert b'23:00' in response.data
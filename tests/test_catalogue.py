@@ -0,0 +1,91 @@
+from myapp import db
+from myapp.catalogue import Catalogue
+from myapp.models import Applicant
+import threading
+import pytest
+import requests
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr('myapp.catalogue.time.monotonic', clock)
+    return clock
+
+@pytest.fixture
+def cache(app, clock):
+    app.config.update(IMOCHA_CATALOGUE_TTL=60, IMOCHA_CATALOGUE_STALE=600)
+    return Catalogue(app)
+
+def counting(*values):
+    calls = []
+    def fetch():
+        calls.append(1)
+        value = values[min(len(calls), len(values)) - 1]
+        if isinstance(value, Exception):
+            raise value
+        return value
+    return fetch, calls
+
+def test_fresh_entries_are_served_locally(cache, clock):
+    fetch, calls = counting({1: 'Python'})
+    assert cache.get('tests', fetch) == {1: 'Python'}
+    clock.now += 59
+    assert cache.get('tests', fetch) == {1: 'Python'}
+    assert len(calls) == 1
+
+def test_stale_entries_are_served_while_revalidating(cache, clock):
+    release = threading.Event()
+    fetched = []
+    def fetch():
+        if fetched:
+            release.wait(5)
+        fetched.append(1)
+        return {1: f'v{len(fetched)}'}
+
+    cache.get('tests', fetch)
+    clock.now += 61
+    assert cache.get('tests', fetch) == {1: 'v1'}
+    assert cache.get('tests', fetch) == {1: 'v1'}
+    release.set()
+    for thread in threading.enumerate():
+        if thread.name == 'catalogue-refresh':
+            thread.join()
+
+    assert len(fetched) == 2
+    assert cache.get('tests', fetch) == {1: 'v2'}
+
+def test_expired_entries_cover_upstream_failures(cache, clock):
+    fetch, calls = counting({1: 'Python'}, requests.ConnectionError('down'))
+    cache.get('tests', fetch)
+    clock.now += 1000
+    assert cache.get('tests', fetch) == {1: 'Python'}
+    assert len(calls) == 2
+
+    with pytest.raises(requests.ConnectionError):
+        cache.get(('testlinks', 1), lambda: fetch())
+
+def test_schedule_form_renders_from_cache(app, client, monkeypatch, login_as):
+    fetches = []
+    monkeypatch.setattr('myapp.catalogue.fetch_tests', lambda: fetches.append('tests') or {7: 'Python Basics'})
+    monkeypatch.setattr('myapp.catalogue.fetch_test_links', lambda test_id: fetches.append(test_id) or {'L1': 'Campus'})
+    applicant = Applicant(name='Asha', email='asha@example.com', phone_number=9300000000)
+    db.session.add(applicant)
+    db.session.commit()
+    login_as('hr')
+
+    for _ in range(3):
+        response = client.get(f'hr/schedule_test/{applicant.id}?test_id=7')
+        assert b'7 - Python Basics' in response.data and b'L1 - Campus' in response.data
+    assert fetches == ['tests', 7]
+
+    response = client.post(f'hr/refresh_test_catalogue/{applicant.id}', data={'test_id': 7})
+    assert response.headers['Location'].endswith(f'/hr/schedule_test/{applicant.id}?test_id=7')
+    client.get(f'hr/schedule_test/{applicant.id}?test_id=7')
+    assert fetches == ['tests', 7, 'tests', 7]
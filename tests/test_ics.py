@@ -0,0 +1,115 @@
+from myapp import create_app, db, ics, querystats
+from myapp.config import TestingConfig
+from myapp.models import Applicant, CalendarFeed, Interview, User
+from datetime import date, time, timedelta
+import pytest
+
+DAY = date.today() + timedelta(days=3)
+
+@pytest.fixture
+def app():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        for user_id in (2, 3):
+            db.session.add(User(id=user_id, username=f'i{user_id}', email=f'i{user_id}@example.com',
+                                password_hash='test', role='interviewer', name=f'Interviewer {user_id}'))
+        db.session.add(Applicant(id=1, name='Doe, Jane', email='jane@example.com'))
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+def book(app, interviewer_id, hour, day=DAY):
+    with app.app_context():
+        interview = Interview(applicant_id=1, interviewer_id=interviewer_id, date=day, time=time(hour),
+                              round_number='Client Round 1')
+        db.session.add(interview)
+        db.session.commit()
+        return interview.id
+
+def feed_path(app, interviewer_id):
+    with app.test_request_context():
+        return ics.feed_url(interviewer_id).replace('http://localhost', '')
+
+def version(app, interviewer_id):
+    with app.app_context():
+        feed = db.session.get(CalendarFeed, interviewer_id)
+        return feed.version if feed else 0
+
+def test_feed_lists_the_interviewers_interviews(app):
+    book(app, 2, 10)
+    book(app, 3, 11)
+    book(app, 2, 9, day=date.today() - timedelta(days=app.config['CALENDAR_FEED_PAST_DAYS'] + 1))
+
+    response = app.test_client().get(feed_path(app, 2))
+    assert response.status_code == 200 and response.mimetype == 'text/calendar'
+    body = response.text
+    assert body.startswith('BEGIN:VCALENDAR\r\n') and body.endswith('END:VCALENDAR\r\n')
+    assert body.count('BEGIN:VEVENT') == 1
+    # Interview times are Asia/Kolkata (UTC+5:30)
+    assert f'DTSTART:{DAY:%Y%m%d}T043000Z' in body and f'DTEND:{DAY:%Y%m%d}T053000Z' in body
+    assert 'SUMMARY:Client Round 1 with Doe\\, Jane' in body
+    assert response.headers['ETag'] and response.headers['Last-Modified']
+
+def test_unchanged_feeds_answer_conditional_gets_with_one_lookup(app, query_budget):
+    book(app, 2, 10)
+    client = app.test_client()
+    path = feed_path(app, 2)
+    first = client.get(path)
+
+    with query_budget(1):
+        response = client.get(path, headers={'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 304 and not response.data
+
+    response = client.get(path, headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert response.status_code == 304
+
+    with query_budget(1):
+        assert client.get(path).text == first.text  # rebuilt only when the version moves
+
+def test_changes_bump_only_the_interviewers_involved(app):
+    interview_id = book(app, 2, 10)
+    book(app, 3, 12)
+    client = app.test_client()
+    etag = client.get(feed_path(app, 2)).headers['ETag']
+    assert (version(app, 2), version(app, 3)) == (1, 1)
+
+    with app.app_context():
+        db.session.get(Interview, interview_id).time = time(15)
+        db.session.commit()
+    assert (version(app, 2), version(app, 3)) == (2, 1)
+    response = client.get(feed_path(app, 2), headers={'If-None-Match': etag})
+    assert response.status_code == 200 and f'DTSTART:{DAY:%Y%m%d}T093000Z' in response.text
+
+    with app.app_context():
+        db.session.get(Interview, interview_id).interviewer_id = 3
+        db.session.commit()
+    assert (version(app, 2), version(app, 3)) == (3, 2)
+    assert 'BEGIN:VEVENT' not in client.get(feed_path(app, 2)).text
+    assert client.get(feed_path(app, 3)).text.count('BEGIN:VEVENT') == 2
+
+def test_feed_rows_are_upserted_without_being_read(app):
+    # Reading first would let two transactions booking an interviewer's first interviews
+    # both try to insert the row
+    with querystats.capture() as stats:
+        book(app, 2, 10)
+        book(app, 2, 12)
+    feed_statements = [sql for sql in stats.fingerprints if 'calendar_feeds' in sql]
+    assert feed_statements and all(sql.startswith('INSERT') and 'ON CONFLICT' in sql for sql in feed_statements)
+    assert version(app, 2) == 2
+
+def test_forged_tokens_are_rejected(app):
+    assert app.test_client().get('/interviewer/calendar/2.ics').status_code == 404
+    class Config(TestingConfig):
+        SECRET_KEY = 'other'
+    with create_app(Config).test_request_context():
+        token = ics.feed_url(2).rsplit('/', 1)[1]
+    assert app.test_client().get(f'/interviewer/calendar/{token}').status_code == 404
+
+def test_long_lines_are_folded():
+    line = 'SUMMARY:' + 'é' * 60
+    folded = ics._fold(line)
+    parts = folded.split('\r\n ')
+    assert len(parts) == 2 and all(len(part.encode()) <= 75 for part in parts)
+    assert ''.join(parts) == line
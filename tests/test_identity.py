@@ -0,0 +1,65 @@
+from myapp import db, identity, querystats
+from myapp.models import User
+import pytest
+
+def add_user(app, user_id, role):
+    with app.app_context():
+        db.session.add(User(id=user_id, username=f'user{user_id}', email=f'user{user_id}@example.com',
+                            password_hash='test', role=role, name=f'User {user_id}'))
+        db.session.commit()
+
+def users_queries(client, path):
+    with querystats.capture() as stats:
+        response = client.get(path)
+    return response, sum(n for sql, n in stats.fingerprints.items() if 'FROM users' in sql)
+
+def test_identity_is_loaded_once_per_ttl(request_app, signed_in):
+    add_user(request_app, 20, 'hr')
+    client = signed_in(20)
+    assert users_queries(client, '/profile')[1] == 1
+    response, queries = users_queries(client, '/profile')
+    assert response.status_code == 200 and b'user20' in response.data
+    assert queries == 0
+
+def test_role_change_applies_on_the_next_request(request_app, signed_in):
+    add_user(request_app, 20, 'hr')
+    client = signed_in(20)
+    assert client.get('/hr/dashboard').status_code == 200
+
+    with request_app.app_context():
+        db.session.get(User, 20).role = 'interviewer'
+        db.session.commit()
+        identity.invalidate(20)
+    response = client.get('/hr/dashboard')
+    assert response.status_code == 302 and response.location == '/'
+
+def test_deleted_user_is_signed_out(request_app, signed_in):
+    add_user(request_app, 1, 'admin')
+    admin = signed_in(1)
+    add_user(request_app, 20, 'hr')
+    client = signed_in(20)
+    assert client.get('/profile').status_code == 200
+
+    admin.post('/admin/delete_user/20')
+    response = client.get('/profile')
+    assert response.status_code == 302 and response.location == '/login'
+
+def test_password_change_refreshes_identity(request_app, signed_in):
+    add_user(request_app, 1, 'admin')
+    admin = signed_in(1)
+    add_user(request_app, 20, 'hr')
+    client = signed_in(20)
+    client.get('/profile')
+
+    admin.post('/admin/change_password/20', data={'new_password': 'newpassword', 'confirm_password': 'newpassword'})
+    assert users_queries(client, '/profile')[1] == 1
+    with request_app.test_request_context():
+        assert identity.load(20).password_changed is True
+
+def test_identity_is_read_only(request_app):
+    add_user(request_app, 20, 'hr')
+    with request_app.test_request_context():
+        user = identity.load(20)
+        assert (user.id, user.role, user.get_id()) == (20, 'hr', '20')
+        with pytest.raises(AttributeError):
+            user.role = 'admin'
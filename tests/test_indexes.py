@@ -0,0 +1,68 @@
+from myapp import db
+from myapp.models import Applicant, Interview, RecruitmentHistory, Referral
+from myapp.pagination import SORT_KEYS, _ordering
+from myapp.board import Window, pending_interviews
+from sqlalchemy.orm import joinedload
+from datetime import date
+import json
+import pytest
+
+EXCLUDED = ['Rejected', 'On Hold', 'Joined']
+HOT_TABLES = {'applicants', 'interviews', 'recruitment_history', 'referrals'}
+
+def newest_first(query):
+    return query.order_by(*_ordering(SORT_KEYS['date'], True)).limit(21)
+
+# The queries behind the list, filter and availability pages, as the routes build them
+HOT_QUERIES = {
+    'applicant listing': lambda: newest_first(
+        Applicant.query.options(joinedload(Applicant.uploader)).filter(~Applicant.status.in_(EXCLUDED))),
+    'applicants by stage': lambda: newest_first(Applicant.query.filter(Applicant.status == 'Applied')),
+    'applicants by uploader': lambda: newest_first(Applicant.query.filter(Applicant.uploaded_by == 1)),
+    'applicants by job': lambda: newest_first(Applicant.query.filter(Applicant.job_id == 1)),
+    'applicant history': lambda: RecruitmentHistory.query.filter_by(applicant_id=1)
+        .order_by(RecruitmentHistory.updated_at.desc()).limit(1),
+    'applicant interviews': lambda: Interview.query.filter_by(applicant_id=1, completed=False),
+    'interview board': lambda: board_query(),
+    'interview board by scheduler': lambda: board_query(scheduler_id=1),
+    'interview board by interviewer': lambda: board_query(interviewer_id=1),
+    'interview board, later week': lambda: board_query(Window('range', date(2025, 8, 11), date(2025, 8, 17),
+                                                              today=date(2025, 8, 6))),
+    'interviewer dashboard': lambda: Interview.query.filter_by(interviewer_id=1).filter_by(completed=False),
+    'interviewer availability': lambda: Interview.query.filter(
+        Interview.date == date(2025, 8, 1), Interview.interviewer_id.in_([1, 2, 3])),
+    'referrals by referrer': lambda: Referral.query.filter_by(referrer_id=1).order_by(Referral.referral_date.desc()),
+    'referrals by job': lambda: Referral.query.filter(Referral.job_id == 1).order_by(Referral.id.desc()),
+}
+
+def board_query(span=None, **filters):
+    span = span or Window('week', date(2025, 8, 4), date(2025, 8, 10))
+    return pending_interviews(span, **filters).order_by(Interview.starts_at, Interview.id).limit(26)
+
+def sequential_scans(query):
+    # Hot tables the planner reads start to finish instead of through an index
+    connection = db.session.connection()
+    compiled = query.statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True})
+    if connection.dialect.name == 'postgresql':
+        # Tiny test tables are always cheapest to seq scan, so ask whether an index path exists at all
+        connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+        plan = connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {compiled}').scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        nodes, scans = [plan[0]['Plan']], []
+        while nodes:
+            node = nodes.pop()
+            if node['Node Type'] == 'Seq Scan' and node['Relation Name'] in HOT_TABLES:
+                scans.append(node['Relation Name'])
+            nodes.extend(node.get('Plans', []))
+        return scans
+
+    rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}').all()
+    return [detail.split()[1] for *_, detail in rows
+            if detail.startswith('SCAN ') and 'USING' not in detail and detail.split()[1] in HOT_TABLES]
+
+@pytest.mark.parametrize('name', HOT_QUERIES)
+def test_hot_queries_use_an_index(app, name):
+    assert sequential_scans(HOT_QUERIES[name]()) == []
+
+def test_detects_sequential_scans(app):
+    assert sequential_scans(Applicant.query.filter(Applicant.notice_period == 30)) == ['applicants']
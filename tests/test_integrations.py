@@ -0,0 +1,82 @@
+from myapp.integrations import NotConfigured, UpstreamClient, imocha, metrics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+import pytest
+import requests
+
+class FakeUpstream:
+    """HTTP/1.1 keep-alive server recording the client port of every request."""
+
+    def __init__(self):
+        self.ports = []
+        self.failures = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def respond(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                fake.ports.append(self.client_address[1])
+                if self.path.endswith('/slow'):
+                    time.sleep(0.5)
+                status = fake.failures.pop(0) if fake.failures else 200
+                body = json.dumps({'path': self.path, 'key': self.headers.get('X-API-KEY')}).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = respond
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/v3'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+@pytest.fixture
+def upstream(app):
+    fake = FakeUpstream()
+    app.config.update(IMOCHA_API_URL=fake.url, IMOCHA_API_KEY='key-1')
+    yield fake
+    fake.server.shutdown()
+
+def test_reuses_connections_and_sends_credentials(app, upstream):
+    for test_id in (1, 2, 3):
+        response = imocha().get(f'tests/{test_id}/testlinks', endpoint='tests/{id}/testlinks')
+        assert response.json() == {'path': f'/v3/tests/{test_id}/testlinks', 'key': 'key-1'}
+    assert imocha() is imocha()
+    assert len(set(upstream.ports)) == 1
+
+    stats = metrics()['imocha']['GET tests/{id}/testlinks']
+    assert stats['count'] == 3 and stats['errors'] == 0
+    assert stats['p50_ms'] <= stats['p95_ms'] <= stats['max_ms']
+
+def test_retries_idempotent_requests_only(app, upstream):
+    upstream.failures = [503]
+    assert imocha().get('tests').status_code == 200
+    assert len(upstream.ports) == 2
+
+    upstream.failures = [503]
+    assert imocha().post('tests/1/invite', json={}).status_code == 503
+    assert len(upstream.ports) == 3
+    assert metrics()['imocha']['POST tests/1/invite']['errors'] == 1
+
+def test_read_timeout(app, upstream):
+    client = UpstreamClient('slow', upstream.url, timeout=(1, 0.1))
+    with pytest.raises(requests.ReadTimeout):
+        client.get('slow')
+    assert len(upstream.ports) == 1
+    assert client.metrics()['GET slow']['errors'] == 1
+    client.close()
+
+def test_refuses_to_call_imocha_without_a_key(app):
+    app.config['IMOCHA_API_KEY'] = None
+    with pytest.raises(NotConfigured, match='IMOCHA_API_KEY'):
+        imocha()
+    assert issubclass(NotConfigured, requests.RequestException)
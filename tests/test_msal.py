@@ -0,0 +1,115 @@
+from myapp import db
+from myapp.auth import helpers
+from myapp.models import MicrosoftTokenCache, User
+from urllib.parse import parse_qs
+import base64
+import json
+import msal
+import pytest
+
+AUTHORITY = 'https://login.microsoftonline.com/tenant-id'
+
+def id_token(email):
+    def part(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip('=')
+    claims = {'iss': f'{AUTHORITY}/v2.0', 'aud': 'client-id', 'oid': f'oid-{email}', 'tid': 'tenant-id',
+              'sub': email, 'preferred_username': email, 'exp': 9999999999, 'iat': 1}
+    return f"{part({'alg': 'none'})}.{part(claims)}.sig"
+
+class Response:
+    def __init__(self, data, status_code=200):
+        self.status_code = status_code
+        self.text = json.dumps(data)
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+class FakeIdentityPlatform:
+    # Answers MSAL's discovery and token requests like Entra ID would, counting token grants
+    def __init__(self):
+        self.grants = []
+        self.issued = 0
+
+    def get(self, url, **kwargs):
+        if 'openid-configuration' in url:
+            return Response({
+                'authorization_endpoint': f'{AUTHORITY}/oauth2/v2.0/authorize',
+                'token_endpoint': f'{AUTHORITY}/oauth2/v2.0/token',
+                'issuer': f'{AUTHORITY}/v2.0',
+            })
+        return Response({'tenant_discovery_endpoint': f'{AUTHORITY}/v2.0/.well-known/openid-configuration',
+                         'metadata': []})
+
+    def post(self, url, data=None, **kwargs):
+        fields = data if isinstance(data, dict) else {k: v[0] for k, v in parse_qs(data).items()}
+        self.grants.append(fields['grant_type'])
+        self.issued += 1
+        email = 'hr@example.com'
+        return Response({
+            'token_type': 'Bearer', 'scope': 'User.Read Calendars.ReadWrite Mail.Send OnlineMeetings.ReadWrite',
+            # Under MSAL's five-minute margin, so the next silent call has to refresh it
+            'expires_in': 3600 if fields['grant_type'] == 'authorization_code' else 60,
+            'access_token': f'access-{self.issued}', 'refresh_token': f'refresh-{self.issued}',
+            'id_token': id_token(email),
+            'client_info': base64.urlsafe_b64encode(json.dumps({'uid': 'oid', 'utid': 'tenant-id'}).encode()).decode(),
+        })
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def identity_platform(app):
+    fake = FakeIdentityPlatform()
+    app.extensions['msal'] = msal.ConfidentialClientApplication(
+        'client-id', authority=AUTHORITY, client_credential='secret',
+        token_cache=helpers.PartitionedTokenCache(), http_client=fake)
+    return fake
+
+@pytest.fixture
+def user(app):
+    user = User(username='hr', email='hr@example.com', role='hr', auth_type='microsoft')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def sign_in(app, user):
+    with app.test_request_context():
+        result = helpers.get_token_from_code('code', scopes=['User.Read'])
+        helpers.save_tokens(user.id)
+    return result
+
+def test_sign_in_keeps_tokens_server_side(app, identity_platform, user):
+    result = sign_in(app, user)
+    assert result['access_token'] == 'access-1'
+    assert db.session.get(MicrosoftTokenCache, user.id).cache
+
+    with app.test_request_context():
+        assert helpers.graph_token(user.id) == 'access-1'
+    assert identity_platform.grants == ['authorization_code']
+
+def test_expired_tokens_are_refreshed_silently(app, identity_platform, user):
+    sign_in(app, user)
+    with app.test_request_context():
+        assert helpers.graph_token(user.id) == 'access-1'
+        # Stand in for an hour passing: drop the access token, keep the refresh token
+        cache = msal.SerializableTokenCache()
+        cache.deserialize(db.session.get(MicrosoftTokenCache, user.id).cache)
+        state = json.loads(cache.serialize())
+        state['AccessToken'] = {}
+        db.session.get(MicrosoftTokenCache, user.id).cache = json.dumps(state)
+        db.session.commit()
+
+        assert helpers.graph_token(user.id) == 'access-2'
+    assert identity_platform.grants == ['authorization_code', 'refresh_token']
+    db.session.expire_all()
+    assert 'access-2' in db.session.get(MicrosoftTokenCache, user.id).cache
+
+def test_users_without_tokens_must_sign_in(app, identity_platform, user):
+    sign_in(app, user)
+    with app.test_request_context():
+        assert helpers.graph_token(user.id + 1) is None
+
+def test_token_cache_needs_a_user_partition():
+    with pytest.raises(RuntimeError):
+        helpers.PartitionedTokenCache().search(msal.TokenCache.CredentialType.ACCESS_TOKEN)
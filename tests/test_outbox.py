@@ -0,0 +1,162 @@
+from myapp import db, outbox
+from myapp.models import Applicant, OutboxMessage, RecruitmentHistory, User
+from flask import Flask, jsonify, request
+from werkzeug.serving import make_server
+from datetime import date, datetime, timedelta
+import threading
+import time
+import pytest
+
+class FakeGraph:
+    """Local stand-in for POST /me/events, deduplicating on transactionId like Graph does."""
+
+    def __init__(self):
+        self.events = {}
+        self.requests = []
+        self.failures = []
+        app = Flask('fake_graph')
+
+        @app.post('/v1.0/me/events')
+        def create_event():
+            body = request.get_json()
+            self.requests.append((request.headers.get('Authorization'), body))
+            event = self.events.setdefault(body['transactionId'], {'id': f'event-{len(self.events) + 1}', **body})
+            if self.failures:
+                status, headers = self.failures.pop(0)
+                return jsonify({'error': 'unavailable'}), status, headers
+            return jsonify(event), 201
+
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/v1.0'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+@pytest.fixture
+def graph(app, monkeypatch):
+    fake = FakeGraph()
+    app.config.update(GRAPH_API_URL=fake.url, OUTBOX_BACKOFF=1, OUTBOX_MAX_ATTEMPTS=3)
+    # Stands in for MSAL: user N's token is 'token-N'
+    monkeypatch.setattr(outbox, 'graph_token', lambda user_id: f'token-{user_id}')
+    yield fake
+    fake.server.shutdown()
+
+def queue_invite(subject='Interview', sender_id=1):
+    message = outbox.enqueue('graph_event', {'subject': subject}, created_by_id=sender_id)
+    db.session.commit()
+    return message
+
+def make_due(message):
+    message.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+def test_delivers_with_token_and_idempotency_key(app, graph):
+    message = queue_invite()
+    assert outbox.process_due() == 1
+
+    db.session.refresh(message)
+    assert message.status == 'sent' and message.attempts == 1
+    assert message.external_id == 'event-1'
+    assert graph.requests == [('Bearer token-1', {'subject': 'Interview', 'transactionId': message.idempotency_key})]
+    assert outbox.process_due() == 0
+
+def test_retries_with_backoff_without_duplicating(app, graph):
+    # The event is created but the response is lost; the retry must not create another
+    graph.failures = [(503, {'Retry-After': '30'})]
+    message = queue_invite()
+    outbox.process_due()
+
+    db.session.refresh(message)
+    assert message.status == 'pending' and message.attempts == 1
+    assert '503' in message.last_error
+    assert message.next_attempt_at >= datetime.utcnow() + timedelta(seconds=29)
+    assert outbox.process_due() == 0
+
+    make_due(message)
+    outbox.process_due()
+    db.session.refresh(message)
+    assert message.status == 'sent' and message.attempts == 2
+    assert len(graph.requests) == 2 and len(graph.events) == 1
+
+def test_gives_up_on_client_errors_and_after_max_attempts(app, graph):
+    graph.failures = [(400, {})]
+    rejected = queue_invite()
+    outbox.process_due()
+    db.session.refresh(rejected)
+    assert rejected.status == 'failed' and rejected.attempts == 1
+
+    graph.failures = [(500, {})] * 3
+    flaky = queue_invite()
+    for _ in range(3):
+        make_due(flaky)
+        outbox.process_due()
+    db.session.refresh(flaky)
+    assert flaky.status == 'failed' and flaky.attempts == 3
+
+    outbox.retry(flaky)
+    db.session.commit()
+    outbox.process_due()
+    db.session.refresh(flaky)
+    assert flaky.status == 'sent'
+
+def test_fails_without_a_sender_token(app, graph, monkeypatch):
+    monkeypatch.setattr(outbox, 'graph_token', lambda user_id: None)
+    message = queue_invite()
+    outbox.process_due()
+    db.session.refresh(message)
+    assert message.status == 'failed' and 'sign in again' in message.last_error
+    assert graph.requests == []
+
+def test_claims_are_exclusive_and_leases_expire(app, graph):
+    message = queue_invite()
+    assert outbox.claim_due() == [message.id]
+    assert outbox.claim_due() == []
+
+    # A worker died mid-send: the message is picked up again once its lease runs out
+    db.session.refresh(message)
+    message.locked_until = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+    assert outbox.claim_due() == [message.id]
+
+def test_worker_threads_deliver_in_background(app, graph):
+    messages = [queue_invite(f'Interview {i}') for i in range(6)]
+    worker = outbox.OutboxWorker(app)
+    worker.start()
+    worker.wake()
+
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        db.session.expire_all()
+        if all(db.session.get(OutboxMessage, m.id).status == 'sent' for m in messages):
+            break
+        time.sleep(0.05)
+    worker.stop()
+    assert {db.session.get(OutboxMessage, m.id).status for m in messages} == {'sent'}
+    assert len(graph.events) == 6
+
+def test_schedule_interview_queues_invite(app, client, graph, monkeypatch, login_as):
+    monkeypatch.setattr('myapp.routes.hr.get_json_info', lambda: {'emailAddress': {'address': 'desk@example.com'}})
+    monkeypatch.setattr('myapp.routes.hr.graph_token', lambda user_id: f'token-{user_id}')
+    hr = login_as('hr')
+    interviewer = User(username='int', email='int@example.com', role='interviewer', name='Int', auth_type='microsoft')
+    applicant = Applicant(name='Asha', email='asha@example.com', phone_number=9300000000, status='Applied')
+    db.session.add_all([interviewer, applicant])
+    db.session.flush()
+    db.session.add(RecruitmentHistory(applicant_id=applicant.id))
+    db.session.commit()
+
+    response = client.post(f'hr/schedule_interview/{applicant.id}', data={
+        'interview_date': (date.today() + timedelta(days=1)).isoformat(),
+        'interview_time': '10:30',
+        'interviewer_id': interviewer.id
+    })
+
+    assert response.status_code == 302
+    assert graph.requests == []
+    message = OutboxMessage.query.one()
+    assert message.status == 'pending' and message.interview.applicant_id == applicant.id
+    assert message.created_by_id == hr.id
+    assert client.get(f'hr/invite_status/{applicant.id}').get_json()['status'] == 'pending'
+
+    outbox.process_due()
+    assert client.get(f'hr/invite_status/{applicant.id}').get_json()['status'] == 'sent'
+    assert graph.requests[0][0] == f'Bearer token-{hr.id}'
+    assert graph.requests[0][1]['subject'] == 'Interview Round Client Round 1 with Asha'
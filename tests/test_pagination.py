@@ -0,0 +1,197 @@
+from myapp import db
+from myapp.models import Applicant, JobRequirement, User
+from myapp.pagination import keyset_paginate, decode_cursor, StreamedRows
+from sqlalchemy import event
+from datetime import date, timedelta
+import pytest
+
+def seed_applicants(count, hrs=3):
+    uploaders = []
+    for i in range(hrs):
+        user = User(username=f'hr{i}', email=f'hr{i}@example.com', role='hr', name=f'HR {chr(90 - i)}')
+        db.session.add(user)
+        uploaders.append(user)
+    db.session.flush()
+
+    start = date(2025, 1, 1)
+    for i in range(count):
+        db.session.add(Applicant(
+            name=f'Applicant {i % 37:02d}',
+            email=f'applicant{i}@example.com',
+            phone_number=9000000000 + i,
+            last_applied=start + timedelta(days=i % 11),
+            status='Applied',
+            current_stage='Need to Schedule Test or Interview',
+            uploaded_by=uploaders[i % hrs].id
+        ))
+    db.session.commit()
+
+def walk_forward(query, sort_by, per_page):
+    seen, cursor, pages = [], None, []
+    while True:
+        page = keyset_paginate(query, sort_by, cursor=cursor, per_page=per_page)
+        pages.append(page)
+        seen.extend(a.id for a in page.items)
+        if not page.has_next:
+            return seen, pages
+        cursor = page.next_cursor
+
+def count_statements():
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+    return statements, record
+
+def test_keyset_walk_matches_full_ordering(app):
+    seed_applicants(95)
+    expected = [a.id for a in Applicant.query.order_by(Applicant.last_applied.desc(), Applicant.id.desc()).all()]
+
+    seen, pages = walk_forward(Applicant.query, 'date', 20)
+    assert seen == expected
+    assert len(pages) == 5
+    assert not pages[0].has_prev
+    assert all(p.has_prev for p in pages[1:])
+
+def test_keyset_walk_backwards(app):
+    seed_applicants(60)
+    _, pages = walk_forward(Applicant.query, 'name', 20)
+
+    previous = keyset_paginate(Applicant.query, 'name', cursor=pages[2].prev_cursor, per_page=20)
+    assert [a.id for a in previous.items] == [a.id for a in pages[1].items]
+    assert previous.has_next and previous.has_prev
+
+    first = keyset_paginate(Applicant.query, 'name', cursor=previous.prev_cursor, per_page=20)
+    assert [a.id for a in first.items] == [a.id for a in pages[0].items]
+    assert not first.has_prev
+
+def test_keyset_sort_by_name_and_hr(app):
+    seed_applicants(50)
+    by_name = [a.id for a in Applicant.query.order_by(Applicant.name.asc(), Applicant.id.asc()).all()]
+    assert walk_forward(Applicant.query, 'name', 7)[0] == by_name
+
+    by_hr = [a.id for a in Applicant.query.join(Applicant.uploader).order_by(User.name.asc(), Applicant.id.asc()).all()]
+    assert walk_forward(Applicant.query, 'hr', 7)[0] == by_hr
+
+def test_keyset_null_sort_keys_are_listed_last(app):
+    seed_applicants(10)
+    db.session.add(Applicant(name='No Date', email='nodate@example.com', phone_number=8000000000, status='Applied'))
+    db.session.add(Applicant(name='No Date 2', email='nodate2@example.com', phone_number=8000000001, status='Applied'))
+    db.session.commit()
+
+    seen, _ = walk_forward(Applicant.query, 'date', 3)
+    assert len(seen) == len(set(seen)) == 12
+    assert [Applicant.query.get(i).last_applied for i in seen[-2:]] == [None, None]
+
+def test_keyset_deep_pages_cost_the_same_as_first(app):
+    seed_applicants(1000)
+    _, pages = walk_forward(Applicant.query, 'date', 20)
+    assert len(pages) == 50
+
+    statements, record = count_statements()
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        keyset_paginate(Applicant.query, 'date', per_page=20)
+        first_page = list(statements)
+        statements.clear()
+        keyset_paginate(Applicant.query, 'date', cursor=pages[-2].next_cursor, per_page=20)
+        deep_page = list(statements)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    # One bounded seek query either way: no rows skipped via OFFSET and no COUNT(*)
+    assert len(first_page) == len(deep_page) == 1
+    statement, parameters = deep_page[0]
+    assert parameters[-2:] == (21, 0)
+    assert 'COUNT' not in statement.upper()
+
+def test_keyset_counts_and_bad_cursors(app):
+    seed_applicants(30)
+    page = keyset_paginate(Applicant.query, 'date', per_page=10, count='exact')
+    assert page.total == 30 and not page.approximate
+
+    page = keyset_paginate(Applicant.query, 'date', per_page=10, count='approx')
+    assert page.total == 30
+
+    assert decode_cursor('not-a-cursor', 'date') is None
+    assert decode_cursor(page.next_cursor, 'name') is None
+    restarted = keyset_paginate(Applicant.query, 'date', cursor='garbage', per_page=10)
+    assert [a.id for a in restarted.items] == [a.id for a in page.items]
+
+def test_applicants_view_follows_cursor(app, client, login_as):
+    seed_applicants(45)
+    login_as('hr')
+
+    response = client.get('hr/applicants')
+    assert response.status_code == 200
+    assert b'cursor=' in response.data
+
+    page = keyset_paginate(Applicant.query, 'date', per_page=20)
+    response = client.get(f'hr/applicants?cursor={page.next_cursor}')
+    assert response.status_code == 200
+    assert b'&lsaquo; Prev</a>' in response.data
+
+@pytest.mark.parametrize("url", [
+    "hr/all_applicants",
+    "hr/sort_applicants?sort_by=name",
+    "hr/sort_all_applicants?sort_by=hr",
+    "hr/search_applicants?query=Applicant",
+    "hr/search_all_applicants?query=Applicant",
+])
+def test_unbounded_listings_are_paged(app, client, url, login_as):
+    seed_applicants(45)
+    login_as('hr')
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert 'Content-Length' in response.headers
+    assert response.data.count(b'View Details') == 20
+
+    response = client.get(url + ('&' if '?' in url else '?') + 'full=1')
+    assert response.status_code == 200
+    assert 'Content-Length' not in response.headers
+    assert response.data.count(b'View Details') == 45
+
+def test_streamed_rows_fetch_in_batches(app):
+    seed_applicants(25)
+    rows = StreamedRows(Applicant.query, 'name', batch_size=10)
+    assert len(rows) == 25 and rows
+    expected = [a.id for a in Applicant.query.order_by(Applicant.name.asc(), Applicant.id.asc()).all()]
+    assert [a.id for a in rows] == expected
+
+LISTING_URLS = [
+    "hr/applicants",
+    "hr/all_applicants",
+    "hr/sort_applicants?sort_by=hr",
+    "hr/search_applicants?query=Applicant",
+    "hr/filter_all_applicants?status=experienced",
+    "hr/sort_all_applicants?full=1",
+    "hr/search_sort_filter_all_applicants?query=Applicant",
+    "hr/search_sort_filter_applicants?sort_by=name",
+]
+
+@pytest.mark.parametrize("url", LISTING_URLS)
+def test_listings_load_only_list_columns(app, client, url, login_as):
+    seed_applicants(30)
+    job = JobRequirement(position='Backend Engineer', description='-', skillset='Python', budget='10')
+    db.session.add(job)
+    db.session.flush()
+    for applicant in Applicant.query.all():
+        applicant.job_id = job.id
+        applicant.reason_for_change = 'x' * 2000
+    db.session.commit()
+    db.session.expunge_all()
+    login_as('hr')
+
+    statements, record = count_statements()
+    event.listen(db.engine, 'before_cursor_execute', record)
+    response = client.get(url)
+    body = response.data
+    event.remove(db.engine, 'before_cursor_execute', record)
+
+    assert response.status_code == 200
+    assert b'Backend Engineer' in body
+    listing = [s for s, _ in statements if 'FROM applicants' in s]
+    assert listing and not any('reason_for_change' in s or 'comments' in s for s in listing)
+    # Uploader and job come from the listing query itself, not one lazy load per row
+    assert not any('WHERE jobrequirement.id = ?' in s for s, _ in statements)
+    assert len(statements) < 10
@@ -0,0 +1,69 @@
+from myapp import db
+from myapp.models import Applicant, JobRequirement, Referral, User
+from myapp.querystats import fingerprint
+import logging
+import pytest
+
+def seed_referrals(count):
+    referrer = User(username='ref', email='ref@example.com', role='internal_referrer', name='Ref')
+    db.session.add(referrer)
+    db.session.flush()
+    for i in range(count):
+        job = JobRequirement(position=f'Position {i}', description='-', skillset='Python', budget='10')
+        db.session.add(job)
+        db.session.flush()
+        db.session.add(Referral(name=f'Referred {i}', referrer_id=referrer.id, referred_by='Ref', job_id=job.id))
+    db.session.commit()
+    db.session.expunge_all()
+
+def test_fingerprint_collapses_values():
+    assert fingerprint("SELECT * FROM a WHERE id IN (?, ?, ?) AND name = 'x'\n  LIMIT ?") == \
+        fingerprint("SELECT * FROM a WHERE id IN (%(id_1)s, %(id_2)s) AND name = 'y' LIMIT 20") == \
+        "SELECT * FROM a WHERE id IN (?) AND name = ? LIMIT ?"
+
+def test_response_reports_query_count(app, client, query_budget, login_as):
+    login_as('hr')
+    with query_budget(20) as stats:
+        response = client.get('hr/view_referrals')
+    assert response.status_code == 200
+    assert response.headers['X-Query-Count'] == str(stats.count)
+    assert response.headers['Server-Timing'].startswith('db;dur=')
+
+def test_repeated_statements_are_logged(app, client, caplog):
+    seed_referrals(6)
+
+    @app.route('/per_row')
+    def per_row():
+        return ', '.join(referral.job.position for referral in Referral.query.all())
+
+    with caplog.at_level(logging.WARNING, logger=app.logger.name):
+        client.get('/per_row')
+    assert 'possible N+1, 6x: SELECT jobrequirement.id' in caplog.text
+
+def test_query_budget_catches_n_plus_one(app, query_budget):
+    seed_referrals(6)
+    with pytest.raises(AssertionError, match='repeated statements'):
+        with query_budget(50):
+            [referral.job.position for referral in Referral.query.all()]
+
+def test_view_referrals_loads_jobs_with_the_list(app, client, query_budget, login_as):
+    seed_referrals(10)
+    login_as('hr')
+    with query_budget(6):
+        response = client.get('hr/view_referrals')
+    assert b'Position 9' in response.data
+
+def test_sort_applicants_budget(app, client, query_budget, login_as):
+    hr = login_as('hr')
+    job = JobRequirement(position='Backend', description='-', skillset='Python', budget='10')
+    db.session.add(job)
+    db.session.flush()
+    db.session.add_all(Applicant(name=f'Applicant {i}', email=f'a{i}@example.com', phone_number=9000000000 + i,
+                                 status='Applied', current_stage='Applied', uploaded_by=hr.id, job_id=job.id)
+                       for i in range(30))
+    db.session.commit()
+    db.session.expunge_all()
+
+    for sort_by in ('date', 'name', 'hr'):
+        with query_budget(6):
+            assert client.get(f'hr/sort_applicants?sort_by={sort_by}').status_code == 200
@@ -0,0 +1,88 @@
+from myapp import db, refdata
+from myapp.models import JobRequirement, User
+from sqlalchemy import event
+
+def add_jobs(*positions):
+    for position in positions:
+        db.session.add(JobRequirement(position=position, description='-', skillset='-', budget='-'))
+    db.session.commit()
+
+def capture_statements():
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    return statements, lambda: event.remove(db.engine, 'before_cursor_execute', record)
+
+def test_dropdowns_are_cached_across_requests(app, client, login_as):
+    login_as('hr')
+    add_jobs('Backend Developer', 'Designer')
+    assert client.get('hr/applicants').status_code == 200
+
+    statements, stop = capture_statements()
+    try:
+        response = client.get('hr/all_applicants')
+    finally:
+        stop()
+
+    assert response.status_code == 200
+    assert b'Backend Developer' in response.data
+    assert not any('FROM jobrequirement' in s for s in statements)
+    assert not any('users.role IN' in s for s in statements)
+
+def test_lists_are_memoised_per_request_without_ttl(app):
+    app.config['REFDATA_TTL'] = 0
+    add_jobs('Tester')
+    with app.app_context():
+        statements, stop = capture_statements()
+        try:
+            assert refdata.open_jobs() is refdata.open_jobs()
+        finally:
+            stop()
+        assert len(statements) == 1
+
+    add_jobs('Analyst')
+    with app.app_context():
+        assert [job.position for job in refdata.open_jobs()] == ['Analyst', 'Tester']
+
+def test_job_writes_invalidate(app, client, login_as):
+    login_as('hr')
+    add_jobs('Backend Developer', 'Designer')
+    with app.app_context():
+        assert len(refdata.open_jobs()) == 2
+
+    designer = JobRequirement.query.filter_by(position='Designer').first()
+    client.post(f'hr/close_joblisting/{designer.id}')
+    with app.app_context():
+        assert [job.position for job in refdata.open_jobs()] == ['Backend Developer']
+        assert len(refdata.all_jobs()) == 2
+
+    client.post('hr/upload_joblistings', data={'position_name': 'QA Engineer', 'job_description': 'Testing', 'job_skillset': 'Selenium', 'job_budget': '-'})
+    with app.app_context():
+        assert [job.position for job in refdata.open_jobs()] == ['Backend Developer', 'QA Engineer']
+
+def test_user_writes_invalidate(app, client, login_as):
+    login_as('admin')
+    for username, role in [('hr1', 'hr'), ('int1', 'interviewer')]:
+        db.session.add(User(username=username, email=f'{username}@example.com', role=role))
+    db.session.commit()
+    with app.app_context():
+        assert [u.username for u in refdata.hr_users()] == ['admin', 'hr1']
+        assert [u.username for u in refdata.interviewers()] == ['int1']
+
+    for username in ('hr1', 'int1'):
+        client.post(f'admin/delete_user/{User.query.filter_by(username=username).first().id}')
+    with app.app_context():
+        assert [u.username for u in refdata.hr_users()] == ['admin']
+        assert refdata.interviewers() == ()
+
+def test_deleted_jobs_leave_the_dropdowns(app, client, login_as):
+    login_as('hr')
+    add_jobs('Backend Developer', 'Designer')
+    assert b'Designer' in client.get('hr/all_applicants').data
+
+    designer = JobRequirement.query.filter_by(position='Designer').first()
+    client.post(f'hr/delete_joblisting/{designer.id}')
+    response = client.get('hr/all_applicants')
+    assert b'Backend Developer' in response.data
+    assert b'Designer' not in response.data
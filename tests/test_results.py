@@ -0,0 +1,138 @@
+from myapp import create_app, db
+from myapp.config import TestingConfig
+from myapp.models import Applicant, RecruitmentHistory
+from myapp.models import testresult
+from myapp.results import ResultPoller, poll_results
+from sqlalchemy import event
+from datetime import date
+import threading
+import pytest
+import requests
+
+def report(n, status='Complete'):
+    return {
+        'status': status,
+        'candidateName': f'Candidate {n}',
+        'candidateEmail': f'candidate{n}@example.com',
+        'attemptedOn': '2025-08-01T10:30:00.000Z',
+        'candidatePoints': 40 + n,
+        'score': 40 + n,
+        'totalTestPoints': 100,
+        'scorePercentage': 40 + n,
+        'timeTaken': 1800,
+        'testDuration': 60,
+        'testName': 'Python Basics',
+        'pdfReportUrl': f'https://example.com/{n}.pdf',
+        'performanceCategory': 'Average',
+        'sections': [{'sectionName': 'Core', 'candidateScore': 40 + n, 'sectionScore': 100,
+                      'sectionTimeTaken': 1800, 'sectionTime': 60}],
+    }
+
+class FakeReports:
+    # test invitation id -> report; unknown ids fail like an unreachable iMocha
+    def __init__(self):
+        self.reports = {}
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, test_id):
+        with self.lock:
+            self.calls.append(test_id)
+        if test_id not in self.reports:
+            raise requests.ConnectionError('down')
+        return self.reports[test_id]
+
+@pytest.fixture
+def imocha(monkeypatch):
+    fake = FakeReports()
+    monkeypatch.setattr('myapp.results.fetch_report', fake)
+    return fake
+
+def scheduled(n):
+    applicant = Applicant(name=f'Candidate {n}', email=f'candidate{n}@example.com', phone_number=9300000000 + n)
+    db.session.add(applicant)
+    db.session.flush()
+    history = RecruitmentHistory(applicant_id=applicant.id, test_id=1000 + n, test_date=date.today())
+    db.session.add(history)
+    db.session.commit()
+    return history
+
+def test_stores_completed_reports_only(app, imocha):
+    done, pending, unreachable = scheduled(1), scheduled(2), scheduled(3)
+    imocha.reports = {1001: report(1), 1002: report(2, status=None)}
+
+    assert poll_results(batch_size=2) == 1
+    assert sorted(imocha.calls) == [1001, 1002, 1003]
+
+    result = db.session.get(testresult.TestResult, 1001)
+    assert (result.applicant_id, result.score, result.time_taken) == (done.applicant_id, 41, 30)
+    assert result.report['testName'] == 'Python Basics'
+    assert done.test_result is True
+    assert not pending.test_result and not unreachable.test_result
+
+def test_polling_is_idempotent(app, imocha):
+    scheduled(1)
+    imocha.reports = {1001: report(1)}
+    assert poll_results() == 1
+
+    imocha.calls.clear()
+    assert poll_results() == 0
+    assert imocha.calls == []
+    assert testresult.TestResult.query.count() == 1
+
+def test_malformed_report_is_skipped(app, imocha):
+    broken, good = scheduled(1), scheduled(2)
+    malformed = report(1)
+    del malformed['candidatePoints']
+    imocha.reports = {1001: malformed, 1002: report(2)}
+
+    assert poll_results() == 1
+    assert db.session.get(testresult.TestResult, 1001) is None
+    assert db.session.get(testresult.TestResult, 1002) is not None
+    assert not broken.test_result and good.test_result
+
+def test_result_page_renders_from_database(app, client, imocha, login_as):
+    history = scheduled(1)
+    imocha.reports = {1001: report(1)}
+    poll_results()
+    # Any live iMocha call from the page would fail against this address
+    app.config['IMOCHA_API_URL'] = 'http://127.0.0.1:9'
+    login_as('hr')
+
+    response = client.get(f'hr/view_test_result/{history.applicant_id}')
+    assert response.status_code == 200
+    assert b'candidate1@example.com' in response.data
+
+def test_poll_results_command(app, runner, imocha):
+    scheduled(1)
+    imocha.reports = {1001: report(1)}
+    result = runner.invoke(args=['poll-results', '--batch-size', '10'])
+    assert result.exit_code == 0
+    assert 'Stored 1 result(s).' in result.output
+
+def test_only_the_lock_holder_polls(tmp_path, monkeypatch):
+    class Config(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path}/results.db'
+    app = create_app(Config)
+    holders = {}  # advisory lock key -> the DBAPI connection holding it, as on Postgres
+
+    with app.app_context():
+        @event.listens_for(db.engine, 'connect')
+        def advisory_locks(dbapi_connection, record):
+            def try_lock(key):
+                return holders.setdefault(key, id(dbapi_connection)) == id(dbapi_connection)
+            dbapi_connection.create_function('pg_try_advisory_lock', 1, try_lock)
+
+        @event.listens_for(db.engine, 'invalidate')
+        def drop_locks(dbapi_connection, record, exception):
+            for key in [key for key, holder in holders.items() if holder == id(dbapi_connection)]:
+                del holders[key]
+
+        monkeypatch.setattr(db.engine.dialect, 'name', 'postgresql')
+        first, second = ResultPoller(app), ResultPoller(app)
+        assert first.lead() and first.lead()
+        assert not second.lead() and second.connection is None
+        first.release()
+        assert second.lead() and not first.lead()
+        second.release()
+        assert holders == {}
@@ -0,0 +1,100 @@
+from myapp import db
+from myapp.models import Applicant, JobRequirement
+from myapp.search import SearchIndex, get_index, prefix_tsquery, similarity, search_jobs, suggest_applicants
+from datetime import date
+import pytest
+
+def add_applicants(*names):
+    for i, name in enumerate(names, start=Applicant.query.count()):
+        db.session.add(Applicant(
+            name=name,
+            email=f'{name.split()[0].lower()}{i}@example.com',
+            phone_number=9100000000 + i,
+            last_applied=date(2025, 1, 1),
+            status='Applied',
+            current_stage='Need to Schedule Test or Interview'
+        ))
+    db.session.commit()
+
+def test_similarity_matches_pg_trgm():
+    assert similarity('word', 'two words') == pytest.approx(0.363636, abs=1e-6)
+    assert similarity('abc', 'abc') == 1.0
+    assert similarity('', 'abc') == 0.0
+
+def test_prefix_tsquery():
+    assert prefix_tsquery('Jo  Smi') == 'jo:* & smi:*'
+    assert prefix_tsquery("o'brien; drop") == 'o:* & brien:* & drop:*'
+
+def test_search_index_substring_prefix_and_rank():
+    index = SearchIndex()
+    index.add(1, 'John Smith')
+    index.add(2, 'Johnny Appleseed')
+    index.add(3, 'Smita Patel')
+    index.add(4, 'Elton John')
+
+    assert set(index.search('ohn')) == {1, 2, 4}
+    assert set(index.search('smi jo')) == {1}
+    assert set(index.search('zz')) == set()
+
+    scores = index.search('john')
+    assert max(scores, key=scores.get) in (1, 4)
+    assert scores[2] < scores[1]
+
+    index.remove(1)
+    assert set(index.search('smi')) == {3}
+    index.add(3, 'Smita Rao')
+    assert set(index.search('patel')) == set()
+
+def test_index_follows_inserts_updates_and_deletes(app):
+    add_applicants('Asha Kulkarni', 'Rahul Deshpande')
+    index = get_index('applicant_name')
+    assert len(index.search('kulk')) == 1
+
+    add_applicants('Kulbir Singh')
+    assert len(index.search('kul')) == 2
+
+    applicant = Applicant.query.filter_by(name='Asha Kulkarni').first()
+    applicant.name = 'Asha Joshi'
+    db.session.commit()
+    assert len(index.search('kulk')) == 0
+
+    db.session.delete(Applicant.query.filter_by(name='Kulbir Singh').first())
+    db.session.commit()
+    assert index.search('kul') == {}
+
+def test_search_views_use_index(app, client, login_as):
+    login_as('hr')
+    add_applicants('Priya Nair', 'Priyanka Shah', 'Arjun Mehta')
+
+    response = client.get('hr/search_all_applicants?query=priy')
+    assert response.status_code == 200
+    assert b'Priya Nair' in response.data and b'Priyanka Shah' in response.data
+    assert b'Arjun Mehta' not in response.data
+
+    response = client.get('hr/search_applicants?query=arjun2@')
+    assert b'Arjun Mehta' in response.data and b'Priya Nair' not in response.data
+
+    response = client.get('hr/search_sort_filter_applicants?query=shah pri')
+    assert b'Priyanka Shah' in response.data and b'Priya Nair' not in response.data
+
+def test_suggestions_are_ranked(app, client, login_as):
+    login_as('hr')
+    add_applicants('Anil Kumar', 'Kumaran Iyer', 'Sunil Kumar Rao')
+
+    names = [a.name for a in suggest_applicants('kumar')]
+    assert names[0] == 'Anil Kumar'
+    assert set(names) == {'Anil Kumar', 'Kumaran Iyer', 'Sunil Kumar Rao'}
+
+    response = client.get('hr/search_suggestions?q=kumaran')
+    assert response.get_json() == [{'id': 2, 'name': 'Kumaran Iyer', 'email': 'kumaran1@example.com'}]
+
+def test_search_jobs_ranked(app):
+    for position, description in [('Python Developer', 'Flask services'),
+                                  ('QA Engineer', 'Test automation with Python'),
+                                  ('Designer', 'Figma')]:
+        db.session.add(JobRequirement(position=position, description=description, skillset='-', budget='-'))
+    db.session.commit()
+
+    jobs = search_jobs('python')
+    assert [job.position for job in jobs] == ['Python Developer', 'QA Engineer']
+    assert search_jobs('autom')[0].position == 'QA Engineer'
@@ -0,0 +1,42 @@
+from myapp import db
+from myapp.board import interview_board, window
+from myapp.models import Applicant, Interview, RecruitmentHistory, Referral, User
+from myapp.models.testresult import TestResult as StoredResult
+from myapp.stages import backfill_stages
+from datetime import date, timedelta
+
+def test_seed_data_command(app, runner):
+    result = runner.invoke(args=['seed-data', '--applicants', '120', '--batch-size', '50'])
+    assert result.exit_code == 0, result.output
+    assert 'Added 120 applicant(s).' in result.output
+
+    assert Applicant.query.count() == RecruitmentHistory.query.count() == 120
+    assert Interview.query.count() > 0 and Referral.query.count() > 0 and StoredResult.query.count() > 0
+    assert User.query.filter_by(role='interviewer').count() == 40
+    assert {a.status for a in Applicant.query} >= {'Applied', 'Rejected'}
+    # Stages are derived while generating, so a recompute finds nothing to fix
+    assert backfill_stages() == 0
+    # Interviews carry their time range, so the pending ones are on the interview board
+    assert Interview.query.filter(Interview.starts_at.is_(None)).count() == 0
+    pending = {i.id for i in Interview.query.filter_by(completed=False)}
+    today = date.today()
+    upcoming = window('range', today.isoformat(), (today + timedelta(days=91)).isoformat())
+    assert pending and {i.id for i in interview_board(upcoming, per_page=len(pending)).items} == pending
+
+def test_seed_data_appends(app, runner):
+    runner.invoke(args=['seed-data', '--applicants', '30', '--seed', '1'])
+    result = runner.invoke(args=['seed-data', '--applicants', '30', '--seed', '1'])
+    assert result.exit_code == 0, result.output
+    assert Applicant.query.count() == 60
+    assert User.query.filter(User.username.like('seed-%')).count() == 80
+
+def test_seeded_pending_interviews_never_overlap(app, runner):
+    # The same seed asks for the same interviewers and times again, which are taken by then
+    for _ in range(2):
+        result = runner.invoke(args=['seed-data', '--applicants', '30', '--seed', '3'])
+        assert result.exit_code == 0, result.output
+
+    pending = Interview.query.filter_by(completed=False).order_by(Interview.interviewer_id, Interview.starts_at).all()
+    assert len(pending) > 5
+    for before, after in zip(pending, pending[1:]):
+        assert before.interviewer_id != after.interviewer_id or before.ends_at <= after.starts_at
@@ -0,0 +1,48 @@
+from flask import request
+from myapp import create_app
+from myapp.config import TestingConfig
+from pathlib import Path
+import logging
+import os
+import runpy
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def test_log_file_directory_is_created(tmp_path):
+    class Config(TestingConfig):
+        LOG_FILE = str(tmp_path / 'nested' / 'app.log')
+    app = create_app(Config)
+    app.logger.info('hello')
+    assert 'hello' in (tmp_path / 'nested' / 'app.log').read_text()
+
+def test_stderr_logging(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    class Config(TestingConfig):
+        LOG_FILE = '-'
+    app = create_app(Config)
+    assert [type(h) for h in app.logger.handlers] == [logging.StreamHandler]
+    assert not (tmp_path / 'logs').exists()
+
+def test_proxy_headers_are_trusted_when_configured():
+    class Config(TestingConfig):
+        PROXY_COUNT = 1
+    app = create_app(Config)
+
+    @app.route('/whoami')
+    def whoami():
+        return f'{request.scheme} {request.remote_addr}'
+
+    response = app.test_client().get('/whoami', headers={'X-Forwarded-Proto': 'https', 'X-Forwarded-For': '10.0.0.7'})
+    assert response.text == 'https 10.0.0.7'
+
+def test_gunicorn_config(monkeypatch):
+    monkeypatch.delenv('LOG_FILE', raising=False)
+    monkeypatch.setenv('WEB_CONCURRENCY', '3')
+    monkeypatch.setenv('GUNICORN_CERTFILE', '/certs/cert.pem')
+    settings = runpy.run_path(str(ROOT / 'gunicorn.conf.py'))
+    assert (settings['workers'], settings['worker_class'], settings['preload_app']) == (3, 'gthread', True)
+    assert settings['keepalive'] > 60
+    assert settings['certfile'] == '/certs/cert.pem'
+
+    assert os.environ['LOG_FILE'] == '-'
@@ -0,0 +1,157 @@
+from flask import session
+from myapp import create_app, db, sessions
+from myapp.config import TestingConfig
+from myapp.models import StoredSession
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import time
+import pytest
+
+@pytest.fixture
+def sql_config(tmp_path):
+    class Config(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "sessions.db"}'
+        SESSION_BACKEND = 'sql'
+    return Config
+
+def worker(config):
+    # One worker process's view of the app; workers share only the config and the database
+    app = create_app(config)
+
+    @app.route('/remember/<value>')
+    def remember(value):
+        session['value'] = value
+        return 'ok'
+
+    @app.route('/recall')
+    def recall():
+        return session.get('value', '-')
+    return app
+
+def test_sql_sessions_are_shared_between_workers(sql_config):
+    first, second = worker(sql_config), worker(sql_config)
+    with first.app_context():
+        db.create_all()
+
+    client = first.test_client()
+    client.get('/remember/shared')
+    cookie = client.get_cookie('session')
+
+    other = second.test_client()
+    other.set_cookie('session', cookie.value)
+    assert other.get('/recall').text == 'shared'
+
+def test_saving_a_session_leaves_the_request_transaction_alone(sql_config):
+    app = worker(sql_config)
+    with app.app_context():
+        db.create_all()
+
+    @app.route('/pending')
+    def pending():
+        session['value'] = 'x'
+        db.session.add(StoredSession(id='pending', data=b'', expiry=datetime.utcnow()))
+        return 'ok'
+
+    app.test_client().get('/pending')
+    with app.app_context():
+        assert db.session.get(StoredSession, 'pending') is None
+        assert StoredSession.query.count() == 1
+
+def test_expired_sessions_are_ignored_and_collected(sql_config):
+    app = worker(sql_config)
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    client.get('/remember/old')
+
+    with app.app_context():
+        StoredSession.query.update({'expiry': datetime.utcnow() - timedelta(seconds=1)})
+        db.session.commit()
+    assert client.get('/recall').text == '-'
+
+    result = app.test_cli_runner().invoke(args=['session-gc'])
+    assert 'Deleted 1 expired session(s).' in result.output
+    with app.app_context():
+        assert StoredSession.query.count() == 0
+
+def test_missing_secret_key_is_refused(caplog):
+    class Config(TestingConfig):
+        TESTING = False
+        SECRET_KEY = None
+    with pytest.raises(RuntimeError, match='SECRET_KEY is not set'):
+        create_app(Config)
+
+    # Test and debug runs get a temporary key
+    Config.TESTING = True
+    assert create_app(Config).secret_key
+    assert 'temporary key' in caplog.text
+
+def test_unknown_backend_is_rejected():
+    class Config(TestingConfig):
+        SESSION_BACKEND = 'memcached'
+    with pytest.raises(ValueError):
+        create_app(Config)
+
+def test_unchanged_sessions_are_written_once_per_refresh_window(monkeypatch):
+    app = worker(TestingConfig)
+    interface = app.session_interface
+    writes = []
+    upsert = interface._upsert_session
+    monkeypatch.setattr(interface, '_upsert_session', lambda *args: writes.append(1) or upsert(*args))
+    now = [1_000_000]
+    monkeypatch.setattr(sessions, 'time', SimpleNamespace(time=lambda: now[0], monotonic=time.monotonic))
+
+    client = app.test_client()
+    assert 'Set-Cookie' in client.get('/remember/a').headers
+    assert len(writes) == 1
+
+    now[0] += app.config['SESSION_REFRESH_INTERVAL'] - 1
+    response = client.get('/recall')
+    assert response.text == 'a' and 'Set-Cookie' not in response.headers
+    assert len(writes) == 1
+
+    client.get('/remember/b')
+    assert len(writes) == 2
+
+    now[0] += app.config['SESSION_REFRESH_INTERVAL']
+    assert 'Set-Cookie' in client.get('/recall').headers
+    assert len(writes) == 3
+
+def test_anonymous_requests_store_nothing():
+    app = worker(TestingConfig)
+    response = app.test_client().get('/recall')
+    assert response.text == '-' and 'Set-Cookie' not in response.headers
+
+def test_heartbeat_answers_without_database_or_session_store(sql_config, query_budget, signed_in, monkeypatch):
+    app = worker(sql_config)
+    with app.app_context():
+        db.create_all()
+    client = signed_in(1, app)
+    monkeypatch.setattr(app.session_interface, '_retrieve_session_data', lambda store_id: pytest.fail('session loaded'))
+
+    with query_budget(0):
+        response = client.get('/check_session')
+    assert response.json['active'] is True
+    assert 0 < response.json['expires_in'] <= app.permanent_session_lifetime.total_seconds()
+    assert 'Set-Cookie' not in response.headers
+
+def test_heartbeat_reports_expired_and_signed_out_sessions(signed_in, monkeypatch):
+    app = worker(TestingConfig)
+    client = signed_in(1, app)
+    assert client.get('/check_session').json['active'] is True
+
+    client.set_cookie(app.config['SESSION_HEARTBEAT_COOKIE'], 'forged')
+    assert client.get('/check_session').json['active'] is False
+
+    client = signed_in(1, app)
+    later = time.time() + app.permanent_session_lifetime.total_seconds() + 1
+    monkeypatch.setattr(sessions, 'time', SimpleNamespace(time=lambda: later, monotonic=time.monotonic))
+    assert client.get('/check_session').json == {'active': False, 'expires_in': 0}
+
+def test_signing_out_clears_the_heartbeat(signed_in):
+    app = worker(TestingConfig)
+    client = signed_in(1, app)
+    with client.session_transaction() as sess:
+        sess.pop('_user_id')
+    assert client.get_cookie(app.config['SESSION_HEARTBEAT_COOKIE']) is None
+    assert client.get('/check_session').json['active'] is False
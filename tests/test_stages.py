@@ -0,0 +1,139 @@
+from myapp import db
+from myapp.models import Applicant, RecruitmentHistory
+from myapp.stages import recompute_stages
+from sqlalchemy import event
+from datetime import date
+import pytest
+
+def seed(count):
+    for i in range(count):
+        applicant = Applicant(
+            name=f'Applicant {i}',
+            email=f'applicant{i}@example.com',
+            phone_number=9200000000 + i,
+            last_applied=date(2025, 1, 1),
+            status='Applied',
+            current_stage='Need to Schedule Test or Interview'
+        )
+        db.session.add(applicant)
+        db.session.flush()
+        history = RecruitmentHistory(applicant_id=applicant.id, applied_date=date(2025, 1, 1))
+        if i % 3 == 1:
+            history.test_date = date(2025, 1, 2)
+        if i % 3 == 2:
+            history.interview_round_1_date = date(2025, 1, 3)
+            history.interview_round_1_comments = 'Good'
+        db.session.add(history)
+    db.session.commit()
+
+def make_stale(stage='Need to Schedule Test or Interview'):
+    # Core UPDATEs skip the before_flush hook, leaving stored stages out of date
+    db.session.execute(Applicant.__table__.update().values(current_stage=stage))
+    db.session.execute(RecruitmentHistory.__table__.update().values(current_stage=stage))
+    db.session.commit()
+
+def capture_statements():
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    return statements, lambda: event.remove(db.engine, 'before_cursor_execute', record)
+
+@pytest.mark.parametrize("status, fields, expected", [
+    ('Applied', {}, 'Need to Schedule Test or Interview'),
+    ('Applied', {'rejected': True}, 'Rejected'),
+    ('On Hold', {'test_date': date(2025, 1, 1)}, 'On Hold'),
+    ('Applied', {'test_date': date(2025, 1, 1)}, 'Test Scheduled'),
+    ('Applied', {'test_date': date(2025, 1, 1), 'test_result': True}, 'Test Completed'),
+    ('Applied', {'interview_round_1_date': date(2025, 1, 1)}, 'Interview Round 1 Scheduled'),
+    ('Applied', {'interview_round_1_date': date(2025, 1, 1), 'interview_round_1_comments': 'ok',
+                 'interview_round_2_date': date(2025, 1, 2)}, 'Interview Round 2 Scheduled'),
+    ('Applied', {'hr_round_date': date(2025, 1, 1), 'hr_round_comments': 'ok'}, 'HR Round Completed'),
+])
+def test_recompute_matches_compute_current_stage(app, status, fields, expected):
+    applicant = Applicant(name='A', email='a@example.com', phone_number=9200000000, status=status)
+    db.session.add(applicant)
+    db.session.flush()
+    db.session.add(RecruitmentHistory(applicant_id=applicant.id, **fields))
+    db.session.commit()
+
+    recompute_stages([applicant.id])
+    history = RecruitmentHistory.query.filter_by(applicant_id=applicant.id).first()
+    assert history.compute_current_stage() == expected
+    assert history.current_stage == expected
+    assert db.session.get(Applicant, applicant.id).current_stage == expected
+
+def test_recompute_uses_constant_queries(app):
+    seed(90)
+    make_stale()
+    ids = [a.id for a in Applicant.query.all()]
+
+    statements, stop = capture_statements()
+    try:
+        changed = recompute_stages(ids)
+    finally:
+        stop()
+
+    assert changed == 60
+    # one SELECT, one bulk UPDATE per table, no per-row Interview lookups
+    assert len([s for s in statements if s.startswith('SELECT')]) == 1
+    assert len([s for s in statements if s.startswith('UPDATE')]) == 2
+    assert not any('interviews' in s for s in statements)
+
+    statements, stop = capture_statements()
+    try:
+        assert recompute_stages(ids) == 0
+    finally:
+        stop()
+    assert not any(s.startswith('UPDATE') for s in statements)
+
+def test_history_update_listener_keeps_applicant_stage(app):
+    seed(1)
+    history = RecruitmentHistory.query.first()
+    history.test_date = date(2025, 2, 1)
+    db.session.commit()
+    assert db.session.get(Applicant, history.applicant_id).current_stage == 'Test Scheduled'
+
+def test_recompute_stages_cli(app, runner):
+    seed(30)
+    make_stale()
+    result = runner.invoke(args=['recompute-stages', '--batch-size', '7'])
+    assert result.exit_code == 0
+    assert 'Updated stage for 20 applicant(s).' in result.output
+
+    stages = {a.current_stage for a in Applicant.query.all()}
+    assert stages == {'Need to Schedule Test or Interview', 'Test Scheduled', 'Interview Round 1 Completed'}
+    assert runner.invoke(args=['recompute-stages']).output.strip() == 'Updated stage for 0 applicant(s).'
+
+def test_status_change_updates_stage_at_write_time(app):
+    seed(2)
+    applicant = Applicant.query.first()
+    applicant.status = 'On Hold'
+    db.session.commit()
+    assert RecruitmentHistory.query.filter_by(applicant_id=applicant.id).first().current_stage == 'On Hold'
+
+    applicant.status = 'Applied'
+    db.session.commit()
+    assert db.session.get(Applicant, applicant.id).current_stage == 'Need to Schedule Test or Interview'
+
+@pytest.mark.parametrize("url", ["hr/view_applicant/{id}", "/track/{id}"])
+def test_read_views_issue_no_writes(app, client, url, login_as):
+    seed(3)
+    login_as('hr')
+
+    # Stored stage is stale on purpose: a read must render it as-is, not repair it
+    applicant = db.session.get(Applicant, 2)
+    applicant.dob, applicant.gender, applicant.marital_status = date(2000, 1, 1), 'female', 'single'
+    applicant.is_fresher = True
+    db.session.commit()
+    make_stale('Stale')
+
+    statements, stop = capture_statements()
+    try:
+        response = client.get(url.format(id=applicant.id))
+    finally:
+        stop()
+
+    assert response.status_code == 200
+    assert not [s for s in statements if s.lstrip().upper().startswith(('UPDATE', 'INSERT', 'DELETE'))]
+    assert db.session.get(Applicant, 2).current_stage == 'Stale'